@@ -0,0 +1,370 @@
+import abc
+import json
+import heapq
+import threading
+import time
+from collections import deque
+
+RULE_METRICS = ('psi', 'ks', 'kl', 'js', 'wasserstein', 'chi2', 'p_value')
+OPERATORS = ('>', '>=', '<', '<=')
+SEVERITIES = ('info', 'warning', 'critical')
+ANY_FEATURE = '*'
+
+OK = 'ok'
+PENDING = 'pending'
+FIRING = 'firing'
+RESOLVED = 'resolved'
+
+
+class AlertRule:
+    """
+    One compiled alert condition: `metric operator threshold` on a feature
+    (or every feature with '*') of one model's drift updates.
+
+    duration: seconds the condition must hold before the rule fires.
+    hysteresis: once firing, the value must come back past threshold by this
+        margin before the rule resolves, so values hovering at the threshold
+        do not flap.
+    """
+
+    __slots__ = ('id', 'name', 'model_id', 'window_name', 'feature', 'metric', 'operator',
+                 'threshold', 'duration', 'hysteresis', 'severity', 'channels', 'enabled')
+
+    def __init__(self, rule_id, model_id, metric, operator, threshold, feature=ANY_FEATURE,
+                 window_name='batch', duration=0.0, hysteresis=0.0, severity='warning',
+                 channels=(), name=None, enabled=True):
+        self.id = rule_id
+        self.name = name or f"{metric} {operator} {threshold}"
+        self.model_id = model_id
+        self.window_name = window_name
+        self.feature = feature
+        self.metric = metric
+        self.operator = operator
+        self.threshold = float(threshold)
+        self.duration = float(duration)
+        self.hysteresis = float(hysteresis)
+        self.severity = severity
+        self.channels = list(channels)
+        self.enabled = enabled
+
+    @classmethod
+    def from_row(cls, row):
+        return cls(row['id'], row['model_id'], row['metric'], row['operator'], row['threshold'],
+                   row['feature'], row['window_name'], row['duration'], row['hysteresis'],
+                   row['severity'], json.loads(row['channels']), row['name'], bool(row['enabled']))
+
+    @property
+    def key(self):
+        return (self.model_id, self.window_name, self.feature, self.metric)
+
+    def breached(self, value):
+        if self.operator == '>':
+            return value > self.threshold
+        if self.operator == '>=':
+            return value >= self.threshold
+        if self.operator == '<':
+            return value < self.threshold
+        return value <= self.threshold
+
+    def cleared(self, value):
+        if self.operator in ('>', '>='):
+            return value < self.threshold - self.hysteresis
+        return value > self.threshold + self.hysteresis
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "name": self.name,
+            "model_id": self.model_id,
+            "window": self.window_name,
+            "feature": self.feature,
+            "metric": self.metric,
+            "operator": self.operator,
+            "threshold": self.threshold,
+            "duration": self.duration,
+            "hysteresis": self.hysteresis,
+            "severity": self.severity,
+            "channels": self.channels,
+            "enabled": self.enabled
+        }
+
+
+def validate_rule(spec):
+    """
+    Check a rule definition (dict) from the API.
+
+    Returns:
+        str: Error message, or None if the rule is valid.
+    """
+    for field in ('model_id', 'metric', 'operator', 'threshold'):
+        if spec.get(field) in (None, ''):
+            return f"'{field}' is required"
+    if spec['metric'] not in RULE_METRICS:
+        return f"metric must be one of {list(RULE_METRICS)}"
+    if spec['operator'] not in OPERATORS:
+        return f"operator must be one of {list(OPERATORS)}"
+    if spec.get('severity', 'warning') not in SEVERITIES:
+        return f"severity must be one of {list(SEVERITIES)}"
+    try:
+        float(spec['threshold'])
+        if float(spec.get('duration', 0)) < 0 or float(spec.get('hysteresis', 0)) < 0:
+            return "duration and hysteresis must not be negative"
+    except (TypeError, ValueError):
+        return "threshold, duration and hysteresis must be numbers"
+    if not isinstance(spec.get('channels', []), list):
+        return "channels must be a list"
+    return None
+
+
+class RuleState:
+    __slots__ = ('state', 'since', 'value', 'fired_at')
+
+    def __init__(self):
+        self.state = OK
+        self.since = None
+        self.value = None
+        self.fired_at = None
+
+
+class AlertSink(abc.ABC):
+    """
+    Destination for alert notifications (email, Slack, webhook, ...).
+
+    Subclasses implement send(); it receives one batch at a time.
+    """
+
+    @abc.abstractmethod
+    def send(self, notifications):
+        """
+        Deliver one batch of notification dicts.
+        """
+
+
+class LocalSink(AlertSink):
+    """
+    Stub sink: logs each batch and keeps the most recent notifications in memory.
+    """
+
+    def __init__(self, max_entries=1000):
+        self.notifications = deque(maxlen=max_entries)
+        self._lock = threading.Lock()
+
+    def send(self, notifications):
+        with self._lock:
+            self.notifications.extend(notifications)
+        print(f"Alerts: {len(notifications)} notification(s): "
+              + ", ".join(f"{n['rule']}/{n['feature']} {n['state']}" for n in notifications))
+
+    def recent(self, limit=100, model_id=None):
+        with self._lock:
+            items = [n for n in self.notifications if model_id is None or n['model_id'] == model_id]
+        return items[-limit:][::-1]
+
+
+class AlertEngine:
+    """
+    Incremental alert evaluation over drift metric updates.
+
+    Rules are indexed by (model, window, feature, metric), with '*' rules
+    under their own feature key, so an update touches only the rules for
+    the features and metrics it carries, however many rules exist in
+    total. Each (rule, feature) pair runs a small state machine
+    (ok -> pending -> firing -> ok); a heap of pending deadlines lets
+    duration rules fire on time even when no further update arrives.
+
+    Notifications are emitted only on transitions (firing, resolved),
+    deduplicated per (rule, feature, transition) within a batch, and handed
+    to the sink in batches of at most batch_size or every batch_interval
+    seconds.
+    """
+
+    def __init__(self, sink=None, batch_interval=10.0, batch_size=100, clock=time.time):
+        self.sink = sink if sink is not None else LocalSink()
+        self.batch_interval = batch_interval
+        self.batch_size = batch_size
+        self.clock = clock
+        self._rules = {}
+        self._index = {}
+        self._states = {}
+        self._deadlines = []
+        self._outbox = {}
+        self._last_flush = clock()
+        self._lock = threading.Lock()
+
+    # Rule management
+
+    def add_rule(self, rule):
+        with self._lock:
+            self._remove_locked(rule.id)
+            self._rules[rule.id] = rule
+            self._index.setdefault(rule.key, []).append(rule)
+
+    def remove_rule(self, rule_id):
+        with self._lock:
+            return self._remove_locked(rule_id)
+
+    def _remove_locked(self, rule_id):
+        rule = self._rules.pop(rule_id, None)
+        if rule is None:
+            return False
+        bucket = self._index[rule.key]
+        bucket.remove(rule)
+        if not bucket:
+            del self._index[rule.key]
+        for state_key in [k for k in self._states if k[0] == rule_id]:
+            del self._states[state_key]
+        return True
+
+    def rules(self, model_id=None):
+        with self._lock:
+            return [rule for rule in self._rules.values() if model_id is None or rule.model_id == model_id]
+
+    def rule_count(self):
+        return len(self._rules)
+
+    def windows(self, model_id):
+        """
+        Names of the windows the model's rules watch.
+        """
+        with self._lock:
+            return {key[1] for key in self._index if key[0] == model_id}
+
+    # Evaluation
+
+    def evaluate(self, model_id, report, window_name='batch', timestamp=None):
+        """
+        Apply one drift update (feature -> metrics dict) to the affected rules.
+
+        Returns:
+            int: Number of rules evaluated.
+        """
+        now = self.clock() if timestamp is None else timestamp
+        evaluated = 0
+        with self._lock:
+            self._expire_locked(now)
+            for feature, metrics in report.items():
+                for metric, value in metrics.items():
+                    if metric not in RULE_METRICS or value is None:
+                        continue
+                    for key in ((model_id, window_name, feature, metric),
+                                (model_id, window_name, ANY_FEATURE, metric)):
+                        for rule in self._index.get(key, ()):
+                            if rule.enabled:
+                                self._step(rule, feature, float(value), now)
+                                evaluated += 1
+        self.flush_if_due(now)
+        return evaluated
+
+    def _step(self, rule, feature, value, now):
+        state_key = (rule.id, feature)
+        state = self._states.get(state_key)
+        if state is None:
+            state = self._states[state_key] = RuleState()
+        state.value = value
+
+        if state.state == FIRING:
+            if rule.cleared(value):
+                state.state, state.since = OK, None
+                self._notify(rule, feature, state, RESOLVED, now)
+            return
+        if not rule.breached(value):
+            state.state, state.since = OK, None
+            return
+        if state.state == OK:
+            state.state, state.since = PENDING, now
+            if rule.duration > 0:
+                heapq.heappush(self._deadlines, (now + rule.duration, rule.id, feature, now))
+        if now - state.since >= rule.duration:
+            self._fire(rule, feature, state, now)
+
+    def _fire(self, rule, feature, state, now):
+        state.state, state.fired_at = FIRING, now
+        self._notify(rule, feature, state, FIRING, now)
+
+    def _expire_locked(self, now):
+        # Pending duration rules whose condition has held until their deadline
+        while self._deadlines and self._deadlines[0][0] <= now:
+            _, rule_id, feature, since = heapq.heappop(self._deadlines)
+            rule = self._rules.get(rule_id)
+            state = self._states.get((rule_id, feature))
+            if rule is not None and state is not None and state.state == PENDING and state.since == since:
+                self._fire(rule, feature, state, now)
+
+    def tick(self, now=None):
+        """
+        Fire due duration rules and flush notifications if the batch interval elapsed.
+        """
+        now = self.clock() if now is None else now
+        with self._lock:
+            self._expire_locked(now)
+        self.flush_if_due(now)
+
+    # Notifications
+
+    def _notify(self, rule, feature, state, transition, now):
+        # Repeats of a transition within one batch collapse into the latest, moved
+        # to the end so the batch order still ends on the current state
+        key = (rule.id, feature, transition)
+        self._outbox.pop(key, None)
+        self._outbox[key] = {
+            "rule_id": rule.id,
+            "rule": rule.name,
+            "model_id": rule.model_id,
+            "window": rule.window_name,
+            "feature": feature,
+            "metric": rule.metric,
+            "operator": rule.operator,
+            "threshold": rule.threshold,
+            "value": state.value,
+            "severity": rule.severity,
+            "channels": rule.channels,
+            "state": transition,
+            "timestamp": now
+        }
+
+    def flush_if_due(self, now=None):
+        now = self.clock() if now is None else now
+        with self._lock:
+            due = len(self._outbox) >= self.batch_size or (self._outbox and now - self._last_flush >= self.batch_interval)
+        if due:
+            self.flush(now)
+
+    def flush(self, now=None):
+        """
+        Send every queued notification to the sink as one batch.
+
+        Returns:
+            int: Number of notifications sent.
+        """
+        with self._lock:
+            batch = list(self._outbox.values())
+            self._outbox = {}
+            self._last_flush = self.clock() if now is None else now
+        if batch:
+            try:
+                self.sink.send(batch)
+            except Exception as e:
+                print(f"Error sending {len(batch)} alert notification(s): {e}")
+        return len(batch)
+
+    def active(self, model_id=None):
+        """
+        Currently firing (rule, feature) pairs.
+        """
+        with self._lock:
+            firing = []
+            for (rule_id, feature), state in self._states.items():
+                rule = self._rules[rule_id]
+                if state.state == FIRING and (model_id is None or rule.model_id == model_id):
+                    firing.append({
+                        "rule_id": rule_id,
+                        "rule": rule.name,
+                        "model_id": rule.model_id,
+                        "feature": feature,
+                        "metric": rule.metric,
+                        "value": state.value,
+                        "threshold": rule.threshold,
+                        "severity": rule.severity,
+                        "since": state.fired_at
+                    })
+            return firing
@@ -1,211 +1,1496 @@
-from flask import Flask, jsonify
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
 import pandas as pd
 import os
-from drift_detection import detect_drift, load_data, calculate_psi
+from drift_detection import detect_drift, load_data
+from data_sources import list_columns
+from baseline_profile import get_baseline_profile, file_version
+from monitor import DriftMonitor
+from cache import ResultCache, SingleFlight, make_etag
+from jobs import JobManager
+from push import Broadcaster
+from registry import ModelRegistry, ModelSpec
+from scheduler import ScanScheduler
+from history import DriftHistory, BATCH_WINDOW
+from categorical import category_shares
+from feature_details import DEFAULT_BINS, SORT_METRICS, FeatureDetails, allowed_bins
+from ingest import IngestBuffer, parse_records
+from streaming import StreamingDriftAccumulator, detect_drift_from_file
+from sketches import baseline_sketches, compare_sketches
+from alerts import AlertEngine, AlertRule, LocalSink, validate_rule
+from segments import detect_segmented_drift
+from multivariate import METHODS as MULTIVARIATE_METHODS, MultivariateBaseline, detect_multivariate_drift
+from retraining import SCHEDULES, RetrainingEstimator, recommend
+from instrumentation import METRICS, process_gauges, start_trace, stop_trace, summarize_trace
+import instrumentation
+import atexit
+import config
+import cProfile
+import gc
+import json
+import pstats
+import threading
+import time
+import tracemalloc
 import numpy as np
 
 app = Flask(__name__)
 CORS(app)
+instrumentation.ENABLED = config.METRICS_ENABLED
 
 # Configuration
-DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
-TRAINING_DATA_PATH = os.path.join(DATA_DIR, 'training_data.csv')
-PRODUCTION_DATA_PATH = os.path.join(DATA_DIR, 'production_data.csv')
+DATA_DIR = config.DATA_DIR
+TRAINING_DATA_PATH = config.TRAINING_DATA_PATH
+PRODUCTION_DATA_PATH = config.PRODUCTION_DATA_PATH
+# Persisted baseline profiles (bin edges, counts, sorted samples, stats)
+PROFILE_DIR = config.PROFILE_DIR
+DATABASE_PATH = config.DATABASE_PATH
+DEFAULT_MODEL_ID = config.DEFAULT_MODEL_ID
+# Online monitor windows (name -> seconds)
+MONITOR_WINDOWS = {'5m': 300, '1h': 3600, '24h': 86400}
+# Drift reports are cached per (model, baseline version, production version, params)
+REPORT_CACHE_TTL = config.REPORT_CACHE_TTL
+REPORT_CACHE_SIZE = config.REPORT_CACHE_SIZE
 
-@app.route('/api/drift', methods=['GET'])
-def get_drift():
-    training_df = load_data(TRAINING_DATA_PATH)
-    production_df = load_data(PRODUCTION_DATA_PATH)
+_report_cache = ResultCache(max_entries=REPORT_CACHE_SIZE, ttl=REPORT_CACHE_TTL)
+# Concurrent misses for the same drift run share one computation
+_inflight = SingleFlight()
+# Models fitted on the training data, (kind, model id) -> (baseline version, fitted).
+# Unlike reports they are not aged out: an entry is replaced only when the
+# training data (baseline version) changes
+_fitted = {}
+_fitted_lock = threading.Lock()
+# One producer per (model, channel) fans drift updates out to every stream subscriber
+_broadcaster = Broadcaster(interval=config.PUSH_INTERVAL, heartbeat=config.PUSH_HEARTBEAT)
+
+_registry = None
+_history = None
+_scheduler = None
+_jobs = None
+_ingest = {}
+_flusher = None
+_monitors = {}
+_snapshotter = None
+_alerts = None
+_state_lock = threading.Lock()
+# One ?profile=1 request at a time (cProfile and tracemalloc are process wide)
+_profile_lock = threading.Lock()
+PROFILE_TOP_FUNCTIONS = 25
+PROFILE_TOP_ALLOCATIONS = 15
+
+def get_registry():
+    """
+    Return the model registry, opening the SQLite store on first use.
+    """
+    global _registry
+    with _state_lock:
+        if _registry is None:
+            _registry = ModelRegistry(DATABASE_PATH, DATA_DIR, os.path.join(PROFILE_DIR, 'registry'))
+            if config.MODEL_CONFIG_PATH:
+                _registry.load_config(config.MODEL_CONFIG_PATH)
+        return _registry
+
+def get_history():
+    """
+    Return the drift history store (shares the registry's SQLite database).
+    """
+    global _history
+    registry = get_registry()
+    with _state_lock:
+        if _history is None:
+            _history = DriftHistory(registry.database)
+        return _history
+
+def record_history(model_id, drift_report, window_name=BATCH_WINDOW):
+    # History is best effort; a failed write must not fail the request
+    try:
+        get_history().record(model_id, drift_report, window_name)
+    except Exception as e:
+        print(f"Error recording drift history for model {model_id}: {e}")
+
+def get_alerts():
+    """
+    Return the alert engine, loading the stored rules on first use.
+    """
+    global _alerts
+    registry = get_registry()
+    with _state_lock:
+        if _alerts is None:
+            _alerts = AlertEngine(LocalSink(), config.ALERT_BATCH_INTERVAL, config.ALERT_BATCH_SIZE)
+            for row in registry.database.list_alert_rules():
+                _alerts.add_rule(AlertRule.from_row(row))
+            threading.Thread(target=tick_alerts, args=(_alerts,), name="alerts", daemon=True).start()
+        return _alerts
+
+def tick_alerts(engine):
+    # Fires duration rules that came due without a new update, and flushes batches
+    while True:
+        time.sleep(1)
+        try:
+            engine.tick()
+        except Exception as e:
+            print(f"Error evaluating alert deadlines: {e}")
+
+def evaluate_alerts(model_id, drift_report, window_name=BATCH_WINDOW):
+    # Like history, alerting must not fail the request that produced the metrics
+    try:
+        get_alerts().evaluate(model_id, drift_report, window_name)
+    except Exception as e:
+        print(f"Error evaluating alerts for model {model_id}: {e}")
+
+def evaluate_window_alerts(model_id, monitor):
+    """
+    Evaluate the model's window rules against the monitor's current windows.
+
+    Called after every ingest, so window rules do not depend on periodic
+    scans; only windows that some rule watches are reported.
+    """
+    try:
+        windows = get_alerts().windows(model_id)
+    except Exception as e:
+        print(f"Error evaluating alerts for model {model_id}: {e}")
+        return
+    for window_name in monitor.windows:
+        if window_name in windows:
+            evaluate_alerts(model_id, monitor.window_report(window_name), window_name)
+
+def resolve_model(model_id):
+    """
+    Return the ModelSpec for model_id, or None if unknown.
+
+    The built-in training/production pair is served as DEFAULT_MODEL_ID
+    unless a model with that id has been registered.
+    """
+    model = get_registry().get(model_id)
+    if model is None and model_id == DEFAULT_MODEL_ID:
+        model = ModelSpec(DEFAULT_MODEL_ID, TRAINING_DATA_PATH, PRODUCTION_DATA_PATH,
+                          profile_dir=PROFILE_DIR)
+    return model
+
+def list_models():
+    models = get_registry().list()
+    if all(model.id != DEFAULT_MODEL_ID for model in models):
+        models.insert(0, resolve_model(DEFAULT_MODEL_ID))
+    return models
+
+def get_model_baseline(model):
+    return get_baseline_profile(model.training_path, model.profile_dir, model.buckets)
+
+def get_monitor(model):
+    """
+    Return the model's online DriftMonitor, recreating it if the baseline profile changed.
+    """
+    baseline = get_model_baseline(model)
+    if baseline is None:
+        return None
+    global _snapshotter
+    with _state_lock:
+        monitor = _monitors.get(model.id)
+        if monitor is None or monitor.baseline_profile is not baseline:
+            monitor = None
+            if config.MONITOR_SNAPSHOT_INTERVAL > 0:
+                monitor = DriftMonitor.load(baseline, monitor_snapshot_path(model.id))
+                if monitor is not None and {n: w.seconds for n, w in monitor.windows.items()} != MONITOR_WINDOWS:
+                    monitor = None
+            if monitor is None:
+                monitor = DriftMonitor(baseline, windows=MONITOR_WINDOWS)
+            _monitors[model.id] = monitor
+        if _snapshotter is None and config.MONITOR_SNAPSHOT_INTERVAL > 0:
+            _snapshotter = threading.Thread(target=snapshot_monitors, name="monitor-snapshot", daemon=True)
+            _snapshotter.start()
+            atexit.register(save_monitors)
+        return monitor
+
+def monitor_snapshot_path(model_id):
+    return os.path.join(config.MONITOR_SNAPSHOT_DIR, f"{model_id}.monitor.bin")
+
+def save_monitors(saved=None):
+    """
+    Snapshot every monitor that saw records since its last save.
+
+    Args:
+        saved: dict model_id -> records_seen at the last save, updated in place.
+    """
+    saved = {} if saved is None else saved
+    with _state_lock:
+        monitors = list(_monitors.items())
+    for model_id, monitor in monitors:
+        if monitor.records_seen == saved.get(model_id, 0):
+            continue
+        try:
+            os.makedirs(config.MONITOR_SNAPSHOT_DIR, exist_ok=True)
+            monitor.save(monitor_snapshot_path(model_id))
+            saved[model_id] = monitor.records_seen
+        except Exception as e:
+            print(f"Error saving monitor snapshot for model {model_id}: {e}")
+
+def snapshot_monitors():
+    # A restart reloads window state from the latest snapshot instead of starting empty
+    saved = {}
+    while True:
+        time.sleep(config.MONITOR_SNAPSHOT_INTERVAL)
+        save_monitors(saved)
+
+def scan_model(model):
+    """
+    Compute (or refresh) a model's cached drift run; used by the scan scheduler.
+    """
+    baseline = get_model_baseline(model)
+    if baseline is None:
+        raise RuntimeError(f"Failed to load baseline data for model '{model.id}'")
+    run = get_drift_run(model, baseline)
+    if run is None:
+        raise RuntimeError(f"Failed to load production data for model '{model.id}'")
+    with _state_lock:
+        monitor = _monitors.get(model.id)
+    if monitor is not None and monitor.records_seen > 0:
+        for window_name in monitor.windows:
+            record_history(model.id, monitor.window_report(window_name), window_name)
+        evaluate_window_alerts(model.id, monitor)
+    return {
+        "drifting": sum(1 for m in run.drift_report.values() if m['status'] != 'good'),
+        "features": len(run.drift_report)
+    }
+
+class ModelIngest:
+    """
+    Ingestion state for one model: the on-disk segment buffer plus a
+    cumulative streaming drift accumulator over everything ingested.
+    """
+
+    def __init__(self, buffer, accumulator):
+        self.buffer = buffer
+        self.accumulator = accumulator
+        self.lock = threading.Lock()
+
+def flush_ingest_buffers():
+    while True:
+        time.sleep(config.INGEST_FLUSH_INTERVAL)
+        with _state_lock:
+            states = list(_ingest.values())
+        for state in states:
+            try:
+                state.buffer.flush_if_due()
+            except Exception as e:
+                print(f"Error flushing ingest buffer {state.buffer.directory}: {e}")
+
+def get_ingest(model, baseline):
+    """
+    Return the model's ingestion state, resetting the accumulator if the baseline changed.
+    """
+    global _flusher
+    with _state_lock:
+        state = _ingest.get(model.id)
+        if state is None:
+            buffer = IngestBuffer(os.path.join(config.INGEST_DIR, f"{model.id}.ingest"),
+                                  config.INGEST_FLUSH_ROWS, config.INGEST_FLUSH_INTERVAL,
+                                  config.INGEST_MAX_SEGMENTS)
+            state = ModelIngest(buffer, StreamingDriftAccumulator(baseline))
+            _ingest[model.id] = state
+        elif state.accumulator.baseline_profile is not baseline:
+            state.accumulator = StreamingDriftAccumulator(baseline)
+        if _flusher is None:
+            _flusher = threading.Thread(target=flush_ingest_buffers, name="ingest-flush", daemon=True)
+            _flusher.start()
+        return state
+
+def get_jobs():
+    global _jobs
+    with _state_lock:
+        if _jobs is None:
+            _jobs = JobManager(max_workers=config.JOB_WORKERS, ttl=config.JOB_TTL)
+        return _jobs
+
+def get_scheduler():
+    global _scheduler
+    with _state_lock:
+        if _scheduler is None:
+            _scheduler = ScanScheduler(scan_model, max_workers=config.SCAN_WORKERS)
+        return _scheduler
+
+class DriftRun:
+    """
+    One drift computation plus the per-feature data derived from it.
+
+    Cached as a unit so every endpoint reading the same data versions
+    shares the report, the loaded production frame and rendered payloads.
+    A run scored in chunks holds no frame; it is loaded (once) only when an
+    endpoint needs row-level production data.
+    """
+
+    def __init__(self, key, baseline, production_df, drift_report, load_production=None, n_rows=None):
+        self.key = key
+        self.baseline = baseline
+        self._production_df = production_df
+        self._load_production = load_production
+        self._load_lock = threading.Lock()
+        self.n_rows = len(production_df) if production_df is not None else n_rows
+        self.drift_report = drift_report
+        self.payloads = {}
+        self._production_values = {}
+
+    @property
+    def production_df(self):
+        if self._production_df is None:
+            with self._load_lock:
+                if self._production_df is None:
+                    production_df = self._load_production()
+                    if production_df is None:
+                        raise RuntimeError("Failed to load production data")
+                    self._production_df = production_df
+        return self._production_df
+
+    def production_values(self, feature_name):
+        """
+        Non-null production values of one feature (computed once per run).
+        """
+        values = self._production_values.get(feature_name)
+        if values is None:
+            values = self.production_df[feature_name].dropna().values
+            self._production_values[feature_name] = values
+        return values
+
+def drift_run_key(model, baseline):
+    """
+    Cache key covering every input of a drift run.
+    """
+    try:
+        production_version = file_version(model.production_path)
+    except OSError:
+        production_version = None
+    return ('drift', model.id, baseline.version, production_version, baseline.buckets)
+
+def get_drift_run(model, baseline, key=None):
+    """
+    Return the cached DriftRun for the current data files, computing it on a miss.
     
-    if training_df is None or production_df is None:
+    Returns:
+        DriftRun, or None if production data could not be loaded.
+    """
+    if key is None:
+        key = drift_run_key(model, baseline)
+    run = _report_cache.get(key)
+    if run is None:
+        run = _inflight.do(key, lambda: compute_drift_run(model, baseline, key))
+    return run
+
+def compute_drift_run(model, baseline, key):
+    # A run finished by the previous leader for this key may already be cached
+    run = _report_cache.get(key)
+    if run is not None:
+        return run
+    # Only the profiled columns (plus any strata columns) are read from columnar sources
+    strata = config.DRIFT_STRATIFY_BY or ()
+    try:
+        available = list_columns(model.production_path)
+    except Exception as e:
+        print(f"Error loading data from {model.production_path}: {e}")
+        return None
+    missing = [col for col in strata if col not in available]
+    if missing:
+        print(f"Error loading data from {model.production_path}: strata column(s) {missing} not found")
+        return None
+    wanted = set(baseline.columns) | set(strata)
+    columns = [col for col in available if col in wanted]
+    if scans_in_chunks(model):
+        # Bounded memory: the file is scored chunk by chunk and never held whole
+        drift_report, n_rows = detect_drift_from_file(baseline, model.production_path, config.DRIFT_CHUNK_SIZE)
+        run = DriftRun(key, baseline, None, drift_report,
+                       lambda: load_data(model.production_path, columns=columns), n_rows)
+    else:
+        production_df = load_data(model.production_path, columns=columns)
+        if production_df is None:
+            return None
+        drift_report = detect_drift(None, production_df, baseline_profile=baseline,
+                                    sampling=config.DRIFT_SAMPLING, sample_size=config.DRIFT_SAMPLE_SIZE,
+                                    stratify_by=config.DRIFT_STRATIFY_BY, approximate=config.DRIFT_APPROXIMATE)
+        run = DriftRun(key, baseline, production_df, drift_report)
+    record_history(model.id, drift_report)
+    evaluate_alerts(model.id, drift_report)
+    # Runs for older versions of the data files can never be hit again
+    _report_cache.invalidate(lambda k: k[:2] == ('drift', model.id) and k != key)
+    _report_cache.put(key, run)
+    return run
+
+def get_fitted(kind, model, baseline, fit):
+    """
+    Return the model's fitted object of the given kind for the current
+    baseline version, fitting it (once, however many callers) on a miss.
+
+    Args:
+        kind: Store namespace, e.g. 'retraining'.
+        fit: Callable (model, baseline) -> fitted object, or None if it
+            cannot be fitted (None is not stored).
+    """
+    with _fitted_lock:
+        entry = _fitted.get((kind, model.id))
+    if entry is not None and entry[0] == baseline.version:
+        return entry[1]
+    return _inflight.do((kind, model.id, baseline.version),
+                        lambda: fit_and_store(kind, model, baseline, fit))
+
+def fit_and_store(kind, model, baseline, fit):
+    # A fit finished by the previous leader for this version may already be stored
+    with _fitted_lock:
+        entry = _fitted.get((kind, model.id))
+    if entry is not None and entry[0] == baseline.version:
+        return entry[1]
+    fitted = fit(model, baseline)
+    if fitted is not None:
+        with _fitted_lock:
+            _fitted[(kind, model.id)] = (baseline.version, fitted)
+    return fitted
+
+def scans_in_chunks(model):
+    """
+    Whether drift scans stream the production file in chunks: enabled by
+    DRIFTGUARD_CHUNK_SIZE for CSV files scored on every row (sampled and
+    sketch scans, and columnar sources, load the frame as before).
+    """
+    return (config.DRIFT_CHUNK_SIZE > 0 and config.DRIFT_SAMPLING is None and not config.DRIFT_APPROXIMATE
+            and os.path.isfile(model.production_path)
+            and os.path.splitext(model.production_path)[1].lower() == '.csv')
+
+def get_multivariate_baseline(model, baseline):
+    """
+    Return the model's MultivariateBaseline, fitted once per training data version.
+    """
+    return get_fitted('multivariate', model, baseline, fit_multivariate_baseline)
+
+def fit_multivariate_baseline(model, baseline):
+    training_df = load_data(model.training_path, columns=list(baseline.features))
+    if training_df is None:
+        return None
+    return MultivariateBaseline(training_df, list(baseline.features))
+
+def get_retraining_estimator(model, baseline):
+    """
+    Return the model's RetrainingEstimator, fitted once per training data version.
+
+    Returns:
+        RetrainingEstimator, or None if the training data has no label column.
+    """
+    return get_fitted('retraining', model, baseline, fit_retraining_estimator)
+
+def fit_retraining_estimator(model, baseline):
+    try:
+        available = list_columns(model.training_path)
+    except Exception as e:
+        print(f"Error loading data from {model.training_path}: {e}")
+        return None
+    if config.LABEL_COLUMN not in available:
+        return None
+    wanted = set(baseline.features) | {config.LABEL_COLUMN, config.PREDICTION_COLUMN}
+    training_df = load_data(model.training_path, columns=[col for col in available if col in wanted])
+    if training_df is None:
+        return None
+    return RetrainingEstimator(training_df, baseline, config.LABEL_COLUMN, config.PREDICTION_COLUMN)
+
+def retraining_estimate(model, run):
+    """
+    Estimated accuracy of the model on the run's production data (once per run),
+    or None without labeled training data.
+    """
+    estimator = get_retraining_estimator(model, run.baseline)
+    if estimator is None:
+        return None
+    return cached_payload(run, 'retraining', lambda: estimator.estimate(
+        run.production_df, prediction_column=config.PREDICTION_COLUMN))
+
+def predictions_per_day(run):
+    return run.n_rows / config.BASELINE_AGE_DAYS
+
+def cached_payload(run, name, build):
+    """
+    Return run.payloads[name], building it once per run.
+    """
+    payload = run.payloads.get(name)
+    if payload is None:
+        payload = build()
+        run.payloads[name] = payload
+    return payload
+
+def not_modified(etag):
+    """
+    True if the client already holds the representation identified by etag.
+    """
+    return request.if_none_match.contains(etag)
+
+def conditional_response(payload, etag):
+    response = jsonify(payload)
+    response.set_etag(etag)
+    # Clients must revalidate, but may reuse their copy on 304
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+def not_modified_response(etag):
+    response = app.response_class(status=304)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+def model_not_found(model_id):
+    return jsonify({"error": f"Model '{model_id}' not found"}), 404
+
+def wants_async():
+    return request.args.get('async', '').lower() in ('1', 'true', 'yes')
+
+def job_response(job):
+    payload = job.to_dict(include_result=False)
+    payload["poll"] = f"/api/jobs/{job.id}"
+    response = jsonify(payload)
+    response.status_code = 202
+    response.headers['Location'] = payload["poll"]
+    return response
+
+def submit_drift_job(model, baseline, key, name, build):
+    """
+    Compute a drift run and render one payload in the background.
+
+    Returns:
+        202 response pointing at the job; identical pending requests share a job.
+    """
+    def compute():
+        run = get_drift_run(model, baseline, key)
+        if run is None:
+            raise RuntimeError("Failed to load data")
+        return cached_payload(run, name, lambda: build(run))
+    job, _ = get_jobs().submit((key, name), compute)
+    return job_response(job)
+
+@app.route('/api/drift', methods=['GET'])
+@app.route('/api/models/<model_id>/drift', methods=['GET'])
+def get_drift(model_id=DEFAULT_MODEL_ID):
+    model = resolve_model(model_id)
+    if model is None:
+        return model_not_found(model_id)
+    baseline = get_model_baseline(model)
+    if baseline is None:
         return jsonify({"error": "Failed to load data"}), 500
-    
-    drift_report = detect_drift(training_df, production_df)
-    
+
+    key = drift_run_key(model, baseline)
+    etag = make_etag(key, 'drift')
+    if not_modified(etag):
+        return not_modified_response(etag)
+
+    if wants_async() and _report_cache.get(key) is None:
+        return submit_drift_job(model, baseline, key, 'drift', build_drift_payload)
+
+    run = get_drift_run(model, baseline, key)
+    if run is None:
+        return jsonify({"error": "Failed to load data"}), 500
+
+    return conditional_response(cached_payload(run, 'drift', lambda: build_drift_payload(run)), etag)
+
+def build_drift_payload(run):
     # Format result for frontend consumption
     results = []
-    for feature, metrics in drift_report.items():
-        results.append({
+    for feature, metrics in run.drift_report.items():
+        entry = {
             "name": feature,
             "psi": metrics['psi'],
             "ks": metrics.get('ks', 0),
             "kl": metrics.get('kl', 0),
+            "js": metrics.get('js', 0),
+            "wasserstein": metrics.get('wasserstein', 0),
             "status": metrics['status']
-        })
+        }
+        if metrics.get('type') == 'categorical':
+            entry.update({"type": "categorical", "chi2": metrics['chi2'], "p_value": metrics['p_value']})
+        # Present when the run scored a sample (config.DRIFT_SAMPLING)
+        for name in ('sample_size', 'psi_ci', 'kl_ci', 'ks_ci'):
+            if name in metrics:
+                entry[name] = metrics[name]
+        results.append(entry)
         
-    return jsonify({
+    return {
         "drift_summary": results,
         "meta": {
-            "training_samples": len(training_df),
-            "production_samples": len(production_df)
+            "training_samples": run.baseline.n_rows,
+            "production_samples": run.n_rows
         }
-    })
+    }
+
 @app.route('/api/dashboard-data', methods=['GET'])
-def get_dashboard_data():
+@app.route('/api/models/<model_id>/dashboard-data', methods=['GET'])
+def get_dashboard_data(model_id=DEFAULT_MODEL_ID):
     try:
-        training_df = load_data(TRAINING_DATA_PATH)
-        production_df = load_data(PRODUCTION_DATA_PATH)
-        
-        if training_df is None or production_df is None:
+        model = resolve_model(model_id)
+        if model is None:
+            return model_not_found(model_id)
+        baseline = get_model_baseline(model)
+        if baseline is None:
             return jsonify({"error": "Failed to load data (None returned)"}), 500
-        
-        drift_report = detect_drift(training_df, production_df)
-        
-        # Calculate drift metrics
-        total_features = len(drift_report)
-        drifting_features = sum(1 for m in drift_report.values() if m['status'] != 'good')
-        drift_score = round(drifting_features / total_features, 2) if total_features > 0 else 0
-        
-        print(f"DEBUG: Total: {total_features}, Drifting: {drifting_features}, DriftScore: {drift_score}")
-        print(f"DEBUG: Report: {drift_report}")
 
-        # Health Score (inverse of drift score, simplified)
-        health_score = int(100 - (drift_score * 100))
-        
-        # Top features (sorted by PSI desc)
-        top_features = []
-        for feature, metrics in drift_report.items():
-            top_features.append({
-                "name": feature,
-                "psi": metrics['psi'],
-                "ks": metrics.get('ks', 0),
-                "kl": metrics.get('kl', 0),
-                "status": metrics['status'],
-                "drift_score": metrics['psi'] * 100
-            })
-        top_features = sorted(top_features, key=lambda x: x['psi'], reverse=True)[:5]
-
-        # Alerts based on drift severity
-        alerts = []
-        if drifting_features > 0:
-            count = 1
-            for feature in top_features:
-                if feature['status'] == 'Critical':
-                    alerts.append({
-                        "id": count,
-                        "type": "critical",
-                        "message": f"Critical drift detected in '{feature['name']}'",
-                        "timestamp": "Just now"
-                    })
-                    count += 1
-                elif feature['status'] == 'Warning':
-                     alerts.append({
-                        "id": count,
-                        "type": "warning",
-                        "message": f"Warning: '{feature['name']}' is showing signs of drift",
-                        "timestamp": "Just now"
-                    })
-                     count += 1
-
-        # Estimate Model Accuracy based on Drift Score
-        # Assume base accuracy of 95%, penalized by drift severity
-        model_accuracy = max(0.0, 95.0 - (drift_score * 50))
-        
-        # Calculate dynamic changes in metrics
-        
-        metrics = [
-            {"label": "Total Predictions", "value": f"{len(production_df):,}", "change": 5.2, "status": "positive"},
-            {"label": "Avg Data Drift", "value": str(drift_score), "change": drift_score * 10, "status": "negative" if drift_score > 0.1 else "positive"},
-            {"label": "Model Accuracy", "value": f"{model_accuracy:.1f}%", "change": -1.2 if drift_score > 0.1 else 0.5, "status": "warning" if model_accuracy < 90 else "positive"}
-        ]
-
-        response_data = {
-            "health_score": health_score,
-            "metrics": metrics,
-            "alerts": alerts,
-            "drift_summary": {
-                "score": drift_score,
-                "drifting_count": drifting_features,
-                "total_count": total_features,
-                "recommendation": {
-                    "action": "RETRAIN_URGENT" if drift_score > 0.2 else "MONITOR",
-                    "estimated_time": "2 hours"
-                }
-            },
-            "top_features": top_features
-        }
-        
-        response = jsonify(response_data)
-        response.headers.add('Cache-Control', 'no-store, no-cache, must-revalidate, post-check=0, pre-check=0')
-        return response
+        key = drift_run_key(model, baseline)
+        etag = make_etag(key, 'dashboard')
+        if not_modified(etag):
+            return not_modified_response(etag)
+
+        if wants_async() and _report_cache.get(key) is None:
+            return submit_drift_job(model, baseline, key, 'dashboard', build_dashboard_payload)
+
+        run = get_drift_run(model, baseline, key)
+        if run is None:
+            return jsonify({"error": "Failed to load data (None returned)"}), 500
+
+        return conditional_response(cached_payload(run, 'dashboard', lambda: build_dashboard_payload(run)), etag)
     except Exception as e:
         import traceback
         return jsonify({"error": str(e), "traceback": traceback.format_exc()}), 500
 
+def build_dashboard_payload(run):
+    drift_report = run.drift_report
+    # Calculate drift metrics
+    total_features = len(drift_report)
+    drifting_features = sum(1 for m in drift_report.values() if m['status'] != 'good')
+    drift_score = round(drifting_features / total_features, 2) if total_features > 0 else 0
+    
+    # Health Score (inverse of drift score, simplified)
+    health_score = int(100 - (drift_score * 100))
+    
+    # Top features (sorted by PSI desc)
+    details = feature_details(run)
+    top_features = []
+    for position in details.top('psi', 0, 5)[0]:
+        entry = details.summary(position)
+        entry.pop("type", None)
+        entry["drift_score"] = entry["psi"] * 100
+        top_features.append(entry)
+
+    # Alerts based on drift severity
+    alerts = []
+    if drifting_features > 0:
+        count = 1
+        for feature in top_features:
+            if feature['status'] == 'critical':
+                alerts.append({
+                    "id": count,
+                    "type": "critical",
+                    "message": f"Critical drift detected in '{feature['name']}'",
+                    "timestamp": "Just now"
+                })
+                count += 1
+            elif feature['status'] == 'warning':
+                 alerts.append({
+                    "id": count,
+                    "type": "warning",
+                    "message": f"Warning: '{feature['name']}' is showing signs of drift",
+                    "timestamp": "Just now"
+                })
+                 count += 1
+
+    # Model accuracy: labeled baseline rows reweighted to the production distribution
+    model = resolve_model(run.key[1])
+    estimate = retraining_estimate(model, run) if model is not None else None
+    if estimate is not None:
+        model_accuracy = estimate['estimated_accuracy'] * 100
+        accuracy_change = round((estimate['estimated_accuracy'] - estimate['baseline_accuracy']) * 100, 1)
+        recommendation = recommend([estimate], predictions_per_day(run), config.BASELINE_AGE_DAYS,
+                                   config.RETRAIN_COST, config.ERROR_COST)[0]
+        del recommendation['schedules']
+    else:
+        # No labels to estimate from: assume base accuracy of 95%, penalized by drift severity
+        model_accuracy = max(0.0, 95.0 - (drift_score * 50))
+        accuracy_change = -1.2 if drift_score > 0.1 else 0.5
+        recommendation = {
+            "action": "RETRAIN_URGENT" if drift_score > 0.2 else "MONITOR",
+            "estimated_time": "2 hours"
+        }
+    
+    metrics = [
+        {"label": "Total Predictions", "value": f"{run.n_rows:,}", "change": 5.2, "status": "positive"},
+        {"label": "Avg Data Drift", "value": str(drift_score), "change": drift_score * 10, "status": "negative" if drift_score > 0.1 else "positive"},
+        {"label": "Model Accuracy", "value": f"{model_accuracy:.1f}%", "change": accuracy_change, "status": "warning" if model_accuracy < 90 else "positive"}
+    ]
+
+    response_data = {
+        "health_score": health_score,
+        "metrics": metrics,
+        "alerts": alerts,
+        "drift_summary": {
+            "score": drift_score,
+            "drifting_count": drifting_features,
+            "total_count": total_features,
+            "recommendation": recommendation
+        },
+        "top_features": top_features
+    }
+    return response_data
+
+
+def feature_details(run):
+    """
+    The run's FeatureDetails index (built once per drift run).
+    """
+    return cached_payload(run, 'feature-index', lambda: FeatureDetails(run))
+
+def requested_bins():
+    """
+    Histogram resolution from ?bins=, or None if it is not a divisor of the stored resolution.
+    """
+    try:
+        bins = int(request.args.get('bins', DEFAULT_BINS))
+    except ValueError:
+        return None
+    return bins if bins in allowed_bins() else None
+
+def invalid_bins_response():
+    return jsonify({"error": f"bins must be one of {allowed_bins()}"}), 400
 
 @app.route('/api/feature-details/<feature_name>', methods=['GET'])
-def get_feature_details(feature_name):
+@app.route('/api/models/<model_id>/feature-details/<feature_name>', methods=['GET'])
+def get_feature_details(feature_name, model_id=DEFAULT_MODEL_ID):
     try:
-        training_df = load_data(TRAINING_DATA_PATH)
-        production_df = load_data(PRODUCTION_DATA_PATH)
-        
-        if training_df is None or production_df is None:
+        model = resolve_model(model_id)
+        if model is None:
+            return model_not_found(model_id)
+        bins = requested_bins()
+        if bins is None:
+            return invalid_bins_response()
+        baseline = get_model_baseline(model)
+        if baseline is None:
+             return jsonify({"error": "Failed to load data"}), 500
+
+        key = drift_run_key(model, baseline)
+        etag = make_etag(key, 'feature-details', feature_name, bins)
+        if not_modified(etag):
+            return not_modified_response(etag)
+
+        profiled = feature_name in baseline.features or feature_name in baseline.categorical
+        if wants_async() and _report_cache.get(key) is None and profiled:
+            return submit_drift_job(model, baseline, key, ('feature-details', feature_name, bins),
+                                    lambda run: build_feature_payload(run, feature_name, bins))
+
+        run = get_drift_run(model, baseline, key)
+        if run is None:
              return jsonify({"error": "Failed to load data"}), 500
 
-        if feature_name not in training_df.columns or feature_name not in production_df.columns:
+        if not profiled or feature_name not in run.production_df.columns:
             return jsonify({"error": f"Feature '{feature_name}' not found"}), 404
 
-        training_data = training_df[feature_name].dropna().values
-        production_data = production_df[feature_name].dropna().values
-        
-        # Calculate PSI, Status
-        psi = calculate_psi(training_data, production_data)
-        status = 'good'
-        if psi > 0.2: status = 'critical'
-        elif psi > 0.1: status = 'warning'
-
-        # Calculate Statistics
-        def get_stats(data):
-            return {
-                "mean": float(np.mean(data)),
-                "median": float(np.median(data)),
-                "std": float(np.std(data)),
-                "min": float(np.min(data)),
-                "max": float(np.max(data))
-            }
-        
-        baseline_stats = get_stats(training_data)
-        production_stats = get_stats(production_data)
-        
-        # Calculate Histogram Data (Distribution)
-        # Create common bins
-        min_val = min(baseline_stats['min'], production_stats['min'])
-        max_val = max(baseline_stats['max'], production_stats['max'])
-        
-        # Handle constant values case
-        if min_val == max_val:
-             bins = np.array([min_val - 1, max_val + 1])
-        else:
-             bins = np.linspace(min_val, max_val, 21) # 20 bins
-        
-        hist_baseline, _ = np.histogram(training_data, bins=bins, density=True)
-        hist_production, _ = np.histogram(production_data, bins=bins, density=True)
-        
-        chart_data = []
-        for i in range(len(bins)-1):
-            bin_center = (bins[i] + bins[i+1]) / 2
-            chart_data.append({
-                "range": f"{bins[i]:.1f}-{bins[i+1]:.1f}", 
-                "bin_center": float(bin_center),
-                "baseline": float(hist_baseline[i]),
-                "production": float(hist_production[i])
-            })
-            
-        return jsonify({
-            "feature_name": feature_name,
-            "psi": round(psi, 4),
-            "status": status,
-            "baseline_stats": baseline_stats,
-            "production_stats": production_stats,
-            "chart_data": chart_data
-        })
+        payload = cached_payload(run, ('feature-details', feature_name, bins),
+                                 lambda: build_feature_payload(run, feature_name, bins))
+        return conditional_response(payload, etag)
 
     except Exception as e:
         import traceback
         print(traceback.format_exc())
-        return jsonify({"error": str(e)}), 500 
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/feature-details', methods=['GET'])
+@app.route('/api/models/<model_id>/feature-details', methods=['GET'])
+def get_feature_details_bulk(model_id=DEFAULT_MODEL_ID):
+    """
+    Drill-down payloads for many features at once: ?names=a,b,c&bins=20.
+    """
+    model = resolve_model(model_id)
+    if model is None:
+        return model_not_found(model_id)
+    bins = requested_bins()
+    if bins is None:
+        return invalid_bins_response()
+    names = [name.strip() for name in request.args.get('names', '').split(',') if name.strip()]
+    if not names:
+        return jsonify({"error": "names is required"}), 400
+    baseline = get_model_baseline(model)
+    if baseline is None:
+        return jsonify({"error": "Failed to load data"}), 500
+
+    key = drift_run_key(model, baseline)
+    etag = make_etag(key, 'feature-details', tuple(names), bins)
+    if not_modified(etag):
+        return not_modified_response(etag)
+    run = get_drift_run(model, baseline, key)
+    if run is None:
+        return jsonify({"error": "Failed to load data"}), 500
+
+    features, missing = {}, []
+    for name in names:
+        if name not in feature_details(run).positions:
+            missing.append(name)
+            continue
+        features[name] = cached_payload(run, ('feature-details', name, bins),
+                                        lambda: build_feature_payload(run, name, bins))
+    return conditional_response({"features": features, "missing": missing}, etag)
+
+@app.route('/api/features', methods=['GET'])
+@app.route('/api/models/<model_id>/features', methods=['GET'])
+def get_features(model_id=DEFAULT_MODEL_ID):
+    """
+    Paged feature ranking: ?sort=psi|ks|kl|js|wasserstein&offset=0&limit=50&status=.
+    """
+    model = resolve_model(model_id)
+    if model is None:
+        return model_not_found(model_id)
+    sort = request.args.get('sort', 'psi')
+    if sort not in SORT_METRICS:
+        return jsonify({"error": f"sort must be one of {list(SORT_METRICS)}"}), 400
+    status = request.args.get('status')
+    if status is not None and status not in ('good', 'warning', 'critical'):
+        return jsonify({"error": f"Unknown status '{status}'"}), 400
+    try:
+        offset = max(int(request.args.get('offset', 0)), 0)
+        limit = max(int(request.args.get('limit', 50)), 0)
+    except ValueError:
+        return jsonify({"error": "offset and limit must be integers"}), 400
+    baseline = get_model_baseline(model)
+    if baseline is None:
+        return jsonify({"error": "Failed to load data"}), 500
+    run = get_drift_run(model, baseline)
+    if run is None:
+        return jsonify({"error": "Failed to load data"}), 500
+
+    details = feature_details(run)
+    positions, total = details.top(sort, offset, limit, status)
+    return jsonify({
+        "features": [details.summary(position) for position in positions],
+        "total": total,
+        "offset": offset,
+        "limit": limit
+    })
+
+def build_feature_payload(run, feature_name, bins=DEFAULT_BINS):
+    if feature_name in run.baseline.categorical:
+        return build_categorical_feature_payload(run, feature_name)
+    return feature_details(run).payload(feature_name, bins)
+
+def build_categorical_feature_payload(run, feature_name):
+    metrics = run.drift_report.get(feature_name, {})
+    profile = run.baseline.categorical[feature_name]
+    return {
+        "feature_name": feature_name,
+        "type": "categorical",
+        "psi": metrics.get('psi', 0.0),
+        "chi2": metrics.get('chi2', 0.0),
+        "p_value": metrics.get('p_value', 1.0),
+        "status": metrics.get('status', 'good'),
+        "baseline_stats": {"count": profile.n, "distinct": profile.n_distinct},
+        "chart_data": category_shares(profile, run.production_df[feature_name])
+    }
+
+@app.route('/api/records', methods=['POST'])
+@app.route('/api/models/<model_id>/records', methods=['POST'])
+def post_records(model_id=DEFAULT_MODEL_ID):
+    model = resolve_model(model_id)
+    if model is None:
+        return model_not_found(model_id)
+    monitor = get_monitor(model)
+    if monitor is None:
+        return jsonify({"error": "Failed to load data"}), 500
+
+    payload = request.get_json(silent=True)
+    if isinstance(payload, dict):
+        payload = payload.get('records')
+    if not isinstance(payload, list):
+        return jsonify({"error": "Expected a JSON list of records"}), 400
+
+    ingested = monitor.ingest(payload)
+    if ingested:
+        evaluate_window_alerts(model.id, monitor)
+    return jsonify({"ingested": ingested, "records_seen": monitor.records_seen})
+
+
+@app.route('/api/ingest', methods=['POST'])
+@app.route('/api/models/<model_id>/ingest', methods=['POST'])
+def post_ingest(model_id=DEFAULT_MODEL_ID):
+    """
+    Batched prediction-log ingestion.
+
+    Accepts JSON lines (application/x-ndjson), a JSON list of records, Arrow
+    IPC streams or msgpack. Records are appended to the model's columnar
+    buffer and folded into its live monitor windows and cumulative drift state.
+    """
+    model = resolve_model(model_id)
+    if model is None:
+        return model_not_found(model_id)
+    baseline = get_model_baseline(model)
+    monitor = get_monitor(model)
+    if baseline is None or monitor is None:
+        return jsonify({"error": "Failed to load data"}), 500
+
+    try:
+        records = parse_records(request.get_data(), request.content_type)
+    except Exception as e:
+        return jsonify({"error": f"Could not parse records: {e}"}), 400
+
+    state = get_ingest(model, baseline)
+    ingested = state.buffer.append(records)
+    if ingested:
+        monitor.ingest(records)
+        numeric = records.reindex(columns=state.accumulator.columns).apply(pd.to_numeric, errors='coerce')
+        with state.lock:
+            state.accumulator.update(numeric)
+        evaluate_window_alerts(model.id, monitor)
+
+    response = {"ingested": ingested, "records_seen": monitor.records_seen}
+    response.update(state.buffer.stats())
+    return jsonify(response)
+
+@app.route('/api/ingest', methods=['GET'])
+@app.route('/api/models/<model_id>/ingest', methods=['GET'])
+def get_ingest_status(model_id=DEFAULT_MODEL_ID):
+    """
+    Buffer statistics and cumulative drift over every record ingested since startup.
+
+    With ?approximate=1 the drift is scored from the baseline sketches stored
+    in the profile against the production sketches folded in at ingest.
+    """
+    model = resolve_model(model_id)
+    if model is None:
+        return model_not_found(model_id)
+    baseline = get_model_baseline(model)
+    if baseline is None:
+        return jsonify({"error": "Failed to load data"}), 500
+    state = get_ingest(model, baseline)
+    approximate = request.args.get('approximate', '').lower() in ('1', 'true', 'yes')
+    with state.lock:
+        if approximate:
+            production = state.accumulator.feature_sketches()
+        else:
+            drift = state.accumulator.finalize()
+    if approximate:
+        drift = compare_sketches(baseline_sketches(baseline), production, baseline.buckets)
+    response = state.buffer.stats()
+    response["drift"] = drift
+    return jsonify(response)
+
+@app.route('/api/live-drift', methods=['GET'])
+@app.route('/api/models/<model_id>/live-drift', methods=['GET'])
+def get_live_drift(model_id=DEFAULT_MODEL_ID):
+    model = resolve_model(model_id)
+    if model is None:
+        return model_not_found(model_id)
+    monitor = get_monitor(model)
+    if monitor is None:
+        return jsonify({"error": "Failed to load data"}), 500
+
+    window = request.args.get('window')
+    if window is None:
+        return jsonify(monitor.snapshot())
+    if window not in monitor.windows:
+        return jsonify({"error": f"Unknown window '{window}'"}), 404
+    return jsonify({
+        "window": window,
+        "records_seen": monitor.records_seen,
+        "features": monitor.window_report(window)
+    })
+
+def current_payload(model_id, name, build):
+    """
+    Current rendered payload for a model, reusing the cached drift run (push producer).
+    """
+    model = resolve_model(model_id)
+    if model is None:
+        return None
+    baseline = get_model_baseline(model)
+    if baseline is None:
+        return None
+    run = get_drift_run(model, baseline)
+    if run is None:
+        return None
+    return cached_payload(run, name, lambda: build(run))
+
+def live_payload(model_id):
+    model = resolve_model(model_id)
+    monitor = get_monitor(model) if model is not None else None
+    return monitor.snapshot() if monitor is not None else None
+
+STREAM_CHANNELS = {
+    'dashboard': lambda model_id: current_payload(model_id, 'dashboard', build_dashboard_payload),
+    'drift': lambda model_id: current_payload(model_id, 'drift', build_drift_payload),
+    'live': live_payload
+}
+
+@app.route('/api/stream', methods=['GET'])
+@app.route('/api/models/<model_id>/stream', methods=['GET'])
+def stream_updates(model_id=DEFAULT_MODEL_ID):
+    """
+    Server-Sent Events stream of a channel ('dashboard', 'drift' or 'live').
+
+    Sends a 'snapshot' event with the full payload, then 'delta' events
+    holding JSON Merge Patches only when the payload changes.
+    """
+    channel = request.args.get('channel', 'dashboard')
+    if channel not in STREAM_CHANNELS:
+        return jsonify({"error": f"Unknown channel '{channel}'"}), 404
+    if resolve_model(model_id) is None:
+        return model_not_found(model_id)
+
+    produce = STREAM_CHANNELS[channel]
+    subscription = _broadcaster.subscribe((model_id, channel), lambda: produce(model_id))
+    response = Response(_broadcaster.stream(subscription, request.headers.get('Last-Event-ID')),
+                        mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    # Disable proxy buffering (nginx) so events are delivered immediately
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@app.route('/api/multivariate-drift', methods=['GET'])
+@app.route('/api/models/<model_id>/multivariate-drift', methods=['GET'])
+def get_multivariate_drift(model_id=DEFAULT_MODEL_ID):
+    """
+    Joint drift across all numeric features (correlation and interaction changes).
+
+    Query args: methods (comma separated, default 'pca,classifier,mmd'),
+    max_rows (production rows sampled, default 20000), budget (seconds;
+    methods not started within it are skipped and the result is not cached).
+    """
+    model = resolve_model(model_id)
+    if model is None:
+        return model_not_found(model_id)
+    methods = tuple(m.strip() for m in request.args.get('methods', ','.join(MULTIVARIATE_METHODS)).split(',') if m.strip())
+    unknown = [m for m in methods if m not in MULTIVARIATE_METHODS]
+    if unknown:
+        return jsonify({"error": f"Unknown method '{unknown[0]}'"}), 400
+    try:
+        max_rows = int(request.args.get('max_rows', 20000))
+        budget = float(request.args['budget']) if 'budget' in request.args else None
+    except ValueError:
+        return jsonify({"error": "max_rows and budget must be numbers"}), 400
+
+    baseline = get_model_baseline(model)
+    if baseline is None:
+        return jsonify({"error": "Failed to load data"}), 500
+    fitted = get_multivariate_baseline(model, baseline)
+    run = get_drift_run(model, baseline)
+    if fitted is None or run is None:
+        return jsonify({"error": "Failed to load data"}), 500
+
+    def build():
+        return detect_multivariate_drift(fitted, run.production_df, methods, max_rows, budget)
+    if budget is not None:
+        return jsonify(build())
+    return jsonify(cached_payload(run, ('multivariate', methods, max_rows), build))
+
+def retraining_costs():
+    """
+    What-if cost parameters from the query string (config defaults).
+
+    Returns:
+        tuple: (retrain_cost, error_cost, age_days, schedules), or None if invalid.
+    """
+    try:
+        retrain_cost = float(request.args.get('retrain_cost', config.RETRAIN_COST))
+        error_cost = float(request.args.get('error_cost', config.ERROR_COST))
+        age_days = float(request.args.get('age_days', config.BASELINE_AGE_DAYS))
+        schedules = tuple(float(s) for s in request.args['schedules'].split(',')) if 'schedules' in request.args else SCHEDULES
+    except ValueError:
+        return None
+    if retrain_cost < 0 or error_cost < 0 or age_days <= 0 or not schedules or min(schedules) <= 0:
+        return None
+    return retrain_cost, error_cost, age_days, schedules
+
+def invalid_costs_response():
+    return jsonify({"error": "retrain_cost and error_cost must be non-negative numbers, "
+                             "age_days and schedules (comma separated days) positive"}), 400
+
+@app.route('/api/retraining', methods=['GET'])
+@app.route('/api/models/<model_id>/retraining', methods=['GET'])
+def get_retraining(model_id=DEFAULT_MODEL_ID):
+    """
+    Estimated production accuracy and the cost of each retraining schedule.
+
+    Query args: retrain_cost, error_cost, age_days (days since the training
+    window), schedules (comma separated intervals in days).
+    """
+    model = resolve_model(model_id)
+    if model is None:
+        return model_not_found(model_id)
+    costs = retraining_costs()
+    if costs is None:
+        return invalid_costs_response()
+    retrain_cost, error_cost, age_days, schedules = costs
+
+    baseline = get_model_baseline(model)
+    if baseline is None:
+        return jsonify({"error": "Failed to load data"}), 500
+    run = get_drift_run(model, baseline)
+    if run is None:
+        return jsonify({"error": "Failed to load data"}), 500
+    estimate = retraining_estimate(model, run)
+    if estimate is None:
+        return jsonify({"error": f"Training data has no '{config.LABEL_COLUMN}' label column"}), 404
+    volume = run.n_rows / age_days
+    plan = recommend([estimate], volume, age_days, retrain_cost, error_cost, schedules)[0]
+    return jsonify({"model_id": model.id, "estimate": estimate, "predictions_per_day": round(volume, 2), **plan})
+
+@app.route('/api/retraining/fleet', methods=['GET', 'POST'])
+def get_fleet_retraining():
+    """
+    Retraining recommendations for every registered model (or the ids in the
+    JSON body's "models"), with all schedules evaluated in one batch.
+    Models without labeled training data are listed under "skipped".
+    """
+    costs = retraining_costs()
+    if costs is None:
+        return invalid_costs_response()
+    retrain_cost, error_cost, age_days, schedules = costs
+    payload = request.get_json(silent=True) or {}
+    ids = payload.get('models')
+    models = list_models() if ids is None else [m for m in map(resolve_model, ids) if m is not None]
+
+    rows, estimates, volumes, skipped = [], [], [], []
+    for model in models:
+        baseline = get_model_baseline(model)
+        run = get_drift_run(model, baseline) if baseline is not None else None
+        estimate = retraining_estimate(model, run) if run is not None else None
+        if estimate is None:
+            skipped.append(model.id)
+            continue
+        rows.append(model)
+        estimates.append(estimate)
+        volumes.append(run.n_rows / age_days)
+
+    results = []
+    if rows:
+        plans = recommend(estimates, np.array(volumes), age_days, retrain_cost, error_cost, schedules)
+        for model, estimate, volume, plan in zip(rows, estimates, volumes, plans):
+            results.append({"model_id": model.id, "estimate": estimate,
+                            "predictions_per_day": round(volume, 2), **plan})
+        # Models due for retraining first, then by error cost they currently add
+        results.sort(key=lambda r: (r['action'] != 'RETRAIN_URGENT', -r['daily_cost_now']))
+    return jsonify({"models": results, "skipped": skipped})
+
+@app.route('/api/segment-drift', methods=['GET'])
+@app.route('/api/models/<model_id>/segment-drift', methods=['GET'])
+def get_segment_drift(model_id=DEFAULT_MODEL_ID):
+    """
+    Drift per production segment, most severe first.
+
+    Query args: by (comma separated key columns, required), limit (default 50),
+    min_rows (default 30).
+    """
+    model = resolve_model(model_id)
+    if model is None:
+        return model_not_found(model_id)
+    by = tuple(col.strip() for col in request.args.get('by', '').split(',') if col.strip())
+    if not by:
+        return jsonify({"error": "by is required"}), 400
+    try:
+        limit = int(request.args.get('limit', 50))
+        min_rows = int(request.args.get('min_rows', 30))
+    except ValueError:
+        return jsonify({"error": "limit and min_rows must be integers"}), 400
+
+    baseline = get_model_baseline(model)
+    if baseline is None:
+        return jsonify({"error": "Failed to load data"}), 500
+    try:
+        available = set(list_columns(model.production_path))
+    except Exception as e:
+        print(f"Error loading data from {model.production_path}: {e}")
+        return jsonify({"error": "Failed to load data"}), 500
+    missing = [col for col in by if col not in available]
+    if missing:
+        return jsonify({"error": f"Unknown column '{missing[0]}'"}), 400
+    run = get_drift_run(model, baseline)
+    if run is None:
+        return jsonify({"error": "Failed to load data"}), 500
+
+    def build():
+        # Key columns that are not profiled are not part of the cached run's frame
+        production_df = run.production_df
+        extra = [col for col in by if col not in production_df.columns]
+        if extra:
+            keys = load_data(model.production_path, columns=extra)
+            if keys is None or len(keys) != len(production_df):
+                raise RuntimeError("Production data changed while loading segment keys")
+            production_df = production_df.assign(**{col: keys[col].to_numpy() for col in extra})
+        return detect_segmented_drift(baseline, production_df, list(by), min_rows, limit)
+    try:
+        payload = cached_payload(run, ('segments', by, min_rows, limit), build)
+    except RuntimeError as e:
+        return jsonify({"error": str(e)}), 409
+    return jsonify(payload)
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """
+    Poll a background job; ?wait=<seconds> blocks until it finishes (up to 30s).
+    """
+    try:
+        wait = min(float(request.args.get('wait', 0)), 30.0)
+    except ValueError:
+        return jsonify({"error": "wait must be a number"}), 400
+    job = get_jobs().wait(job_id, wait) if wait > 0 else get_jobs().get(job_id)
+    if job is None:
+        return jsonify({"error": f"Job '{job_id}' not found"}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/api/history', methods=['GET'])
+@app.route('/api/models/<model_id>/history', methods=['GET'])
+def get_drift_history(model_id=DEFAULT_MODEL_ID):
+    """
+    Drift time series from the history store.
+
+    Query args: feature, window (default 'batch'), days (default 30) or
+    start/end epoch seconds, resolution ('auto', 'raw', 'hour', 'day').
+    """
+    if resolve_model(model_id) is None:
+        return model_not_found(model_id)
+    try:
+        end = float(request.args.get('end', time.time()))
+        start = float(request.args.get('start', end - float(request.args.get('days', 30)) * 86400))
+    except ValueError:
+        return jsonify({"error": "start, end and days must be numbers"}), 400
+    resolution = request.args.get('resolution', 'auto')
+    if resolution not in ('auto', 'raw', 'hour', 'day'):
+        return jsonify({"error": f"Unknown resolution '{resolution}'"}), 400
+
+    result = get_history().query(model_id, start, end, request.args.get('feature'),
+                                 request.args.get('window', BATCH_WINDOW), resolution)
+    result.update({"model_id": model_id, "start": start, "end": end})
+    return jsonify(result)
+
+@app.route('/api/models', methods=['GET'])
+def get_models():
+    scheduler = get_scheduler()
+    models = []
+    for model in list_models():
+        entry = model.to_dict()
+        entry["last_scan"] = scheduler.status.get(model.id)
+        models.append(entry)
+    return jsonify({"models": models})
+
+@app.route('/api/models', methods=['POST'])
+def post_model():
+    payload = request.get_json(silent=True) or {}
+    try:
+        model = get_registry().register(payload['id'], payload['training_path'], payload['production_path'],
+                                        payload.get('buckets', 10), payload.get('group', 'default'),
+                                        payload.get('name'))
+    except KeyError as e:
+        return jsonify({"error": f"Missing field {e}"}), 400
+    except (ValueError, TypeError) as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(model.to_dict()), 201
+
+@app.route('/api/models/<model_id>', methods=['GET'])
+def get_model(model_id):
+    model = resolve_model(model_id)
+    if model is None:
+        return model_not_found(model_id)
+    entry = model.to_dict()
+    entry["last_scan"] = get_scheduler().status.get(model.id)
+    return jsonify(entry)
+
+@app.route('/api/models/<model_id>', methods=['DELETE'])
+def delete_model(model_id):
+    if not get_registry().remove(model_id):
+        return model_not_found(model_id)
+    _report_cache.invalidate(lambda k: k[:2] == ('drift', model_id))
+    with _fitted_lock:
+        for key in [key for key in _fitted if key[1] == model_id]:
+            del _fitted[key]
+    with _state_lock:
+        _monitors.pop(model_id, None)
+    return jsonify({"deleted": model_id})
+
+@app.route('/api/alerts/rules', methods=['GET'])
+def get_alert_rules():
+    model_id = request.args.get('model_id')
+    return jsonify({"rules": [rule.to_dict() for rule in get_alerts().rules(model_id)]})
+
+@app.route('/api/alerts/rules', methods=['POST'])
+def post_alert_rule():
+    """
+    Create an alert rule, e.g.
+    {"model_id": "default", "feature": "income", "metric": "psi", "operator": ">",
+     "threshold": 0.25, "duration": 3600, "hysteresis": 0.05, "severity": "critical"}.
+    """
+    spec = request.get_json(silent=True) or {}
+    error = validate_rule(spec)
+    if error:
+        return jsonify({"error": error}), 400
+    if resolve_model(spec['model_id']) is None:
+        return model_not_found(spec['model_id'])
+    rule = AlertRule(None, spec['model_id'], spec['metric'], spec['operator'], spec['threshold'],
+                     spec.get('feature', '*'), spec.get('window', BATCH_WINDOW), spec.get('duration', 0),
+                     spec.get('hysteresis', 0), spec.get('severity', 'warning'), spec.get('channels', []),
+                     spec.get('name'), spec.get('enabled', True))
+    engine = get_alerts()
+    rule.id = get_registry().database.insert_alert_rule(
+        rule.name, rule.model_id, rule.window_name, rule.feature, rule.metric, rule.operator,
+        rule.threshold, rule.duration, rule.hysteresis, rule.severity, json.dumps(rule.channels), rule.enabled)
+    engine.add_rule(rule)
+    return jsonify(rule.to_dict()), 201
+
+@app.route('/api/alerts/rules/<int:rule_id>', methods=['DELETE'])
+def delete_alert_rule(rule_id):
+    engine = get_alerts()
+    if not get_registry().database.delete_alert_rule(rule_id):
+        return jsonify({"error": f"Rule {rule_id} not found"}), 404
+    engine.remove_rule(rule_id)
+    return jsonify({"deleted": rule_id})
+
+@app.route('/api/alerts', methods=['GET'])
+@app.route('/api/models/<model_id>/alerts', methods=['GET'])
+def get_alert_state(model_id=None):
+    """
+    Firing alerts and the most recent notifications (local sink).
+    """
+    engine = get_alerts()
+    model_id = model_id or request.args.get('model_id')
+    recent = engine.sink.recent(model_id=model_id) if isinstance(engine.sink, LocalSink) else []
+    return jsonify({"active": engine.active(model_id), "recent": recent, "rules": engine.rule_count()})
+
+@app.route('/api/scan', methods=['POST'])
+def post_scan():
+    """
+    Queue background drift scans for every model (or the ids given in the body).
+    """
+    payload = request.get_json(silent=True) or {}
+    ids = payload.get('models')
+    models = list_models() if ids is None else [m for m in map(resolve_model, ids) if m is not None]
+    scheduler = get_scheduler()
+    queued = scheduler.submit_all(models)
+    return jsonify({"queued": queued, "pending": scheduler.pending(), "running": scheduler.running()}), 202
+
+@app.route('/api/scan', methods=['GET'])
+def get_scan_status():
+    scheduler = get_scheduler()
+    return jsonify({
+        "pending": scheduler.pending(),
+        "running": scheduler.running(),
+        "models": scheduler.status
+    })
+
+# Request instrumentation
+
+@app.before_request
+def start_request_timing():
+    request.environ['driftguard.start'] = time.perf_counter()
+    if not (config.PROFILING_ENABLED and request.args.get('profile') == '1'):
+        return None
+    if not _profile_lock.acquire(blocking=False):
+        return jsonify({"error": "Another profiled request is in progress"}), 429
+    profiler = cProfile.Profile()
+    request.environ['driftguard.profile'] = {
+        'profiler': profiler,
+        'tracemalloc': not tracemalloc.is_tracing()
+    }
+    if request.environ['driftguard.profile']['tracemalloc']:
+        tracemalloc.start()
+    start_trace()
+    profiler.enable()
+    return None
+
+@app.after_request
+def finish_request_timing(response):
+    state = request.environ.get('driftguard.profile')
+    if state is not None:
+        state['profiler'].disable()
+        spans = stop_trace()
+        if response.is_json and not response.direct_passthrough:
+            response.set_data(json.dumps({
+                "result": response.get_json(),
+                "profile": profile_report(state, spans)
+            }))
+            response.headers.pop('ETag', None)
+    start = request.environ.get('driftguard.start')
+    if start is not None and config.METRICS_ENABLED:
+        rule = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        METRICS.observe('driftguard_request_seconds', time.perf_counter() - start,
+                        endpoint=rule, method=request.method, status=str(response.status_code))
+    return response
+
+@app.teardown_request
+def release_profiler(exc):
+    # Also runs when the view raised, so the lock and tracemalloc are never left held
+    state = request.environ.pop('driftguard.profile', None)
+    if state is None:
+        return
+    state['profiler'].disable()
+    stop_trace()
+    if state['tracemalloc']:
+        tracemalloc.stop()
+    _profile_lock.release()
+
+def profile_report(state, spans):
+    """
+    Phase timings, hottest functions and top allocation sites of one request.
+    """
+    stats = pstats.Stats(state['profiler'])
+    functions = []
+    for (filename, line, function), (calls, _, own, cumulative, _) in sorted(
+            stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:PROFILE_TOP_FUNCTIONS]:
+        functions.append({
+            "function": f"{os.path.basename(filename)}:{line}({function})",
+            "calls": calls,
+            "own_seconds": round(own, 6),
+            "cumulative_seconds": round(cumulative, 6)
+        })
+    allocations = []
+    if tracemalloc.is_tracing():
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, cProfile.__file__),
+            tracemalloc.Filter(False, tracemalloc.__file__)
+        ])
+        for stat in snapshot.statistics('lineno')[:PROFILE_TOP_ALLOCATIONS]:
+            frame = stat.traceback[0]
+            allocations.append({
+                "location": f"{os.path.basename(frame.filename)}:{frame.lineno}",
+                "bytes": stat.size,
+                "count": stat.count
+            })
+    return {
+        "phases": summarize_trace(spans),
+        "spans": spans,
+        "functions": functions,
+        "allocations": allocations
+    }
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """
+    Prometheus scrape endpoint: phase, feature and request latency histograms,
+    error and row counters, process memory gauges.
+    """
+    if not config.METRICS_ENABLED:
+        return jsonify({"error": "Metrics are disabled"}), 404
+    return Response(METRICS.render(process_gauges()), mimetype='text/plain; version=0.0.4')
+
+def preload():
+    """
+    Load every registered model's baseline profile into the process-wide
+    profile cache, then freeze the heap for forked workers.
+
+    Profiles are memory-mapped read-only, so workers forked afterwards
+    share their pages; gc.freeze() moves everything allocated so far out of
+    the collector's reach, so collections in a worker do not write to (and
+    copy) the inherited objects. The registry's SQLite connection is closed
+    again, since connections must not cross a fork; each worker reopens its own.
+    """
+    global _registry, _history
+    started = time.perf_counter()
+    loaded = 0
+    for model in list_models():
+        if get_model_baseline(model) is not None:
+            loaded += 1
+    with _state_lock:
+        if _registry is not None:
+            _registry.database.close()
+            _registry = None
+            _history = None
+    gc.collect()
+    gc.freeze()
+    print(f"Preloaded {loaded} baseline profile(s) in {time.perf_counter() - started:.2f}s")
+
+if config.PRELOAD_BASELINES:
+    preload()
 
 if __name__ == '__main__':
-    app.run(debug=True, port=5000)
+    if config.SCAN_INTERVAL > 0:
+        get_scheduler().run_periodic(list_models, config.SCAN_INTERVAL)
+    if config.SERVER_THREADS > 0:
+        try:
+            from waitress import serve
+        except ImportError:
+            print("waitress is not installed; using the Flask development server")
+            app.run(debug=True, port=config.SERVER_PORT, threaded=True)
+        else:
+            serve(app, port=config.SERVER_PORT, threads=config.SERVER_THREADS)
+    else:
+        app.run(debug=True, port=config.SERVER_PORT, threaded=True)
 
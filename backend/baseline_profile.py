@@ -0,0 +1,397 @@
+import os
+import sys
+import hashlib
+import threading
+import numpy as np
+
+from data_sources import discard_column_store, file_version
+from drift_detection import load_data, quantile_edges_matrix, bin_counts_matrix
+from categorical import CategoricalProfile, build_categorical_profile, is_categorical, DEFAULT_TOP_K
+from sketches import QuantileSketch
+from snapshot import read_snapshot, write_snapshot
+
+PROFILE_FORMAT_VERSION = 5
+# Accuracy parameter of the baseline quantile sketches used by approximate scoring
+SKETCH_K = 200
+# Largest sorted sample kept per feature for KS; longer columns keep evenly
+# spaced order statistics, so KS against the sample is within 1/size
+SORTED_SAMPLE_SIZE = 100000
+
+
+class FeatureProfile:
+    """
+    Precomputed baseline state for a single numerical feature.
+
+    Holds everything the drift metrics need from the training side so the
+    raw training column never has to be re-read or re-sorted:
+    quantile bin edges, bucket counts on those edges, a sorted sample of at
+    most SORTED_SAMPLE_SIZE values used for KS, descriptive statistics and
+    the number of values n (edges, counts and stats cover every value).
+
+    Profiles loaded from disk hold read-only views onto the mapped profile
+    file, so the sorted samples stay in the page cache (shared between
+    worker processes) instead of each process's heap.
+    """
+
+    __slots__ = ('name', 'edges', 'counts', 'sorted_values', 'stats', 'n')
+
+    def __init__(self, name, edges, counts, sorted_values, stats, n=None):
+        # Names are interned: report dicts, monitors and caches all share one string per feature
+        self.name = sys.intern(name) if isinstance(name, str) else name
+        self.edges = edges
+        self.counts = counts
+        self.sorted_values = sorted_values
+        self.stats = stats
+        self.n = len(sorted_values) if n is None else int(n)
+
+
+class BaselineProfile:
+    """
+    Baseline profile for one model's training dataset.
+
+    Attributes:
+        features: dict feature_name -> FeatureProfile (numerical columns only).
+        categorical: dict feature_name -> CategoricalProfile.
+        n_rows: Number of rows in the training data.
+        buckets: Number of quantile buckets the edges were built with.
+        sketches: dict feature_name -> QuantileSketch of the training values,
+            built once with the profile for approximate (sketch) scoring.
+        version: Source file version ('<size>-<mtime_ns>'), used for invalidation.
+        content_hash: BLAKE2 digest of the source file at build time.
+    """
+
+    def __init__(self, features, n_rows, buckets=10, source_path=None,
+                 version=None, content_hash=None, categorical=None, sketches=None):
+        self.features = features
+        self.categorical = categorical or {}
+        self.sketches = sketches or {}
+        self.n_rows = n_rows
+        self.buckets = buckets
+        self.source_path = source_path
+        self.version = version
+        self.content_hash = content_hash
+        self._stacked_key = None
+        self._stacked = None
+
+    @property
+    def columns(self):
+        """
+        Every profiled column, numerical and categorical.
+        """
+        return list(self.features) + list(self.categorical)
+
+    def stacked(self, names):
+        """
+        Padded 2-D views of the per-feature edges and counts, for matrix mode.
+
+        Args:
+            names: Feature names, in the row order wanted.
+
+        Returns:
+            tuple: (edges, n_edges, counts, n) where edges is (features x buckets+1)
+            padded with +inf and counts is (features x buckets) padded with 0.
+        """
+        key = tuple(names)
+        if self._stacked_key != key:
+            width = max([len(self.features[n].edges) for n in names] + [self.buckets + 1, 2])
+            edges = np.full((len(names), width), np.inf)
+            counts = np.zeros((len(names), width - 1), dtype=np.int64)
+            n_edges = np.zeros(len(names), dtype=np.intp)
+            n = np.zeros(len(names), dtype=np.int64)
+            for i, name in enumerate(names):
+                feature = self.features[name]
+                n_edges[i] = len(feature.edges)
+                edges[i, :n_edges[i]] = feature.edges
+                counts[i, :len(feature.counts)] = feature.counts
+                n[i] = feature.n
+            self._stacked = (edges, n_edges, counts, n)
+            self._stacked_key = key
+        return self._stacked
+
+
+def file_hash(filepath, chunk_size=1 << 20):
+    """
+    BLAKE2b digest of a file's contents, read in fixed-size chunks.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def rank_sample(sorted_values, size=SORTED_SAMPLE_SIZE):
+    """
+    At most size evenly spaced order statistics of a sorted column (all of it if shorter).
+    """
+    if size is None or len(sorted_values) <= size:
+        return sorted_values
+    return sorted_values[np.linspace(0, len(sorted_values) - 1, size).round().astype(np.int64)]
+
+
+def source_hash(path):
+    """
+    Content digest of a training file (None for directory sources).
+    """
+    return file_hash(path) if os.path.isfile(path) else None
+
+
+def describe(sorted_values):
+    """
+    Descriptive statistics for a sorted, NaN-free column.
+    """
+    return {
+        "mean": float(np.mean(sorted_values)),
+        "median": float(np.median(sorted_values)),
+        "std": float(np.std(sorted_values)),
+        "min": float(sorted_values[0]),
+        "max": float(sorted_values[-1])
+    }
+
+
+def build_baseline_profile(training_df, buckets=10, source_path=None, categorical_features=None,
+                           top_k=DEFAULT_TOP_K, sketch_k=SKETCH_K, sorted_sample_size=SORTED_SAMPLE_SIZE):
+    """
+    Build a baseline profile from a training DataFrame.
+
+    Args:
+        training_df: DataFrame, baseline data.
+        buckets: Number of quantile buckets per feature.
+        source_path: Optional path of the file the DataFrame was loaded from.
+        categorical_features: Columns to profile as categories. Defaults to
+            every non-numeric column; numeric columns listed here (e.g.
+            integer codes) are profiled as categories instead of numbers.
+        top_k: Categories kept per categorical feature before pooling into 'other'.
+        sketch_k: Accuracy parameter of the per-feature quantile sketches.
+        sorted_sample_size: Largest sorted sample kept per feature for KS.
+
+    Returns:
+        BaselineProfile
+    """
+    if categorical_features is None:
+        categorical_features = [col for col in training_df.columns if is_categorical(training_df[col])]
+    categorical_features = [col for col in categorical_features if col in training_df.columns]
+    numerical_cols = [col for col in training_df.select_dtypes(include=[np.number]).columns
+                      if col not in categorical_features]
+
+    # Profile the whole numeric block at once: one sort, vectorized edges and counts
+    block = training_df[numerical_cols].to_numpy(dtype=float).T
+    sorted_block = np.sort(block, axis=1)
+    n_valid = np.sum(~np.isnan(block), axis=1)
+    edges, n_edges = quantile_edges_matrix(sorted_block, n_valid, buckets)
+    counts = bin_counts_matrix(block, edges, n_edges)
+
+    features = {}
+    sketches = {}
+    for i, col in enumerate(numerical_cols):
+        if n_valid[i] == 0:
+            continue
+        values = sorted_block[i, :n_valid[i]]
+        feature = FeatureProfile(col, edges[i, :n_edges[i]],
+                                 counts[i, :max(n_edges[i] - 1, 0)],
+                                 rank_sample(values, sorted_sample_size).copy(),
+                                 describe(values), len(values))
+        features[feature.name] = feature
+        sketches[feature.name] = QuantileSketch(sketch_k, seed=i).update(values)
+
+    categorical = {}
+    for col in categorical_features:
+        profile = build_categorical_profile(col, training_df[col], top_k)
+        if profile is not None:
+            categorical[profile.name] = profile
+
+    version = None
+    content_hash = None
+    if source_path is not None and os.path.exists(source_path):
+        version = file_version(source_path)
+        content_hash = source_hash(source_path)
+
+    return BaselineProfile(features, len(training_df), buckets, source_path,
+                           version, content_hash, categorical, sketches)
+
+
+def save_baseline_profile(profile, filepath):
+    """
+    Persist a baseline profile as a memory-mappable snapshot.
+
+    Per-feature arrays are concatenated into flat struct-of-arrays columns
+    (edges, counts, sorted values, quantile sketch levels) with offsets, so
+    a load maps a handful of arrays instead of parsing one entry per feature.
+    """
+    names = list(profile.features.keys())
+    features = [profile.features[n] for n in names]
+    categorical = list(profile.categorical.values())
+    sketched = [n for n in names if n in profile.sketches]
+    sketches = [profile.sketches[n] for n in sketched]
+    levels = [items for sketch in sketches for items in sketch.levels]
+    meta = {
+        "format": PROFILE_FORMAT_VERSION,
+        "features": names,
+        "n_rows": profile.n_rows,
+        "buckets": profile.buckets,
+        "source_path": profile.source_path,
+        "version": profile.version,
+        "content_hash": profile.content_hash,
+        "stats": [f.stats for f in features],
+        "n": [f.n for f in features],
+        "categorical": [{"name": cat.name, "n_distinct": cat.n_distinct} for cat in categorical],
+        "sketches": [{"name": name, "k": sketch.k, "c": sketch.c, "n": sketch.n, "min": sketch.min,
+                      "max": sketch.max, "variance": sketch.variance, "levels": len(sketch.levels)}
+                     for name, sketch in zip(sketched, sketches)]
+    }
+    arrays = {
+        "edges": _concat([f.edges for f in features], float),
+        "edge_offsets": _offsets([f.edges for f in features]),
+        "counts": _concat([f.counts for f in features], np.int64),
+        "count_offsets": _offsets([f.counts for f in features]),
+        "sorted": _concat([f.sorted_values for f in features], float),
+        "sorted_offsets": _offsets([f.sorted_values for f in features]),
+        "sketch_items": _concat(levels, float),
+        "sketch_offsets": _offsets(levels)
+    }
+    for i, cat in enumerate(categorical):
+        arrays[f"c{i}_categories"] = np.asarray(cat.categories, dtype=str)
+        arrays[f"c{i}_counts"] = cat.counts
+    write_snapshot(filepath, meta, arrays)
+
+
+def _concat(parts, dtype):
+    return np.concatenate([np.asarray(p, dtype=dtype) for p in parts]) if parts else np.zeros(0, dtype=dtype)
+
+
+def _offsets(parts):
+    return np.concatenate([[0], np.cumsum([len(p) for p in parts])]).astype(np.int64)
+
+
+def read_baseline_profile(filepath):
+    """
+    Load a baseline profile written by save_baseline_profile.
+
+    Arrays are read-only views onto the mapped file (see read_snapshot).
+
+    Returns:
+        BaselineProfile, or None if the file is missing or unreadable.
+    """
+    try:
+        meta, data = read_snapshot(filepath)
+        if meta.get("format") != PROFILE_FORMAT_VERSION:
+            return None
+        edges, edge_offsets = data["edges"], data["edge_offsets"]
+        counts, count_offsets = data["counts"], data["count_offsets"]
+        values, sorted_offsets = data["sorted"], data["sorted_offsets"]
+        features = {}
+        for i, name in enumerate(meta["features"]):
+            feature = FeatureProfile(
+                name,
+                edges[edge_offsets[i]:edge_offsets[i + 1]],
+                counts[count_offsets[i]:count_offsets[i + 1]],
+                values[sorted_offsets[i]:sorted_offsets[i + 1]],
+                meta["stats"][i],
+                meta["n"][i]
+            )
+            features[feature.name] = feature
+        categorical = {}
+        for i, entry in enumerate(meta["categorical"]):
+            profile = CategoricalProfile(
+                entry["name"],
+                data[f"c{i}_categories"],
+                data[f"c{i}_counts"],
+                entry["n_distinct"]
+            )
+            categorical[profile.name] = profile
+        items, item_offsets = data["sketch_items"], data["sketch_offsets"]
+        sketches = {}
+        level = 0
+        for entry in meta["sketches"]:
+            levels = [items[item_offsets[h]:item_offsets[h + 1]] for h in range(level, level + entry["levels"])]
+            level += entry["levels"]
+            sketches[sys.intern(entry["name"])] = QuantileSketch.from_state(dict(entry, levels=levels))
+    except Exception as e:
+        print(f"Error loading baseline profile from {filepath}: {e}")
+        return None
+
+    return BaselineProfile(features, meta["n_rows"], meta["buckets"],
+                           meta["source_path"], meta["version"],
+                           meta["content_hash"], categorical, sketches)
+
+
+def profile_path_for(data_path, profile_dir, buckets=10):
+    """
+    Location of the persisted profile for a given training data file and bucket count.
+
+    The name carries a short digest of the absolute path, so training files
+    with the same basename in different directories get separate profiles,
+    and the bucket count, so profiles with different bins never overwrite
+    each other.
+    """
+    base = os.path.splitext(os.path.basename(data_path))[0]
+    digest = hashlib.blake2b(os.path.abspath(data_path).encode('utf-8'), digest_size=8).hexdigest()
+    return os.path.join(profile_dir, f"{base}-{digest}-b{buckets}.profile.bin")
+
+
+_profile_cache = {}
+_profile_lock = threading.Lock()
+# One lock per training file so profiles of different models build concurrently
+_profile_key_locks = {}
+
+
+def get_baseline_profile(data_path, profile_dir=None, buckets=10):
+    """
+    Return the baseline profile for a training data file, building it at most once.
+
+    Lookup order: in-process cache, persisted profile in profile_dir, and
+    finally a full load of the training data. A profile is only reused while
+    the source file's version (size and mtime) is unchanged; a persisted
+    profile must also match the file's content hash.
+
+    Args:
+        data_path: Path to the training data file.
+        profile_dir: Directory for persisted profiles (None disables persistence).
+        buckets: Number of quantile buckets per feature.
+
+    Returns:
+        BaselineProfile, or None if the training data could not be loaded.
+    """
+    try:
+        version = file_version(data_path)
+    except OSError as e:
+        print(f"Error loading data from {data_path}: {e}")
+        return None
+
+    key = (os.path.abspath(data_path), buckets)
+    with _profile_lock:
+        key_lock = _profile_key_locks.setdefault(key, threading.Lock())
+    with key_lock:
+        profile = _profile_cache.get(key)
+        if profile is not None and profile.version == version:
+            return profile
+
+        profile = None
+        if profile_dir is not None:
+            persisted_path = profile_path_for(data_path, profile_dir, buckets)
+            if os.path.exists(persisted_path):
+                persisted = read_baseline_profile(persisted_path)
+                if (persisted is not None and persisted.version == version
+                        and persisted.buckets == buckets):
+                    # The content hash catches files rewritten in place with the same
+                    # size and mtime; their converted column store is just as stale
+                    if persisted.content_hash == source_hash(data_path):
+                        profile = persisted
+                    else:
+                        discard_column_store(data_path)
+
+        if profile is None:
+            training_df = load_data(data_path)
+            if training_df is None:
+                return None
+            profile = build_baseline_profile(training_df, buckets, data_path)
+            if profile_dir is not None:
+                try:
+                    os.makedirs(profile_dir, exist_ok=True)
+                    save_baseline_profile(profile, profile_path_for(data_path, profile_dir, buckets))
+                except OSError as e:
+                    print(f"Error saving baseline profile: {e}")
+
+        with _profile_lock:
+            _profile_cache[key] = profile
+        return profile
@@ -0,0 +1,167 @@
+import sys
+import numpy as np
+import pandas as pd
+
+from drift_detection import binned_metric_arrays, drift_status
+
+# Categories kept per feature; everything else is pooled into an 'other' bucket
+DEFAULT_TOP_K = 50
+OTHER = '__other__'
+
+
+class CategoricalProfile:
+    """
+    Baseline state for one categorical feature.
+
+    Keeps the top_k most frequent baseline categories and their counts; the
+    final count is the pooled 'other' bucket (every remaining category, and
+    in production every category unseen in the top_k).
+    """
+
+    __slots__ = ('name', 'categories', 'counts', 'n_distinct', '_index')
+
+    def __init__(self, name, categories, counts, n_distinct):
+        self.name = sys.intern(name) if isinstance(name, str) else name
+        self.categories = categories
+        self.counts = counts
+        self.n_distinct = n_distinct
+        self._index = None
+
+    @property
+    def n(self):
+        return int(np.sum(self.counts))
+
+    @property
+    def index(self):
+        if self._index is None:
+            self._index = pd.Index(self.categories)
+        return self._index
+
+
+def is_categorical(series):
+    """
+    True for columns that should be profiled as categories rather than numbers.
+    """
+    return not pd.api.types.is_numeric_dtype(series.dtype) or isinstance(series.dtype, pd.CategoricalDtype)
+
+
+def category_codes(values):
+    """
+    Integer codes (-1 for missing) and their category labels (as strings).
+
+    Dictionary-encoded (pandas Categorical) columns reuse their codes as-is;
+    anything else is hash-factorized once in C, never counted per value in Python.
+    """
+    if isinstance(values, pd.Series) and isinstance(values.dtype, pd.CategoricalDtype):
+        codes = values.cat.codes.to_numpy()
+        uniques = np.asarray(values.cat.categories)
+    else:
+        codes, uniques = pd.factorize(values)
+    return codes, np.asarray(uniques).astype(str)
+
+
+def build_categorical_profile(name, values, top_k=DEFAULT_TOP_K):
+    """
+    Build a CategoricalProfile from a raw column.
+
+    Returns:
+        CategoricalProfile, or None if the column has no non-null values.
+    """
+    codes, uniques = category_codes(values)
+    codes = codes[codes >= 0]
+    if len(codes) == 0:
+        return None
+    counts = np.bincount(codes, minlength=len(uniques))
+    present = np.flatnonzero(counts)
+    if len(present) > top_k:
+        present = present[np.argpartition(-counts[present], top_k - 1)[:top_k]]
+    # Most frequent first, ties broken by label so profiles are reproducible
+    top = present[np.lexsort((uniques[present], -counts[present]))]
+    kept = counts[top]
+    return CategoricalProfile(name, uniques[top], np.append(kept, len(codes) - np.sum(kept)),
+                              int(np.count_nonzero(counts)))
+
+
+def categorical_counts(profile, values):
+    """
+    Production counts on the profile's categories (+ 'other'), via one bincount.
+    """
+    codes, uniques = category_codes(values)
+    other = len(profile.categories)
+    lookup = profile.index.get_indexer(uniques)
+    lookup[lookup < 0] = other
+    codes = codes[codes >= 0]
+    return np.bincount(lookup[codes], minlength=other + 1)
+
+
+def chi_square(expected_counts, actual_counts):
+    """
+    Pearson chi-square test of homogeneity on a 2 x buckets contingency table.
+
+    Returns:
+        tuple: (statistic, p_value)
+    """
+    table = np.vstack([expected_counts, actual_counts]).astype(float)
+    table = table[:, table.sum(axis=0) > 0]
+    if table.shape[1] < 2 or np.any(table.sum(axis=1) == 0):
+        return 0.0, 1.0
+    expected = table.sum(axis=1, keepdims=True) * table.sum(axis=0, keepdims=True) / table.sum()
+    statistic = float(np.sum((table - expected) ** 2 / expected))
+    from scipy.special import chdtrc
+    return statistic, float(chdtrc(table.shape[1] - 1, statistic))
+
+
+def score_categorical(profile, values):
+    """
+    Categorical drift metrics for one production column.
+
+    Returns:
+        dict: {'psi', 'kl', 'js', 'chi2', 'p_value', 'status', 'type'}, or None
+        if the column has no non-null values.
+    """
+    return score_categorical_counts(profile, categorical_counts(profile, values))
+
+
+def score_categorical_counts(profile, actual_counts):
+    """
+    Categorical drift metrics from production counts on the profile's
+    categories (+ 'other'), e.g. summed over chunks with categorical_counts.
+
+    Returns:
+        dict: As score_categorical, or None if the counts are all zero.
+    """
+    n_actual = int(np.sum(actual_counts))
+    if n_actual == 0:
+        return None
+    expected_counts = profile.counts
+    with np.errstate(divide='ignore', invalid='ignore'):
+        metrics = binned_metric_arrays(expected_counts, profile.n, actual_counts, n_actual)
+    psi = float(metrics['psi'])
+    kl = float(metrics['kl'])
+    chi2, p_value = chi_square(expected_counts, actual_counts)
+    return {
+        'psi': round(psi, 4),
+        'kl': round(kl, 4),
+        'js': round(float(metrics['js']), 4),
+        'chi2': round(chi2, 4),
+        'p_value': round(p_value, 6),
+        'status': drift_status(psi, 0.0, kl),
+        'type': 'categorical'
+    }
+
+
+def category_shares(profile, values):
+    """
+    Baseline vs production share per category (top-k plus 'other'), for charts.
+    """
+    actual_counts = categorical_counts(profile, values)
+    n_actual = max(int(np.sum(actual_counts)), 1)
+    labels = list(profile.categories) + [OTHER]
+    return [
+        {
+            "category": label,
+            "baseline": float(expected / profile.n),
+            "production": float(actual / n_actual)
+        }
+        for label, expected, actual in zip(labels, profile.counts, actual_counts)
+    ]
@@ -0,0 +1,101 @@
+import os
+
+try:
+    from dotenv import load_dotenv
+    load_dotenv()
+except ImportError:
+    pass
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _env_int(name, default):
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        print(f"Invalid value for {name}, using {default}")
+        return default
+
+def _env_float(name, default):
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        print(f"Invalid value for {name}, using {default}")
+        return default
+
+# Data locations
+DATA_DIR = os.environ.get('DRIFTGUARD_DATA_DIR', os.path.join(BASE_DIR, 'data'))
+PROFILE_DIR = os.environ.get('DRIFTGUARD_PROFILE_DIR', os.path.join(BASE_DIR, 'models'))
+TRAINING_DATA_PATH = os.path.join(DATA_DIR, 'training_data.csv')
+PRODUCTION_DATA_PATH = os.path.join(DATA_DIR, 'production_data.csv')
+
+# SQLite store for the model registry
+DATABASE_PATH = os.environ.get('DRIFTGUARD_DATABASE', os.path.join(BASE_DIR, 'models', 'driftguard.db'))
+# Optional JSON file of models to register at startup:
+# [{"id": ..., "training_path": ..., "production_path": ..., "group": ...}, ...]
+MODEL_CONFIG_PATH = os.environ.get('DRIFTGUARD_MODELS')
+
+# Id under which the built-in training/production pair is served
+DEFAULT_MODEL_ID = 'default'
+
+# Drift reports are cached per (model, baseline version, production version, params)
+REPORT_CACHE_TTL = _env_int('DRIFTGUARD_REPORT_CACHE_TTL', 300)
+REPORT_CACHE_SIZE = _env_int('DRIFTGUARD_REPORT_CACHE_SIZE', 64)
+
+# Row sampling for drift scans ('uniform', 'stratified', 'reservoir', 'adaptive'; empty scores every row)
+DRIFT_SAMPLING = os.environ.get('DRIFTGUARD_SAMPLING') or None
+DRIFT_SAMPLE_SIZE = _env_int('DRIFTGUARD_SAMPLE_SIZE', 100000)
+# Comma separated strata columns for 'stratified' sampling (loaded with the profiled columns)
+DRIFT_STRATIFY_BY = tuple(col.strip() for col in os.environ.get('DRIFTGUARD_STRATIFY_BY', '').split(',')
+                          if col.strip()) or None
+# Rows per chunk for bounded-memory drift scans of CSV production files (0 loads the whole file)
+DRIFT_CHUNK_SIZE = _env_int('DRIFTGUARD_CHUNK_SIZE', 0)
+# Score drift scans from quantile/histogram sketches (baseline sketches are stored in the profile)
+DRIFT_APPROXIMATE = os.environ.get('DRIFTGUARD_APPROXIMATE', '0').lower() in ('1', 'true', 'yes')
+
+# Background scanning of registered models
+SCAN_WORKERS = _env_int('DRIFTGUARD_SCAN_WORKERS', min(8, os.cpu_count() or 1))
+SCAN_INTERVAL = _env_int('DRIFTGUARD_SCAN_INTERVAL', 0)  # seconds, 0 disables periodic scans
+
+# Background drift jobs (?async=1 requests)
+JOB_WORKERS = _env_int('DRIFTGUARD_JOB_WORKERS', 4)
+JOB_TTL = _env_int('DRIFTGUARD_JOB_TTL', 600)  # seconds finished jobs stay pollable
+
+# Server-sent drift updates (/api/stream)
+PUSH_INTERVAL = _env_int('DRIFTGUARD_PUSH_INTERVAL', 2)  # seconds between change checks per topic
+PUSH_HEARTBEAT = _env_int('DRIFTGUARD_PUSH_HEARTBEAT', 15)
+
+# Prediction-log ingestion (/api/ingest): per-model append-only segment buffers
+INGEST_DIR = os.environ.get('DRIFTGUARD_INGEST_DIR', os.path.join(DATA_DIR, 'ingest'))
+INGEST_FLUSH_ROWS = _env_int('DRIFTGUARD_INGEST_FLUSH_ROWS', 50000)
+INGEST_FLUSH_INTERVAL = _env_int('DRIFTGUARD_INGEST_FLUSH_INTERVAL', 5)  # seconds
+INGEST_MAX_SEGMENTS = _env_int('DRIFTGUARD_INGEST_MAX_SEGMENTS', 16)
+
+# Alert rule engine: notifications are batched per sink delivery
+ALERT_BATCH_INTERVAL = _env_int('DRIFTGUARD_ALERT_BATCH_INTERVAL', 10)  # seconds
+ALERT_BATCH_SIZE = _env_int('DRIFTGUARD_ALERT_BATCH_SIZE', 100)
+
+# Retraining cost-benefit estimates: labeled baseline rows (label column, plus
+# logged model predictions if present) reweighted to production
+LABEL_COLUMN = os.environ.get('DRIFTGUARD_LABEL_COLUMN', 'defaults')
+PREDICTION_COLUMN = os.environ.get('DRIFTGUARD_PREDICTION_COLUMN', 'prediction')
+RETRAIN_COST = _env_float('DRIFTGUARD_RETRAIN_COST', 500)  # cost of one retraining run
+ERROR_COST = _env_float('DRIFTGUARD_ERROR_COST', 1)  # cost of one wrong prediction
+BASELINE_AGE_DAYS = _env_int('DRIFTGUARD_BASELINE_AGE_DAYS', 30)  # days the production window trails training
+
+# Online monitor window state is snapshotted here (memory-mapped on restart); 0 disables
+MONITOR_SNAPSHOT_DIR = os.environ.get('DRIFTGUARD_MONITOR_SNAPSHOT_DIR', os.path.join(PROFILE_DIR, 'monitors'))
+MONITOR_SNAPSHOT_INTERVAL = _env_int('DRIFTGUARD_MONITOR_SNAPSHOT_INTERVAL', 60)  # seconds
+
+# Instrumentation: phase/endpoint latency histograms at /metrics, and ?profile=1
+# (cProfile + tracemalloc breakdown of one request)
+METRICS_ENABLED = os.environ.get('DRIFTGUARD_METRICS', '1').lower() not in ('0', 'false', 'no')
+PROFILING_ENABLED = os.environ.get('DRIFTGUARD_PROFILING', '1').lower() not in ('0', 'false', 'no')
+
+# Load every model's baseline profile at import, before a pre-forking server
+# (e.g. `gunicorn --preload`) forks its workers, so they share it copy-on-write
+PRELOAD_BASELINES = os.environ.get('DRIFTGUARD_PRELOAD', '0').lower() in ('1', 'true', 'yes')
+
+# Threads for the production WSGI server (waitress); 0 runs the Flask development server.
+# Under gunicorn use a threaded worker instead, e.g. `gunicorn --threads 16 app:app`.
+SERVER_THREADS = _env_int('DRIFTGUARD_SERVER_THREADS', 0)
+SERVER_PORT = _env_int('DRIFTGUARD_PORT', 5000)
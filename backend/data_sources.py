@@ -0,0 +1,251 @@
+import os
+import json
+import shutil
+import numpy as np
+import pandas as pd
+
+COLUMN_STORE_SUFFIX = '.npycols'
+COLUMN_STORE_FORMAT = 1
+# Segment stores inside an append-only ingest directory: seg-<first seq>-<last seq>.npycols
+SEGMENT_PREFIX = 'seg-'
+
+
+def file_version(filepath):
+    """
+    Cheap version key for a data file, based on its size and modification time.
+    """
+    st = os.stat(filepath)
+    return f"{st.st_size}-{st.st_mtime_ns}"
+
+
+def column_store_path(filepath):
+    """
+    Location of the .npy column store converted from a CSV file.
+    """
+    return os.path.splitext(filepath)[0] + COLUMN_STORE_SUFFIX
+
+
+def discard_column_store(filepath):
+    """
+    Remove the column store converted from a CSV file, if any.
+
+    Used when the CSV is known to have changed without its version changing
+    (rewritten in place with the same size and mtime).
+    """
+    shutil.rmtree(column_store_path(filepath), ignore_errors=True)
+
+
+def _read_store_meta(store_path):
+    try:
+        with open(os.path.join(store_path, '_meta.json')) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if meta.get('format') != COLUMN_STORE_FORMAT:
+        return None
+    return meta
+
+
+def write_column_store(df, store_path, source_version=None):
+    """
+    Write a DataFrame as a directory of per-column .npy files.
+
+    Numeric, boolean and datetime columns are stored as-is; other columns
+    are dictionary-encoded (int32 codes, -1 for missing, plus a categories
+    array) so no column ever needs pickling.
+    """
+    tmp_path = f"{store_path}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+
+    columns = []
+    for i, col in enumerate(df.columns):
+        values = df[col].to_numpy()
+        if values.dtype.kind in 'biufcmM':
+            np.save(os.path.join(tmp_path, f"c{i}.npy"), values)
+            columns.append({"name": str(col), "kind": "plain"})
+        else:
+            codes, categories = pd.factorize(df[col])
+            np.save(os.path.join(tmp_path, f"c{i}.npy"), codes.astype(np.int32))
+            np.save(os.path.join(tmp_path, f"c{i}.categories.npy"),
+                    np.asarray(categories, dtype=str))
+            columns.append({"name": str(col), "kind": "dictionary"})
+
+    meta = {
+        "format": COLUMN_STORE_FORMAT,
+        "source_version": source_version,
+        "n_rows": len(df),
+        "columns": columns
+    }
+    with open(os.path.join(tmp_path, '_meta.json'), 'w') as f:
+        json.dump(meta, f)
+
+    shutil.rmtree(store_path, ignore_errors=True)
+    os.replace(tmp_path, store_path)
+
+
+def read_column_store(store_path, columns=None):
+    """
+    Read selected columns of a .npy column store via memory maps.
+
+    Only the requested column files are opened; dictionary-encoded columns
+    are returned as pandas Categoricals over their stored codes.
+
+    Returns:
+        DataFrame
+    """
+    meta = _read_store_meta(store_path)
+    if meta is None:
+        raise ValueError(f"Not a column store: {store_path}")
+    index = {c["name"]: (i, c) for i, c in enumerate(meta["columns"])}
+    names = [c["name"] for c in meta["columns"]] if columns is None else list(columns)
+
+    data = {}
+    for name in names:
+        if name not in index:
+            raise ValueError(f"Column '{name}' not found in {store_path}")
+        i, column = index[name]
+        values = np.load(os.path.join(store_path, f"c{i}.npy"), mmap_mode='r')
+        if column["kind"] == "dictionary":
+            # Served as a pandas Categorical so consumers can work on the codes directly
+            categories = np.load(os.path.join(store_path, f"c{i}.categories.npy"))
+            values = pd.Categorical.from_codes(values, categories.astype(object))
+        data[name] = values
+    return pd.DataFrame(data, columns=names)
+
+
+def segment_range(name):
+    """
+    (first, last) sequence numbers covered by a segment store name, or None.
+    """
+    if not (name.startswith(SEGMENT_PREFIX) and name.endswith(COLUMN_STORE_SUFFIX)):
+        return None
+    try:
+        first, last = name[len(SEGMENT_PREFIX):-len(COLUMN_STORE_SUFFIX)].split('-')
+        return int(first), int(last)
+    except ValueError:
+        return None
+
+
+def list_segments(directory):
+    """
+    Live segment stores of an ingest directory, in sequence order.
+
+    While a compaction is being published both the merged segment and its
+    inputs exist; segments covered by a wider one are skipped.
+    """
+    ranges = []
+    for name in os.listdir(directory):
+        covered = segment_range(name)
+        if covered is not None:
+            ranges.append((covered, name))
+    ranges.sort(key=lambda item: (item[0][0], -item[0][1]))
+    segments = []
+    last_seen = -1
+    for (first, last), name in ranges:
+        if last <= last_seen:
+            continue
+        segments.append(os.path.join(directory, name))
+        last_seen = last
+    return segments
+
+
+def read_segments(directory, columns=None):
+    """
+    Read every live segment of an ingest directory as one DataFrame.
+    """
+    for attempt in range(3):
+        try:
+            frames = []
+            for segment in list_segments(directory):
+                meta = _read_store_meta(segment)
+                if meta is None:
+                    raise FileNotFoundError(segment)
+                names = [c["name"] for c in meta["columns"]]
+                wanted = names if columns is None else [col for col in columns if col in names]
+                frames.append(read_column_store(segment, wanted))
+            break
+        except (FileNotFoundError, ValueError):
+            # A concurrent compaction removed a segment; list again
+            if attempt == 2:
+                raise
+    if not frames:
+        return pd.DataFrame(columns=columns or [])
+    df = pd.concat(frames, ignore_index=True)
+    return df if columns is None else df.reindex(columns=list(columns))
+
+
+def list_columns(filepath):
+    """
+    Column names of a data source, read from its header/metadata only.
+    """
+    if os.path.isdir(filepath):
+        meta = _read_store_meta(filepath)
+        if meta is not None:
+            return [c["name"] for c in meta["columns"]]
+        names = []
+        for segment in list_segments(filepath):
+            segment_meta = _read_store_meta(segment) or {"columns": []}
+            names.extend(c["name"] for c in segment_meta["columns"] if c["name"] not in names)
+        return names
+    ext = os.path.splitext(filepath)[1].lower()
+    if ext in ('.parquet', '.pq'):
+        import pyarrow.parquet as pq
+        return list(pq.read_schema(filepath).names)
+    if ext in ('.feather', '.arrow'):
+        import pyarrow.feather as feather
+        return list(feather.read_table(filepath, memory_map=True).schema.names)
+
+    store_path = column_store_path(filepath)
+    meta = _read_store_meta(store_path)
+    if meta is not None and meta.get("source_version") == file_version(filepath):
+        return [c["name"] for c in meta["columns"]]
+    return list(pd.read_csv(filepath, nrows=0).columns)
+
+
+def read_table(filepath, columns=None, convert=True):
+    """
+    Read a data source, touching only the requested columns where the format allows.
+
+    Supported sources:
+        .npycols directory: memory-mapped per-column .npy store.
+        ingest directory: every live seg-*.npycols segment, concatenated.
+        .parquet / .pq, .feather / .arrow: columnar read (requires pyarrow).
+        .csv (default): served from its converted .npycols store while the
+            store matches the CSV's version; otherwise parsed and, if
+            convert is True, converted for the next load.
+
+    Args:
+        filepath: Path to the data source.
+        columns: Optional list of columns to read.
+        convert: Convert CSVs to a column store on first load.
+
+    Returns:
+        DataFrame
+    """
+    if os.path.isdir(filepath):
+        if _read_store_meta(filepath) is None:
+            return read_segments(filepath, columns)
+        return read_column_store(filepath, columns)
+
+    ext = os.path.splitext(filepath)[1].lower()
+    if ext in ('.parquet', '.pq'):
+        return pd.read_parquet(filepath, columns=columns)
+    if ext in ('.feather', '.arrow'):
+        return pd.read_feather(filepath, columns=columns)
+
+    if not convert:
+        return pd.read_csv(filepath, usecols=columns)
+
+    version = file_version(filepath)
+    store_path = column_store_path(filepath)
+    meta = _read_store_meta(store_path)
+    if meta is not None and meta.get("source_version") == version:
+        return read_column_store(store_path, columns)
+
+    df = pd.read_csv(filepath)
+    try:
+        write_column_store(df, store_path, version)
+    except OSError as e:
+        print(f"Error converting {filepath} to column store: {e}")
+    return df if columns is None else df[list(columns)]
@@ -0,0 +1,262 @@
+import os
+import time
+import sqlite3
+import threading
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS models (
+    id TEXT PRIMARY KEY,
+    name TEXT,
+    training_path TEXT NOT NULL,
+    production_path TEXT NOT NULL,
+    buckets INTEGER NOT NULL DEFAULT 10,
+    model_group TEXT NOT NULL DEFAULT 'default',
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS drift_points (
+    model_id TEXT NOT NULL,
+    feature TEXT NOT NULL,
+    window_name TEXT NOT NULL,
+    ts REAL NOT NULL,
+    psi REAL NOT NULL,
+    ks REAL,
+    kl REAL NOT NULL,
+    js REAL NOT NULL,
+    wasserstein REAL NOT NULL,
+    status TEXT NOT NULL,
+    n INTEGER
+);
+CREATE INDEX IF NOT EXISTS drift_points_series ON drift_points (model_id, window_name, feature, ts);
+CREATE INDEX IF NOT EXISTS drift_points_ts ON drift_points (ts);
+
+CREATE TABLE IF NOT EXISTS drift_rollups (
+    model_id TEXT NOT NULL,
+    feature TEXT NOT NULL,
+    window_name TEXT NOT NULL,
+    resolution INTEGER NOT NULL,
+    bucket_start REAL NOT NULL,
+    count INTEGER NOT NULL,
+    psi_sum REAL NOT NULL,
+    psi_max REAL NOT NULL,
+    ks_count INTEGER NOT NULL,
+    ks_sum REAL NOT NULL,
+    ks_max REAL NOT NULL,
+    kl_sum REAL NOT NULL,
+    kl_max REAL NOT NULL,
+    js_sum REAL NOT NULL,
+    js_max REAL NOT NULL,
+    wasserstein_sum REAL NOT NULL,
+    wasserstein_max REAL NOT NULL,
+    critical_count INTEGER NOT NULL,
+    warning_count INTEGER NOT NULL,
+    PRIMARY KEY (model_id, window_name, resolution, feature, bucket_start)
+);
+CREATE INDEX IF NOT EXISTS drift_rollups_range ON drift_rollups (model_id, window_name, resolution, bucket_start);
+
+CREATE TABLE IF NOT EXISTS alert_rules (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT,
+    model_id TEXT NOT NULL,
+    window_name TEXT NOT NULL DEFAULT 'batch',
+    feature TEXT NOT NULL DEFAULT '*',
+    metric TEXT NOT NULL,
+    operator TEXT NOT NULL,
+    threshold REAL NOT NULL,
+    duration REAL NOT NULL DEFAULT 0,
+    hysteresis REAL NOT NULL DEFAULT 0,
+    severity TEXT NOT NULL DEFAULT 'warning',
+    channels TEXT NOT NULL DEFAULT '[]',
+    enabled INTEGER NOT NULL DEFAULT 1,
+    created_at REAL NOT NULL
+);
+"""
+
+ROLLUP_UPSERT = """
+INSERT INTO drift_rollups VALUES (?, ?, ?, ?, ?, 1, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (model_id, window_name, resolution, feature, bucket_start) DO UPDATE SET
+    count = count + 1,
+    psi_sum = psi_sum + excluded.psi_sum,
+    psi_max = MAX(psi_max, excluded.psi_max),
+    ks_count = ks_count + excluded.ks_count,
+    ks_sum = ks_sum + excluded.ks_sum,
+    ks_max = MAX(ks_max, excluded.ks_max),
+    kl_sum = kl_sum + excluded.kl_sum,
+    kl_max = MAX(kl_max, excluded.kl_max),
+    js_sum = js_sum + excluded.js_sum,
+    js_max = MAX(js_max, excluded.js_max),
+    wasserstein_sum = wasserstein_sum + excluded.wasserstein_sum,
+    wasserstein_max = MAX(wasserstein_max, excluded.wasserstein_max),
+    critical_count = critical_count + excluded.critical_count,
+    warning_count = warning_count + excluded.warning_count
+"""
+
+
+class Database:
+    """
+    Local SQLite store shared by the API threads and background scanners.
+
+    A single connection is used behind a lock: statements are short, and
+    SQLite serializes writers anyway. WAL mode keeps readers in other
+    processes from blocking on writes.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            if path != ':memory:':
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+            self._conn.commit()
+
+    def execute(self, sql, params=()):
+        """
+        Run one statement in its own transaction.
+
+        Returns:
+            list: Result rows (sqlite3.Row).
+        """
+        with self._lock:
+            with self._conn:
+                return self._conn.execute(sql, params).fetchall()
+
+    def executemany(self, sql, rows):
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(sql, rows)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # Model registry
+
+    def upsert_model(self, model_id, training_path, production_path, buckets=10,
+                     group='default', name=None):
+        now = time.time()
+        self.execute(
+            """
+            INSERT INTO models (id, name, training_path, production_path, buckets, model_group,
+                                created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(id) DO UPDATE SET
+                name = excluded.name,
+                training_path = excluded.training_path,
+                production_path = excluded.production_path,
+                buckets = excluded.buckets,
+                model_group = excluded.model_group,
+                updated_at = excluded.updated_at
+            """,
+            (model_id, name, training_path, production_path, buckets, group, now, now))
+
+    def get_model(self, model_id):
+        rows = self.execute("SELECT * FROM models WHERE id = ?", (model_id,))
+        return dict(rows[0]) if rows else None
+
+    def list_models(self):
+        return [dict(row) for row in self.execute("SELECT * FROM models ORDER BY id")]
+
+    def delete_model(self, model_id):
+        with self._lock:
+            with self._conn:
+                return self._conn.execute("DELETE FROM models WHERE id = ?", (model_id,)).rowcount > 0
+
+    # Drift history
+
+    def append_drift_points(self, points, resolutions):
+        """
+        Append raw drift points and fold them into every rollup resolution, in one transaction.
+
+        Args:
+            points: Tuples (model_id, feature, window_name, ts, psi, ks, kl, js,
+                wasserstein, status, n); ks may be None.
+            resolutions: Rollup bucket widths in seconds.
+        """
+        rollups = []
+        for model_id, feature, window_name, ts, psi, ks, kl, js, wasserstein, status, n in points:
+            for resolution in resolutions:
+                rollups.append((model_id, feature, window_name, resolution, ts - ts % resolution,
+                                psi, psi, 0 if ks is None else 1, ks or 0.0, ks or 0.0,
+                                kl, kl, js, js, wasserstein, wasserstein,
+                                int(status == 'critical'), int(status == 'warning')))
+        with self._lock:
+            with self._conn:
+                self._conn.executemany("INSERT INTO drift_points VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                       points)
+                self._conn.executemany(ROLLUP_UPSERT, rollups)
+
+    def query_drift_points(self, model_id, window_name, start, end, feature=None):
+        sql = ("SELECT feature, ts, psi, ks, kl, js, wasserstein, status, n FROM drift_points "
+               "WHERE model_id = ? AND window_name = ? AND ts >= ? AND ts < ?")
+        params = [model_id, window_name, start, end]
+        if feature is not None:
+            sql += " AND feature = ?"
+            params.append(feature)
+        return [dict(row) for row in self.execute(sql + " ORDER BY feature, ts", params)]
+
+    def query_drift_rollups(self, model_id, window_name, resolution, start, end, feature=None):
+        sql = ("SELECT * FROM drift_rollups WHERE model_id = ? AND window_name = ? AND resolution = ? "
+               "AND bucket_start >= ? AND bucket_start < ?")
+        params = [model_id, window_name, resolution, start - start % resolution, end]
+        if feature is not None:
+            sql += " AND feature = ?"
+            params.append(feature)
+        return [dict(row) for row in self.execute(sql + " ORDER BY feature, bucket_start", params)]
+
+    def delete_drift_history(self, raw_before=None, rollup_before=None, model_id=None):
+        """
+        Drop raw points older than raw_before and rollups (resolution -> cutoff) older than their cutoff.
+
+        Returns:
+            int: Number of rows removed.
+        """
+        removed = 0
+        model_clause = "" if model_id is None else " AND model_id = ?"
+        model_params = () if model_id is None else (model_id,)
+        with self._lock:
+            with self._conn:
+                if raw_before is not None:
+                    removed += self._conn.execute("DELETE FROM drift_points WHERE ts < ?" + model_clause,
+                                                  (raw_before,) + model_params).rowcount
+                for resolution, cutoff in (rollup_before or {}).items():
+                    removed += self._conn.execute(
+                        "DELETE FROM drift_rollups WHERE resolution = ? AND bucket_start < ?" + model_clause,
+                        (resolution, cutoff) + model_params).rowcount
+        return removed
+
+    # Alert rules
+
+    def insert_alert_rule(self, name, model_id, window_name, feature, metric, operator, threshold,
+                          duration, hysteresis, severity, channels, enabled=True):
+        """
+        Returns:
+            int: The new rule id.
+        """
+        with self._lock:
+            with self._conn:
+                return self._conn.execute(
+                    """
+                    INSERT INTO alert_rules (name, model_id, window_name, feature, metric, operator,
+                                             threshold, duration, hysteresis, severity, channels,
+                                             enabled, created_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (name, model_id, window_name, feature, metric, operator, threshold, duration,
+                     hysteresis, severity, channels, int(enabled), time.time())).lastrowid
+
+    def list_alert_rules(self, model_id=None):
+        if model_id is None:
+            return [dict(row) for row in self.execute("SELECT * FROM alert_rules ORDER BY id")]
+        return [dict(row) for row in self.execute("SELECT * FROM alert_rules WHERE model_id = ? ORDER BY id",
+                                                  (model_id,))]
+
+    def delete_alert_rule(self, rule_id):
+        with self._lock:
+            with self._conn:
+                return self._conn.execute("DELETE FROM alert_rules WHERE id = ?", (rule_id,)).rowcount > 0
@@ -1,21 +1,56 @@
 import pandas as pd
 import numpy as np
-from scipy import stats
 
-def load_data(filepath):
+from data_sources import read_table
+from instrumentation import count_error, count_rows, span
+
+def load_data(filepath, columns=None, convert=True):
     """
-    Load data from a CSV file.
+    Load data from a CSV, Parquet/Feather file or .npy column store.
+    
+    Args:
+        filepath: Path to the data source (see data_sources.read_table).
+        columns: Optional list of columns to read; other columns are not touched
+            for columnar sources.
+        convert: Convert CSVs to a memory-mapped column store on first load.
+        
+    Returns:
+        DataFrame, or None if the data could not be loaded.
     """
     try:
-        df = pd.read_csv(filepath)
+        with span('load'):
+            df = read_table(filepath, columns, convert)
+        count_rows('load', len(df))
         return df
     except Exception as e:
         print(f"Error loading data from {filepath}: {e}")
+        count_error('load_data')
         return None
 
-def calculate_psi(expected_array, actual_array, buckets=10, bucket_type='bins'):
+def load_data_chunks(filepath, chunksize=100000, columns=None):
     """
-    Calculate the Population Stability Index (PSI) for a single feature.
+    Stream data from a CSV file as DataFrames of at most chunksize rows.
+    
+    Args:
+        filepath: Path to the CSV file.
+        chunksize: Rows per chunk.
+        columns: Optional list of columns to read (others are never parsed).
+        
+    Yields:
+        DataFrame chunks. Nothing is yielded if the file cannot be read.
+    """
+    try:
+        reader = pd.read_csv(filepath, chunksize=chunksize, usecols=columns)
+    except Exception as e:
+        print(f"Error loading data from {filepath}: {e}")
+        return
+    with reader:
+        for chunk in reader:
+            yield chunk
+
+def bin_edges(expected_array, actual_array, buckets=10, bucket_type='quantiles'):
+    """
+    Compute the shared bin edges used by all binned drift metrics.
     
     Args:
         expected_array: Array-like, data from training/baseline.
@@ -24,54 +59,213 @@ def calculate_psi(expected_array, actual_array, buckets=10, bucket_type='bins'):
         bucket_type: 'bins' for equal-width, 'quantiles' for equal-frequency (on expected).
         
     Returns:
-        float: PSI value.
+        np.ndarray of unique edges, or None if the data cannot be binned.
     """
-    def scale_range(input, min, max):
-        input += -(np.min(input))
-        input /= np.max(input) / (max - min)
-        input += min
-        return input
-
-    breakpoints = np.arange(0, buckets + 1) / (buckets) * 100
-
     if bucket_type == 'bins':
-        try:
-            # Equal-width bins based on expected range
-            min_val = min(np.min(expected_array), np.min(actual_array))
-            max_val = max(np.max(expected_array), np.max(actual_array))
-            if min_val == max_val:
-                return 0.0
-            bins = np.linspace(min_val, max_val, buckets + 1)
-        except:
-             return 0.0
+        # Equal-width bins based on the combined range
+        min_val = min(np.min(expected_array), np.min(actual_array))
+        max_val = max(np.max(expected_array), np.max(actual_array))
+        if min_val == max_val:
+            return None
+        bins = np.linspace(min_val, max_val, buckets + 1)
     else:
         # Quantiles based on expected data
-        try:
-           bins = np.percentile(expected_array, breakpoints)
-        except:
-           return 0.0
+        breakpoints = np.arange(0, buckets + 1) / (buckets) * 100
+        bins = np.percentile(expected_array, breakpoints)
 
     # Handle unique bins if low cardinality
     bins = np.unique(bins)
     if len(bins) < 2:
-        return 0.0
+        return None
+    return bins
 
-    # Calculate frequency counts
-    expected_percents = np.histogram(expected_array, bins)[0] / len(expected_array)
-    actual_percents = np.histogram(actual_array, bins)[0] / len(actual_array)
+def bin_counts(values, edges):
+    """
+    Count values per bin against precomputed edges.
+
+    Equivalent to np.histogram(values, edges)[0] (last bin closed, values
+    outside the edges dropped), but a single searchsorted + bincount pass.
+    """
+    n_bins = len(edges) - 1
+    idx = np.searchsorted(edges, values, side='right') - 1
+    idx[values == edges[-1]] = n_bins - 1
+    idx = idx[(idx >= 0) & (idx < n_bins)]
+    return np.bincount(idx, minlength=n_bins)
+
+def binned_metric_arrays(expected_counts, n_expected, actual_counts, n_actual, edges=None):
+    """
+    Axis-aware core of binned_metrics: counts are (..., buckets), totals are (...).
+
+    Used directly by the matrix mode to score every feature at once; bins
+    with zero width (e.g. padding) contribute nothing to any metric.
+    
+    Returns:
+        dict: {'psi', 'kl', 'js', 'wasserstein'} as arrays of shape (...).
+    """
+    expected_raw = expected_counts / np.expand_dims(n_expected, -1)
+    actual_raw = actual_counts / np.expand_dims(n_actual, -1)
 
     # Avoid division by zero and log of zero
-    expected_percents = np.where(expected_percents == 0, 0.0001, expected_percents)
-    actual_percents = np.where(actual_percents == 0, 0.0001, actual_percents)
+    expected_percents = np.where(expected_raw == 0, 0.0001, expected_raw)
+    actual_percents = np.where(actual_raw == 0, 0.0001, actual_raw)
+
+    psi = np.sum((expected_percents - actual_percents) * np.log(expected_percents / actual_percents), axis=-1)
+    # KL Divergence: sum(actual * log(actual / expected))
+    kl = np.sum(actual_percents * np.log(actual_percents / expected_percents), axis=-1)
+
+    # Jensen-Shannon divergence on the unfloored proportions (0 * log 0 = 0)
+    mid = (expected_raw + actual_raw) / 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        js_expected = np.where(expected_raw > 0, expected_raw * np.log(expected_raw / mid), 0.0)
+        js_actual = np.where(actual_raw > 0, actual_raw * np.log(actual_raw / mid), 0.0)
+    js = 0.5 * np.sum(js_expected, axis=-1) + 0.5 * np.sum(js_actual, axis=-1)
+
+    # Wasserstein-1 within the binned range: integral of |CDF difference|,
+    # with CDFs linear inside each bin (trapezoid per bin)
+    wasserstein = np.zeros_like(psi)
+    if edges is not None:
+        cdf_diff = np.abs(np.cumsum(expected_raw - actual_raw, axis=-1))
+        cdf_diff = np.concatenate([np.zeros_like(cdf_diff[..., :1]), cdf_diff], axis=-1)
+        widths = np.diff(edges, axis=-1)
+        widths = np.where(np.isfinite(widths), widths, 0.0)
+        wasserstein = np.sum(0.5 * (cdf_diff[..., :-1] + cdf_diff[..., 1:]) * widths, axis=-1)
 
-    psi_values = (expected_percents - actual_percents) * np.log(expected_percents / actual_percents)
-    psi = np.sum(psi_values)
+    return {'psi': psi, 'kl': kl, 'js': js, 'wasserstein': wasserstein}
+
+def binned_metrics(expected_counts, n_expected, actual_counts, n_actual, edges=None):
+    """
+    Derive PSI, KL, JS divergence and Wasserstein distance from shared bucket counts.
+    
+    Args:
+        expected_counts: Bucket counts for training/baseline.
+        n_expected: Total number of baseline samples.
+        actual_counts: Bucket counts for production/current on the same edges.
+        n_actual: Total number of production samples.
+        edges: Bin edges the counts were taken on (needed for Wasserstein).
+        
+    Returns:
+        dict: {'psi', 'kl', 'js', 'wasserstein'} as floats.
+    """
+    metrics = binned_metric_arrays(expected_counts, n_expected, actual_counts, n_actual, edges)
+    return {name: float(value) for name, value in metrics.items()}
+
+def quantile_edges_matrix(sorted_block, n_valid, buckets=10):
+    """
+    Quantile bin edges for every feature of a sorted numeric block at once.
+
+    Matches np.unique(np.percentile(column, ...)) per feature (linear
+    interpolation), without a Python-level loop over columns.
+    
+    Args:
+        sorted_block: 2-D float array (features x rows), each row sorted with NaNs last.
+        n_valid: Number of non-NaN values per feature.
+        buckets: Number of buckets.
+        
+    Returns:
+        tuple: (edges, n_edges). edges is (features x buckets+1) with the unique
+        edges of each feature first and +inf padding after; n_edges counts them.
+    """
+    n_valid = np.asarray(n_valid)
+    quantiles = np.true_divide(np.arange(0, buckets + 1) / (buckets) * 100, 100)
+    virtual = (n_valid[:, None] - 1) * quantiles
+    previous = np.floor(virtual)
+    gamma = virtual - previous
+    last = np.maximum(n_valid[:, None] - 1, 0)
+    previous = np.minimum(previous.astype(np.intp), last)
+    following = np.minimum(previous + 1, last)
+    lower = np.take_along_axis(sorted_block, previous, axis=1)
+    upper = np.take_along_axis(sorted_block, following, axis=1)
+    diff = upper - lower
+    edges = np.where(gamma >= 0.5, upper - diff * (1 - gamma), lower + diff * gamma)
+
+    # Per-row unique: edges are non-decreasing, so drop repeats and shift the rest left
+    keep = np.ones(edges.shape, dtype=bool)
+    keep[:, 1:] = edges[:, 1:] != edges[:, :-1]
+    n_edges = keep.sum(axis=1)
+    order = np.argsort(~keep, axis=1, kind='stable')
+    edges = np.take_along_axis(edges, order, axis=1)
+    edges[np.arange(edges.shape[1]) >= n_edges[:, None]] = np.inf
+    return edges, n_edges
+
+def bin_counts_matrix(block, edges, n_edges):
+    """
+    Bucket counts for every feature of a numeric block at once.
+
+    Per feature this equals bin_counts(column, edges[:n_edges]); NaNs and
+    values outside a feature's edges are dropped.
+    
+    Args:
+        block: 2-D float array (features x rows), NaN marks missing values.
+        edges: Padded edges from quantile_edges_matrix (features x buckets+1).
+        n_edges: Number of real edges per feature.
+        
+    Returns:
+        np.ndarray: (features x buckets) counts, zero in padding bins.
+    """
+    n_features, width = edges.shape
+    n_bins = width - 1
+    n_edges = np.asarray(n_edges)
+    # Small-int accumulator keeps the per-edge passes cheap on wide blocks
+    idx = np.full(block.shape, -1, dtype=np.int16 if width < 32767 else np.intp)
+    for k in range(width):
+        idx += block >= edges[:, k:k + 1]
+    last_edge = edges[np.arange(n_features), np.maximum(n_edges - 1, 0)][:, None]
+    np.copyto(idx, (n_edges - 2)[:, None], where=block == last_edge, casting='unsafe')
+    valid = (idx >= 0) & (idx < (n_edges - 1)[:, None])
+    flat = (idx + (np.arange(n_features) * n_bins)[:, None])[valid]
+    return np.bincount(flat, minlength=n_features * n_bins).reshape(n_features, n_bins)
+
+def calculate_binned_metrics(expected_array, actual_array, buckets=10, bucket_type='quantiles'):
+    """
+    Bin both arrays once and derive every binned drift metric from the shared counts.
+    
+    Args:
+        expected_array: Array-like, data from training/baseline.
+        actual_array: Array-like, data from production/current.
+        buckets: Number of buckets.
+        bucket_type: 'bins' for equal-width, 'quantiles' for equal-frequency (on expected).
+        
+    Returns:
+        dict: {'psi', 'kl', 'js', 'wasserstein'} as floats (all 0.0 if the data cannot be binned).
+    """
+    zero = {'psi': 0.0, 'kl': 0.0, 'js': 0.0, 'wasserstein': 0.0}
+    try:
+        expected_array = np.asarray(expected_array, dtype=float)
+        actual_array = np.asarray(actual_array, dtype=float)
+        edges = bin_edges(expected_array, actual_array, buckets, bucket_type)
+        if edges is None:
+            return zero
+        return binned_metrics(
+            bin_counts(expected_array, edges), len(expected_array),
+            bin_counts(actual_array, edges), len(actual_array),
+            edges
+        )
+    except Exception as e:
+        print(f"Error calculating binned metrics: {e}")
+        count_error('calculate_binned_metrics')
+        return zero
+
+def calculate_psi(expected_array, actual_array, buckets=10, bucket_type='bins'):
+    """
+    Calculate the Population Stability Index (PSI) for a single feature.
     
-    return float(psi)
+    Args:
+        expected_array: Array-like, data from training/baseline.
+        actual_array: Array-like, data from production/current.
+        buckets: Number of buckets.
+        bucket_type: 'bins' for equal-width, 'quantiles' for equal-frequency (on expected).
+        
+    Returns:
+        float: PSI value.
+    """
+    return calculate_binned_metrics(expected_array, actual_array, buckets, bucket_type)['psi']
 
 def calculate_ks(expected_array, actual_array):
     """
     Calculate the Kolmogorov-Smirnov statistic for two samples.
+
+    Same statistic as scipy.stats.ks_2samp, computed in NumPy so importing
+    this module does not pull in SciPy.
     
     Args:
         expected_array: Array-like, data from training/baseline.
@@ -81,10 +275,44 @@ def calculate_ks(expected_array, actual_array):
         float: KS statistic (maximum difference between CDFs).
     """
     try:
-        ks_stat, _ = stats.ks_2samp(expected_array, actual_array)
-        return float(ks_stat)
+        expected = np.sort(np.asarray(expected_array, dtype=float))
+        actual = np.sort(np.asarray(actual_array, dtype=float))
+        if len(expected) == 0 or len(actual) == 0:
+            raise ValueError("Data passed to calculate_ks must not be empty")
+        return ks_from_sorted(expected, actual)
     except Exception as e:
         print(f"Error calculating KS: {e}")
+        count_error('calculate_ks')
+        return 0.0
+
+def ks_from_sorted(sorted_expected, sorted_actual):
+    """
+    Two-sample KS statistic for two already-sorted, NaN-free arrays.
+    """
+    data_all = np.concatenate([sorted_expected, sorted_actual])
+    cdf_expected = np.searchsorted(sorted_expected, data_all, side='right') / len(sorted_expected)
+    cdf_actual = np.searchsorted(sorted_actual, data_all, side='right') / len(sorted_actual)
+    return float(np.max(np.abs(cdf_expected - cdf_actual)))
+
+def calculate_ks_sorted(sorted_expected, actual_array):
+    """
+    Kolmogorov-Smirnov statistic against an already-sorted baseline.
+
+    Produces the same statistic as calculate_ks, but reuses the baseline
+    profile's sorted sample so only the production side is sorted.
+    
+    Args:
+        sorted_expected: Array-like, sorted data from training/baseline.
+        actual_array: Array-like, data from production/current.
+        
+    Returns:
+        float: KS statistic (maximum difference between CDFs).
+    """
+    try:
+        return ks_from_sorted(sorted_expected, np.sort(actual_array))
+    except Exception as e:
+        print(f"Error calculating KS: {e}")
+        count_error('calculate_ks_sorted')
         return 0.0
 
 def calculate_kl(expected_array, actual_array, buckets=10, bucket_type='quantiles'):
@@ -100,82 +328,218 @@ def calculate_kl(expected_array, actual_array, buckets=10, bucket_type='quantile
     Returns:
         float: KL Divergence value.
     """
-    try:
-        # Use same binning as PSI for consistency
-        if bucket_type == 'bins':
-            min_val = min(np.min(expected_array), np.min(actual_array))
-            max_val = max(np.max(expected_array), np.max(actual_array))
-            if min_val == max_val:
-                return 0.0
-            bins = np.linspace(min_val, max_val, buckets + 1)
-        else:
-            breakpoints = np.arange(0, buckets + 1) / (buckets) * 100
-            bins = np.percentile(expected_array, breakpoints)
-
-        bins = np.unique(bins)
-        if len(bins) < 2:
-            return 0.0
-
-        # Calculate frequency counts
-        expected_percents = np.histogram(expected_array, bins)[0] / len(expected_array)
-        actual_percents = np.histogram(actual_array, bins)[0] / len(actual_array)
-
-        # Avoid division by zero and log of zero
-        expected_percents = np.where(expected_percents == 0, 0.0001, expected_percents)
-        actual_percents = np.where(actual_percents == 0, 0.0001, actual_percents)
-
-        # KL Divergence: sum(actual * log(actual / expected))
-        kl_values = actual_percents * np.log(actual_percents / expected_percents)
-        kl = np.sum(kl_values)
+    return calculate_binned_metrics(expected_array, actual_array, buckets, bucket_type)['kl']
+
+def score_feature(feature, production_col):
+    """
+    Score one production column against a baseline FeatureProfile.
+    
+    Production values are binned once on the profile's stored edges and
+    every binned metric is derived from those shared counts.
+    
+    Returns:
+        dict: {'psi', 'kl', 'js', 'wasserstein', 'ks'} as floats.
+    """
+    edges = feature.edges
+    if len(edges) < 2:
+        metrics = {'psi': 0.0, 'kl': 0.0, 'js': 0.0, 'wasserstein': 0.0}
+    else:
+        with span('binning', feature.name):
+            actual_counts = bin_counts(production_col, edges)
+        with span('metrics', feature.name):
+            metrics = binned_metrics(feature.counts, feature.n, actual_counts, len(production_col), edges)
+
+    with span('ks', feature.name):
+        metrics['ks'] = calculate_ks_sorted(feature.sorted_values, production_col)
+    return metrics
+
+# (warning, critical) thresholds per metric. Adjust thresholds as needed
+PSI_THRESHOLDS = (0.1, 0.2)
+KS_THRESHOLDS = (0.05, 0.1)
+KL_THRESHOLDS = (0.2, 0.5)
+STATUSES = ('good', 'warning', 'critical')
+
+def drift_status(psi, ks, kl):
+    """
+    Map drift metrics to a severity status: 'critical', 'warning' or 'good'.
+    """
+    if psi >= PSI_THRESHOLDS[1] or ks >= KS_THRESHOLDS[1] or kl >= KL_THRESHOLDS[1]:
+        return 'critical'
+    elif psi >= PSI_THRESHOLDS[0] or ks >= KS_THRESHOLDS[0] or kl >= KL_THRESHOLDS[0]:
+        return 'warning'
+    return 'good'
+
+def drift_levels(psi, ks, kl):
+    """
+    Array form of drift_status: 0 (good), 1 (warning) or 2 (critical) per
+    element, indexing STATUSES.
+    """
+    critical = (psi >= PSI_THRESHOLDS[1]) | (ks >= KS_THRESHOLDS[1]) | (kl >= KL_THRESHOLDS[1])
+    warning = (psi >= PSI_THRESHOLDS[0]) | (ks >= KS_THRESHOLDS[0]) | (kl >= KL_THRESHOLDS[0])
+    return np.where(critical, 2, np.where(warning, 1, 0))
+
+def score_stacked(block, edges, n_edges, expected_counts, n_expected, sorted_baselines):
+    """
+    Score rows of a numeric block against stacked baseline arrays.
+
+    Shared by matrix mode and the parallel shards; every reduction is per
+    row, so a feature's result does not depend on how rows are grouped.
+    
+    Args:
+        block: 2-D float array (features x rows), NaN marks missing values.
+        edges, n_edges, expected_counts, n_expected: Baseline arrays as
+            returned by BaselineProfile.stacked, one row per block row.
+        sorted_baselines: Sequence of sorted baseline samples, one per row.
         
-        return float(kl)
-    except Exception as e:
-        print(f"Error calculating KL: {e}")
-        return 0.0
+    Returns:
+        list: metrics dict per row (same keys as score_feature), or None
+            where the row has no production values.
+    """
+    with span('binning'):
+        actual_counts = bin_counts_matrix(block, edges, n_edges)
+        n_actual = np.sum(~np.isnan(block), axis=1)
+
+    with span('metrics'), np.errstate(divide='ignore', invalid='ignore'):
+        metrics = binned_metric_arrays(expected_counts, n_expected, actual_counts, n_actual, edges)
+    unbinnable = n_edges < 2
+    for name in metrics:
+        metrics[name][unbinnable] = 0.0
 
-def detect_drift(training_df, production_df, categorical_features=None):
+    results = []
+    with span('ks'):
+        sorted_block = np.sort(block, axis=1)
+        for i in range(block.shape[0]):
+            if n_actual[i] == 0:
+                results.append(None)
+                continue
+            row_metrics = {name: float(values[i]) for name, values in metrics.items()}
+            row_metrics['ks'] = ks_from_sorted(sorted_baselines[i], sorted_block[i, :n_actual[i]])
+            results.append(row_metrics)
+    return results
+
+def score_block(baseline_profile, columns, block):
+    """
+    Matrix mode: score a whole numeric production block against the baseline at once.
+    
+    Args:
+        baseline_profile: BaselineProfile holding every column in columns.
+        columns: Feature names, one per row of block.
+        block: 2-D float array (features x rows), NaN marks missing values.
+        
+    Returns:
+        dict: feature_name -> metrics dict (same keys as score_feature).
+            Features with no production values are omitted.
+    """
+    edges, n_edges, expected_counts, n_expected = baseline_profile.stacked(columns)
+    sorted_baselines = [baseline_profile.features[col].sorted_values for col in columns]
+    rows = score_stacked(block, edges, n_edges, expected_counts, n_expected, sorted_baselines)
+    return {col: metrics for col, metrics in zip(columns, rows) if metrics is not None}
+
+def detect_drift(training_df, production_df, categorical_features=None, baseline_profile=None,
+                 mode='columns', n_jobs=1, executor='process', approximate=False, sketch_k=200,
+                 sampling=None, sample_size=100000, stratify_by=None):
     """
     Detect drift for all columns in the dataframes.
     
     Args:
-        training_df: DataFrame, baseline data.
+        training_df: DataFrame, baseline data. May be None when baseline_profile is given.
         production_df: DataFrame, current data.
-        categorical_features: List of categorical column names (optional).
+        categorical_features: Columns to score as categories (chi-square and
+            categorical PSI over top-k categories plus 'other'). Defaults to
+            every non-numeric column. Ignored when baseline_profile is given.
+        baseline_profile: Precomputed BaselineProfile (optional). When provided,
+            production data is scored against it and training_df is not read.
+        mode: 'columns' scores features one at a time; 'matrix' bins and scores
+            the whole numeric block with axis-aware NumPy operations.
+        n_jobs: Number of workers for sharding features (1 runs in-process,
+            None or -1 uses every core). Implies matrix-style scoring per shard.
+        executor: 'process' or 'thread' pool when n_jobs != 1.
+        approximate: Score numerical features from mergeable quantile/histogram
+            sketches (the profile's stored baseline sketches against production
+            sketches) instead of full sorted samples; adds 'ks_error' and
+            'rank_error' bounds per feature. Categorical features are scored
+            exactly as usual.
+        sketch_k: Production quantile sketch accuracy parameter for approximate mode.
+        sampling: None scores every row; 'uniform', 'stratified', 'reservoir'
+            or 'adaptive' score a sample of at most sample_size rows and add
+            'sample_size' and confidence intervals ('psi_ci', 'kl_ci', 'ks_ci')
+            per feature (see sampling.detect_drift_sampled).
+        sample_size: Row cap for sampling.
+        stratify_by: Column(s) defining strata for 'stratified' sampling.
     
     Returns:
-        dict: feature_name -> {'psi': value, 'status': 'critical'|'warning'|'good'}
+        dict: feature_name -> {'psi', 'ks', 'kl', 'js', 'wasserstein', 'status': 'critical'|'warning'|'good'}
+            for numerical features; categorical features carry
+            {'psi', 'kl', 'js', 'chi2', 'p_value', 'status', 'type': 'categorical'}.
     """
+    if sampling is not None:
+        from sampling import detect_drift_sampled
+        if baseline_profile is None:
+            from baseline_profile import build_baseline_profile
+            baseline_profile = build_baseline_profile(training_df, buckets=10,
+                                                      categorical_features=categorical_features)
+        return detect_drift_sampled(baseline_profile, production_df, sample_size, sampling, stratify_by,
+                                    mode=mode, n_jobs=n_jobs, executor=executor)
+
+    if baseline_profile is None:
+        from baseline_profile import build_baseline_profile
+        baseline_profile = build_baseline_profile(training_df, buckets=10,
+                                                  categorical_features=categorical_features)
+
     drift_report = {}
-    
-    # Identify numerical columns (simple heuristic)
-    numerical_cols = training_df.select_dtypes(include=[np.number]).columns.tolist()
-    
-    for col in numerical_cols:
-        if col not in production_df.columns:
-            continue
+    if approximate:
+        # Baseline sketches are built once with the profile; only production is sketched here
+        from sketches import baseline_sketches, build_sketches, compare_sketches
+        baseline = baseline_sketches(baseline_profile)
+        edges = {col: sketch.histogram.edges for col, sketch in baseline.items() if sketch.histogram is not None}
+        with span('sketch'):
+            production = build_sketches(production_df, columns=[col for col in baseline if col in production_df.columns],
+                                        edges=edges, k=sketch_k)
+        drift_report = compare_sketches(baseline, production, baseline_profile.buckets)
+        scored = {}
+    elif n_jobs != 1:
+        from parallel_drift import score_parallel
+        columns = [col for col in baseline_profile.features if col in production_df.columns]
+        block = production_df[columns].to_numpy(dtype=float).T
+        scored = score_parallel(baseline_profile, columns, block, n_jobs, executor)
+    elif mode == 'matrix':
+        columns = [col for col in baseline_profile.features if col in production_df.columns]
+        block = production_df[columns].to_numpy(dtype=float).T
+        scored = score_block(baseline_profile, columns, block)
+    else:
+        scored = {}
+        for col, feature in baseline_profile.features.items():
+            if col not in production_df.columns:
+                continue
+                
+            with span('dropna', col):
+                production_col = production_df[col].dropna().values
             
-        training_col = training_df[col].dropna().values
-        production_col = production_df[col].dropna().values
-        
-        # Skip if empty
-        if len(training_col) == 0 or len(production_col) == 0:
-            continue
+            # Skip if empty
+            if len(production_col) == 0:
+                continue
 
-        psi = calculate_psi(training_col, production_col, buckets=10, bucket_type='quantiles')
-        ks = calculate_ks(training_col, production_col)
-        kl = calculate_kl(training_col, production_col, buckets=10, bucket_type='quantiles')
-        
-        status = 'good'
-        if psi >= 0.2 or ks >= 0.1 or kl >= 0.5:  # Adjust thresholds as needed
-            status = 'critical'
-        elif psi >= 0.1 or ks >= 0.05 or kl >= 0.2:
-            status = 'warning'
-            
-        drift_report[col] = {
-            'psi': round(psi, 4),
-            'ks': round(ks, 4),
-            'kl': round(kl, 4),
-            'status': status
-        }
+            scored[col] = score_feature(feature, production_col)
+
+    with span('report'):
+        for col, metrics in scored.items():
+            drift_report[col] = {
+                'psi': round(metrics['psi'], 4),
+                'ks': round(metrics['ks'], 4),
+                'kl': round(metrics['kl'], 4),
+                'js': round(metrics['js'], 4),
+                'wasserstein': round(metrics['wasserstein'], 4),
+                'status': drift_status(metrics['psi'], metrics['ks'], metrics['kl'])
+            }
+
+    if baseline_profile.categorical:
+        from categorical import score_categorical
+        for col, profile in baseline_profile.categorical.items():
+            if col not in production_df.columns:
+                continue
+            with span('categorical', col):
+                metrics = score_categorical(profile, production_df[col])
+            if metrics is not None:
+                drift_report[col] = metrics
         
     return drift_report
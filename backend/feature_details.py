@@ -0,0 +1,167 @@
+import threading
+import numpy as np
+
+from drift_detection import STATUSES, bin_counts, binned_metrics
+from instrumentation import span
+
+# Stored histogram resolution; served resolutions must divide it
+FINE_BINS = 240
+DEFAULT_BINS = 20
+# Equal-width buckets of the PSI shown on the feature page
+DETAIL_PSI_BUCKETS = 10
+SORT_METRICS = ('psi', 'ks', 'kl', 'js', 'wasserstein')
+
+
+def allowed_bins():
+    return [b for b in range(1, FINE_BINS + 1) if FINE_BINS % b == 0]
+
+
+class FeatureDetails:
+    """
+    Per drift run feature index and drill-down data, stored as arrays.
+
+    Metric arrays (one entry per reported feature) are built from the drift
+    report up front, so ranking and paging never touch the data. Histograms
+    and production statistics are computed once for every numerical feature
+    on first drill-down: FINE_BINS equal-width counts per side over the
+    combined range, from which any resolution dividing FINE_BINS is served
+    by summing adjacent bins. Each payload is then O(bins).
+    """
+
+    def __init__(self, run):
+        self.run = run
+        report = run.drift_report
+        self.names = list(report)
+        self.positions = {name: i for i, name in enumerate(self.names)}
+        self.metrics = {metric: np.array([report[name].get(metric, 0.0) for name in self.names], dtype=float)
+                        for metric in SORT_METRICS}
+        self.levels = np.array([STATUSES.index(report[name]['status']) for name in self.names], dtype=np.int8)
+        self.categorical = np.array([report[name].get('type') == 'categorical' for name in self.names], dtype=bool)
+        self._lock = threading.Lock()
+        self._histograms = None
+
+    def top(self, metric='psi', offset=0, limit=None, status=None):
+        """
+        Positions of features ranked by metric (descending), paged.
+
+        Only offset + limit candidates are selected (np.argpartition) and
+        sorted; ties keep report order, as a stable full sort would.
+
+        Returns:
+            tuple: (positions, total) where total counts the features matching status.
+        """
+        values = self.metrics[metric]
+        candidates = np.arange(len(values))
+        if status is not None:
+            candidates = candidates[self.levels == STATUSES.index(status)]
+        total = len(candidates)
+        end = total if limit is None else min(offset + limit, total)
+        if end <= 0 or offset >= total:
+            return [], total
+        scores = values[candidates]
+        if end < total:
+            kth = scores[np.argpartition(-scores, end - 1)[end - 1]]
+            candidates, scores = candidates[scores >= kth], scores[scores >= kth]
+        ranked = candidates[np.lexsort((candidates, -scores))]
+        return ranked[offset:end].tolist(), total
+
+    def summary(self, position):
+        name = self.names[position]
+        entry = {
+            "name": name,
+            "psi": self.run.drift_report[name]['psi'],
+            "ks": self.run.drift_report[name].get('ks', 0),
+            "kl": self.run.drift_report[name].get('kl', 0),
+            "status": STATUSES[self.levels[position]]
+        }
+        if self.categorical[position]:
+            entry["type"] = "categorical"
+        return entry
+
+    def histograms(self):
+        """
+        Fine histograms and production stats for every numerical feature, built once.
+
+        Returns:
+            dict: name -> (edges, baseline_counts, production_counts, production_stats).
+            Constant features get a single bin one unit wider on each side.
+        """
+        with self._lock:
+            if self._histograms is None:
+                with span('histogram'):
+                    self._histograms = {
+                        name: self._build(name)
+                        for name in self.run.baseline.features
+                        if name in self.run.production_df.columns and len(self.run.production_values(name))
+                    }
+            return self._histograms
+
+    def _build(self, name):
+        feature = self.run.baseline.features[name]
+        production = self.run.production_values(name)
+        stats = {
+            "mean": float(np.mean(production)),
+            "median": float(np.median(production)),
+            "std": float(np.std(production)),
+            "min": float(np.min(production)),
+            "max": float(np.max(production))
+        }
+        low = min(feature.stats['min'], stats['min'])
+        high = max(feature.stats['max'], stats['max'])
+        if low == high:
+            return np.array([low - 1, high + 1]), np.array([len(feature.sorted_values)]), np.array([len(production)]), stats
+        edges = np.linspace(low, high, FINE_BINS + 1)
+        return (edges, bin_counts(feature.sorted_values, edges).astype(np.int32),
+                bin_counts(production, edges).astype(np.int32), stats)
+
+    def payload(self, name, bins=DEFAULT_BINS):
+        """
+        Feature drill-down payload (stats, PSI and chart data) at `bins` resolution.
+        """
+        feature = self.run.baseline.features[name]
+        edges, baseline_fine, production_fine, production_stats = self.histograms()[name]
+        # Baseline fine counts come from the profile's sorted sample
+        n_baseline, n_production = int(np.sum(baseline_fine)), int(np.sum(production_fine))
+
+        if len(edges) == 2:
+            psi = 0.0
+            baseline_counts, production_counts = baseline_fine, production_fine
+        else:
+            step = FINE_BINS // DETAIL_PSI_BUCKETS
+            psi = binned_metrics(coarsen(baseline_fine, step), n_baseline,
+                                 coarsen(production_fine, step), n_production, edges[::step])['psi']
+            step = FINE_BINS // bins
+            # Same edges as a direct np.linspace at this resolution (labels must not shift by an ulp)
+            edges = np.linspace(edges[0], edges[-1], bins + 1)
+            baseline_counts, production_counts = coarsen(baseline_fine, step), coarsen(production_fine, step)
+
+        status = 'good'
+        if psi > 0.2: status = 'critical'
+        elif psi > 0.1: status = 'warning'
+
+        widths = np.diff(edges)
+        baseline_density = baseline_counts / (np.sum(baseline_counts) * widths)
+        production_density = production_counts / (np.sum(production_counts) * widths)
+        chart_data = []
+        for i in range(len(edges) - 1):
+            chart_data.append({
+                "range": f"{edges[i]:.1f}-{edges[i+1]:.1f}",
+                "bin_center": float((edges[i] + edges[i + 1]) / 2),
+                "baseline": float(baseline_density[i]),
+                "production": float(production_density[i])
+            })
+        return {
+            "feature_name": name,
+            "psi": round(psi, 4),
+            "status": status,
+            "baseline_stats": dict(feature.stats),
+            "production_stats": production_stats,
+            "chart_data": chart_data
+        }
+
+
+def coarsen(counts, step):
+    """
+    Sum runs of `step` adjacent bins.
+    """
+    return counts.reshape(-1, step).sum(axis=1)
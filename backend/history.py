@@ -0,0 +1,141 @@
+import time
+import threading
+
+HOUR = 3600
+DAY = 86400
+
+# Rollup resolutions maintained on every write (seconds)
+ROLLUP_RESOLUTIONS = (HOUR, DAY)
+
+# How long each resolution is kept (seconds)
+DEFAULT_RETENTION = {
+    'raw': 7 * DAY,
+    HOUR: 90 * DAY,
+    DAY: 2 * 365 * DAY
+}
+
+# Window name used for full batch drift runs (monitor windows use their own names)
+BATCH_WINDOW = 'batch'
+
+METRICS = ('psi', 'ks', 'kl', 'js', 'wasserstein')
+
+
+class DriftHistory:
+    """
+    Append-only drift time series with hourly and daily rollups.
+
+    Every recorded point is written raw and folded into each rollup bucket
+    (count, sum and max per metric) in the same transaction, so range
+    queries over weeks or months read a few hundred pre-aggregated rows
+    instead of re-running detection. Older data is pruned per resolution
+    according to the retention policy.
+    """
+
+    def __init__(self, database, retention=None, clock=time.time, prune_interval=HOUR):
+        self.database = database
+        self.retention = dict(DEFAULT_RETENTION, **(retention or {}))
+        self.clock = clock
+        self.prune_interval = prune_interval
+        self._last_prune = None
+        self._lock = threading.Lock()
+
+    def record(self, model_id, drift_report, window_name=BATCH_WINDOW, timestamp=None):
+        """
+        Append one drift report (feature -> metrics) as history points.
+
+        Returns:
+            int: Number of points written.
+        """
+        ts = self.clock() if timestamp is None else timestamp
+        points = []
+        for feature, metrics in drift_report.items():
+            points.append((model_id, feature, window_name, ts,
+                           float(metrics['psi']),
+                           float(metrics['ks']) if 'ks' in metrics else None,
+                           float(metrics['kl']),
+                           float(metrics.get('js', 0.0)),
+                           float(metrics.get('wasserstein', 0.0)),
+                           metrics['status'],
+                           metrics.get('n')))
+        if points:
+            self.database.append_drift_points(points, ROLLUP_RESOLUTIONS)
+        self._maybe_prune()
+        return len(points)
+
+    def _maybe_prune(self):
+        now = self.clock()
+        with self._lock:
+            if self._last_prune is not None and now - self._last_prune < self.prune_interval:
+                return
+            self._last_prune = now
+        self.prune(now)
+
+    def prune(self, now=None):
+        """
+        Apply the retention policy.
+
+        Returns:
+            int: Number of rows removed.
+        """
+        now = self.clock() if now is None else now
+        return self.database.delete_drift_history(
+            raw_before=now - self.retention['raw'],
+            rollup_before={resolution: now - self.retention[resolution]
+                           for resolution in ROLLUP_RESOLUTIONS})
+
+    def pick_resolution(self, start, end):
+        """
+        Coarsest resolution that still gives a useful number of points for the range.
+        """
+        span = end - start
+        if span <= 2 * DAY and start >= self.clock() - self.retention['raw']:
+            return 'raw'
+        if span <= 14 * DAY and start >= self.clock() - self.retention[HOUR]:
+            return HOUR
+        return DAY
+
+    def query(self, model_id, start, end, feature=None, window_name=BATCH_WINDOW, resolution='auto'):
+        """
+        Drift time series for a model over [start, end).
+
+        Args:
+            model_id: Model to query.
+            start, end: Epoch seconds.
+            feature: Optional single feature.
+            window_name: BATCH_WINDOW or a monitor window name.
+            resolution: 'raw', 'hour', 'day' or 'auto'.
+
+        Returns:
+            dict: {'resolution': ..., 'series': {feature: [point, ...]}} where each
+            point has 'timestamp', 'count', the mean of every metric, '<metric>_max'
+            and 'critical'/'warning' counts.
+        """
+        if resolution == 'auto':
+            resolution = self.pick_resolution(start, end)
+        else:
+            resolution = {'raw': 'raw', 'hour': HOUR, 'day': DAY}[resolution]
+
+        series = {}
+        if resolution == 'raw':
+            for row in self.database.query_drift_points(model_id, window_name, start, end, feature):
+                point = {"timestamp": row['ts'], "count": 1}
+                for metric in METRICS:
+                    point[metric] = row[metric]
+                    point[f"{metric}_max"] = row[metric]
+                point["critical"] = int(row['status'] == 'critical')
+                point["warning"] = int(row['status'] == 'warning')
+                series.setdefault(row['feature'], []).append(point)
+        else:
+            for row in self.database.query_drift_rollups(model_id, window_name, resolution, start, end, feature):
+                count = row['count']
+                point = {"timestamp": row['bucket_start'], "count": count}
+                for metric in METRICS:
+                    divisor = row['ks_count'] if metric == 'ks' else count
+                    point[metric] = round(row[f"{metric}_sum"] / divisor, 4) if divisor else None
+                    point[f"{metric}_max"] = row[f"{metric}_max"] if divisor else None
+                point["critical"] = row['critical_count']
+                point["warning"] = row['warning_count']
+                series.setdefault(row['feature'], []).append(point)
+
+        names = {'raw': 'raw', HOUR: 'hour', DAY: 'day'}
+        return {"resolution": names[resolution], "series": series}
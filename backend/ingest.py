@@ -0,0 +1,189 @@
+import io
+import os
+import json
+import time
+import shutil
+import threading
+import pandas as pd
+
+from data_sources import (SEGMENT_PREFIX, COLUMN_STORE_SUFFIX, list_segments, read_column_store,
+                          read_segments, segment_range, write_column_store)
+
+JSON_LINES_TYPES = ('application/x-ndjson', 'application/jsonl', 'application/x-jsonlines')
+ARROW_STREAM_TYPES = ('application/vnd.apache.arrow.stream',)
+MSGPACK_TYPES = ('application/msgpack', 'application/x-msgpack')
+
+
+def parse_records(body, content_type):
+    """
+    Decode a batch of prediction records into a DataFrame.
+
+    Supported bodies:
+        JSON lines (one record per line), parsed in C by pandas.
+        JSON: a list of records, or {"records": [...]}.
+        Arrow IPC stream (requires pyarrow).
+        msgpack: a list of records or a dict of columns (requires msgpack).
+
+    Raises:
+        ValueError: if the body cannot be decoded.
+    """
+    content_type = (content_type or '').split(';')[0].strip().lower()
+    if content_type in JSON_LINES_TYPES:
+        if not body.strip():
+            return pd.DataFrame()
+        return pd.read_json(io.BytesIO(body), lines=True, dtype=False)
+
+    if content_type in ARROW_STREAM_TYPES:
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise ValueError("Arrow IPC ingestion requires pyarrow")
+        return pa.ipc.open_stream(pa.py_buffer(body)).read_all().to_pandas()
+
+    if content_type in MSGPACK_TYPES:
+        try:
+            import msgpack
+        except ImportError:
+            raise ValueError("msgpack ingestion requires the msgpack package")
+        payload = msgpack.unpackb(body, raw=False)
+    else:
+        payload = json.loads(body)
+
+    if isinstance(payload, dict) and 'records' in payload:
+        payload = payload['records']
+    if isinstance(payload, dict):
+        return pd.DataFrame(payload)
+    if isinstance(payload, list):
+        return pd.DataFrame.from_records(payload)
+    raise ValueError("Expected a list of records")
+
+
+class IngestBuffer:
+    """
+    Append-only columnar buffer for one model's prediction records.
+
+    Batches accumulate in memory and are flushed as immutable .npy column
+    segments (seg-<first>-<last>.npycols) once flush_rows rows or
+    flush_interval seconds have built up, so appends never rewrite earlier
+    data. When more than max_segments segments exist they are compacted in
+    the background into one; readers skip segments covered by a merged one,
+    so a compaction in progress is never double counted.
+
+    The directory itself is a readable data source (see data_sources.read_table).
+    """
+
+    def __init__(self, directory, flush_rows=50000, flush_interval=5.0, max_segments=16,
+                 clock=time.time):
+        self.directory = directory
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.max_segments = max_segments
+        self.clock = clock
+        os.makedirs(directory, exist_ok=True)
+        self._pending = []
+        self._pending_rows = 0
+        self._last_flush = clock()
+        self._seq = max([segment_range(os.path.basename(path))[1] for path in list_segments(directory)] + [0])
+        self._lock = threading.Lock()
+        self._compacting = False
+        self.rows_ingested = 0
+
+    def append(self, df):
+        """
+        Buffer a batch of records, flushing a segment if a threshold is reached.
+
+        Returns:
+            int: Number of rows appended.
+        """
+        if len(df) == 0:
+            return 0
+        with self._lock:
+            self._pending.append(df)
+            self._pending_rows += len(df)
+            self.rows_ingested += len(df)
+            if self._pending_rows >= self.flush_rows or self.clock() - self._last_flush >= self.flush_interval:
+                self._flush_locked()
+        return len(df)
+
+    def flush_if_due(self):
+        with self._lock:
+            if self._pending and self.clock() - self._last_flush >= self.flush_interval:
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _segment_path(self, first, last):
+        return os.path.join(self.directory, f"{SEGMENT_PREFIX}{first:012d}-{last:012d}{COLUMN_STORE_SUFFIX}")
+
+    def _flush_locked(self):
+        self._last_flush = self.clock()
+        if not self._pending:
+            return
+        df = pd.concat(self._pending, ignore_index=True) if len(self._pending) > 1 else self._pending[0]
+        self._seq += 1
+        write_column_store(df, self._segment_path(self._seq, self._seq))
+        self._pending = []
+        self._pending_rows = 0
+        if len(list_segments(self.directory)) > self.max_segments and not self._compacting:
+            self._compacting = True
+            threading.Thread(target=self.compact, name=f"compact-{os.path.basename(self.directory)}",
+                             daemon=True).start()
+
+    def compact(self):
+        """
+        Merge the trailing run of freshly flushed segments into one (or, if
+        there is no such run, every segment), so older merged data is not
+        rewritten on every compaction.
+
+        Returns:
+            int: Number of segments merged.
+        """
+        try:
+            segments = list_segments(self.directory)
+            fresh = 0
+            for path in reversed(segments):
+                first, last = segment_range(os.path.basename(path))
+                if first != last:
+                    break
+                fresh += 1
+            if fresh >= 2:
+                segments = segments[-fresh:]
+            if len(segments) < 2:
+                return 0
+            first = segment_range(os.path.basename(segments[0]))[0]
+            last = segment_range(os.path.basename(segments[-1]))[1]
+            frames = [read_column_store(path) for path in segments]
+            write_column_store(pd.concat(frames, ignore_index=True), self._segment_path(first, last))
+            for path in segments:
+                shutil.rmtree(path, ignore_errors=True)
+            return len(segments)
+        except Exception as e:
+            print(f"Error compacting {self.directory}: {e}")
+            return 0
+        finally:
+            self._compacting = False
+
+    def read(self, columns=None):
+        """
+        All ingested records: flushed segments plus the in-memory batch.
+        """
+        # Held across the read so a concurrent flush cannot count rows twice
+        with self._lock:
+            frames = [read_segments(self.directory, columns)] + list(self._pending)
+        frames = [frame for frame in frames if len(frame)]
+        if not frames:
+            return pd.DataFrame(columns=columns or [])
+        df = pd.concat(frames, ignore_index=True)
+        return df if columns is None else df.reindex(columns=list(columns))
+
+    def stats(self):
+        with self._lock:
+            return {
+                "rows_ingested": self.rows_ingested,
+                "pending_rows": self._pending_rows,
+                "segments": len(list_segments(self.directory)),
+                "directory": self.directory
+            }
+
@@ -0,0 +1,244 @@
+import time
+import bisect
+import threading
+import tracemalloc
+
+# Latency histogram bucket upper bounds (seconds), Prometheus style
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """
+    Cumulative-bucket latency histogram (one label set).
+    """
+
+    __slots__ = ('counts', 'total', 'count')
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """
+    In-process counters and latency histograms, rendered in the Prometheus
+    text exposition format.
+
+    Series are keyed by (metric name, sorted label pairs); metric help texts
+    are registered once with describe().
+    """
+
+    def __init__(self):
+        self._histograms = {}
+        self._counters = {}
+        self._help = {}
+        self._lock = threading.Lock()
+
+    def describe(self, name, kind, text):
+        self._help[name] = (kind, text)
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def render(self, extra=None):
+        """
+        Prometheus text format of every series, plus optional extra gauges
+        given as {name: (help, value)}.
+        """
+        with self._lock:
+            histograms = {key: (list(h.counts), h.total, h.count) for key, h in self._histograms.items()}
+            counters = dict(self._counters)
+
+        lines = []
+        emitted = set()
+
+        def header(name, default_kind):
+            if name in emitted:
+                return
+            emitted.add(name)
+            kind, text = self._help.get(name, (default_kind, name))
+            lines.append(f"# HELP {name} {text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), value in sorted(counters.items()):
+            header(name, 'counter')
+            lines.append(f"{name}{_labels(labels)} {_number(value)}")
+        for (name, labels), (counts, total, count) in sorted(histograms.items()):
+            header(name, 'histogram')
+            cumulative = 0
+            for bound, bucket in zip(LATENCY_BUCKETS + (float('inf'),), counts):
+                cumulative += bucket
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f"{name}_bucket{_labels(labels + (('le', le),))} {cumulative}")
+            lines.append(f"{name}_sum{_labels(labels)} {_number(total)}")
+            lines.append(f"{name}_count{_labels(labels)} {count}")
+        for name, (text, value) in sorted((extra or {}).items()):
+            lines.append(f"# HELP {name} {text}")
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(pairs):
+    if not pairs:
+        return ""
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(pairs, escaped)) + "}"
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+METRICS = MetricsRegistry()
+METRICS.describe('driftguard_phase_seconds', 'histogram', 'Time spent per drift computation phase')
+METRICS.describe('driftguard_feature_seconds', 'histogram', 'Time spent scoring one feature, per phase')
+METRICS.describe('driftguard_request_seconds', 'histogram', 'HTTP request latency per endpoint')
+METRICS.describe('driftguard_errors_total', 'counter', 'Errors caught and logged, per location')
+METRICS.describe('driftguard_rows_total', 'counter', 'Rows processed per phase')
+METRICS.describe('driftguard_alloc_bytes_total', 'counter',
+                 'Net bytes allocated per phase (only while tracemalloc is tracing)')
+
+# When False (config.METRICS_ENABLED), span() returns a shared no-op and nothing is recorded
+ENABLED = True
+
+_local = threading.local()
+
+
+class Span:
+    """
+    Times one phase; records into METRICS and the current request's trace, if any.
+    """
+
+    __slots__ = ('metric', 'labels', 'start', 'memory')
+
+    def __init__(self, metric, labels):
+        self.metric = metric
+        self.labels = labels
+
+    def __enter__(self):
+        self.memory = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        METRICS.observe(self.metric, elapsed, **self.labels)
+        allocated = None
+        if self.memory is not None:
+            allocated = max(tracemalloc.get_traced_memory()[0] - self.memory, 0)
+            METRICS.inc('driftguard_alloc_bytes_total', allocated, **self.labels)
+        trace = getattr(_local, 'trace', None)
+        if trace is not None:
+            trace.append((self.metric, self.labels, elapsed, allocated))
+        return False
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(phase, feature=None):
+    """
+    Context manager timing one phase of a drift computation.
+
+    Args:
+        phase: Phase name ('load', 'dropna', 'binning', 'metrics', 'ks', 'report', ...).
+        feature: Optional feature name; per-feature spans go to driftguard_feature_seconds.
+    """
+    if not ENABLED:
+        return _NO_SPAN
+    if feature is None:
+        return Span('driftguard_phase_seconds', {'phase': phase})
+    return Span('driftguard_feature_seconds', {'phase': phase, 'feature': feature})
+
+
+def count_error(where):
+    if ENABLED:
+        METRICS.inc('driftguard_errors_total', where=where)
+
+
+def count_rows(phase, rows):
+    if ENABLED:
+        METRICS.inc('driftguard_rows_total', rows, phase=phase)
+
+
+def start_trace():
+    """
+    Collect the spans of the current thread (one request) until stop_trace().
+    """
+    _local.trace = []
+
+
+def stop_trace():
+    """
+    Returns:
+        list: Recorded spans as dicts, in completion order.
+    """
+    trace = getattr(_local, 'trace', None) or []
+    _local.trace = None
+    return [dict(labels, metric=metric, seconds=round(elapsed, 6),
+                 **({} if allocated is None else {'alloc_bytes': allocated}))
+            for metric, labels, elapsed, allocated in trace]
+
+
+def summarize_trace(spans):
+    """
+    Total seconds (and allocated bytes) per phase across a trace.
+    """
+    phases = {}
+    for entry in spans:
+        phase = phases.setdefault(entry['phase'], {'seconds': 0.0, 'calls': 0})
+        phase['seconds'] = round(phase['seconds'] + entry['seconds'], 6)
+        phase['calls'] += 1
+        if 'alloc_bytes' in entry:
+            phase['alloc_bytes'] = phase.get('alloc_bytes', 0) + entry['alloc_bytes']
+    return phases
+
+
+def process_gauges():
+    """
+    Process-level gauges for /metrics (resident memory, traced memory).
+    """
+    gauges = {}
+    try:
+        import resource
+        # ru_maxrss is in KiB on Linux
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        gauges['driftguard_process_peak_rss_bytes'] = ('Peak resident set size', peak * 1024)
+    except ImportError:
+        pass
+    if tracemalloc.is_tracing():
+        current, peak = tracemalloc.get_traced_memory()
+        gauges['driftguard_traced_memory_bytes'] = ('Memory currently traced by tracemalloc', current)
+    return gauges
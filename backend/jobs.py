@@ -0,0 +1,130 @@
+import time
+import uuid
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+
+
+class Job:
+    """
+    One background computation and its outcome.
+    """
+
+    def __init__(self, key, clock=time.time):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.status = JOB_QUEUED
+        self.result = None
+        self.error = None
+        self.created_at = clock()
+        self.started_at = None
+        self.finished_at = None
+        self.done = threading.Event()
+
+    @property
+    def finished(self):
+        # finished_at is set together with the final status, under the manager's lock
+        return self.finished_at is not None
+
+    def to_dict(self, include_result=True):
+        entry = {
+            "job_id": self.id,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at
+        }
+        if self.status == JOB_FAILED:
+            entry["error"] = self.error
+        if include_result and self.status == JOB_DONE:
+            entry["result"] = self.result
+        return entry
+
+
+class JobManager:
+    """
+    Runs expensive computations on a background thread pool behind job ids.
+
+    Submitting a key that already has a queued or running job returns that
+    job instead of starting another, so identical concurrent requests share
+    one computation. Finished jobs stay pollable for `ttl` seconds.
+    """
+
+    def __init__(self, max_workers=4, ttl=600, max_jobs=1000, clock=time.time):
+        self.ttl = ttl
+        self.max_jobs = max_jobs
+        self.clock = clock
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='drift-job')
+        self._jobs = OrderedDict()
+        self._active = {}
+        self._lock = threading.Lock()
+
+    def submit(self, key, fn):
+        """
+        Run fn() in the background under key.
+
+        Returns:
+            tuple: (job, created) where created is False if an active job was reused.
+        """
+        with self._lock:
+            self._prune()
+            job = self._active.get(key)
+            if job is not None:
+                return job, False
+            job = Job(key, self.clock)
+            self._jobs[job.id] = job
+            self._active[key] = job
+        self._executor.submit(self._run, job, fn)
+        return job, True
+
+    def _run(self, job, fn):
+        job.status = JOB_RUNNING
+        job.started_at = self.clock()
+        try:
+            job.result = fn()
+            status = JOB_DONE
+        except Exception as e:
+            print(f"Error in background job {job.id}: {e}")
+            job.error = str(e)
+            status = JOB_FAILED
+        # Pruning reads finished_at under the lock, so a job never looks finished without it
+        finished_at = self.clock()
+        with self._lock:
+            job.finished_at = finished_at
+            job.status = status
+            if self._active.get(job.key) is job:
+                del self._active[job.key]
+        job.done.set()
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def wait(self, job_id, timeout=None):
+        """
+        Wait up to timeout seconds for a job to finish.
+
+        Returns:
+            Job, or None if unknown.
+        """
+        job = self.get(job_id)
+        if job is not None:
+            job.done.wait(timeout)
+        return job
+
+    def _prune(self):
+        # Caller holds the lock; finished jobs expire after ttl, oldest first beyond max_jobs
+        now = self.clock()
+        for job_id in list(self._jobs):
+            job = self._jobs[job_id]
+            expired = job.finished and now - job.finished_at > self.ttl
+            if expired or (len(self._jobs) > self.max_jobs and job.finished):
+                del self._jobs[job_id]
+
+    def shutdown(self, wait=False):
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,322 @@
+import os
+import time
+import threading
+import numpy as np
+import pandas as pd
+
+from drift_detection import bin_counts_matrix, binned_metric_arrays, drift_status
+from snapshot import read_snapshot, write_snapshot
+
+DEFAULT_WINDOWS = {
+    '5m': 300,
+    '1h': 3600,
+    '24h': 86400
+}
+# Per-slot ring counts are 32-bit (a slot holds one slot_width of records);
+# running totals over the whole window stay 64-bit
+SLOT_COUNT_DTYPE = np.int32
+MONITOR_SNAPSHOT_FORMAT = 1
+
+
+class WindowState:
+    """
+    Ring buffer of per-slot bucket counts for one time window.
+
+    A window of `seconds` is split into `slots` equal time slots. Running
+    totals are kept alongside the ring, so adding a batch or evicting an
+    expired slot costs O(features x buckets), independent of window length.
+
+    Modes:
+        'sliding': covers the most recent `slots` slots.
+        'tumbling': covers the slots of the current aligned window period
+            and resets when a new period starts.
+    """
+
+    __slots__ = ('name', 'seconds', 'slots', 'mode', 'slot_width', 'counts', 'n', 'slot_ids',
+                 'totals', 'total_n')
+
+    def __init__(self, name, seconds, n_features, n_bins, slots=60, mode='sliding'):
+        if mode not in ('sliding', 'tumbling'):
+            raise ValueError(f"Unknown window mode '{mode}'")
+        self.name = name
+        self.seconds = seconds
+        self.slots = slots
+        self.mode = mode
+        self.slot_width = seconds / slots
+        self.counts = np.zeros((slots, n_features, n_bins), dtype=SLOT_COUNT_DTYPE)
+        self.n = np.zeros((slots, n_features), dtype=SLOT_COUNT_DTYPE)
+        self.slot_ids = np.full(slots, -1, dtype=np.int64)
+        self.totals = np.zeros((n_features, n_bins), dtype=np.int64)
+        self.total_n = np.zeros(n_features, dtype=np.int64)
+
+    def slot_id(self, timestamp):
+        return int(timestamp // self.slot_width)
+
+    def _is_live(self, slot_id, current):
+        if self.mode == 'tumbling':
+            return slot_id // self.slots == current // self.slots
+        return current - self.slots < slot_id <= current
+
+    def _evict(self, pos):
+        self.totals -= self.counts[pos]
+        self.total_n -= self.n[pos]
+        self.counts[pos] = 0
+        self.n[pos] = 0
+        self.slot_ids[pos] = -1
+
+    def advance(self, timestamp):
+        """
+        Evict every slot that has left the window as of timestamp.
+        """
+        current = self.slot_id(timestamp)
+        for pos in np.flatnonzero(self.slot_ids >= 0):
+            if not self._is_live(self.slot_ids[pos], current):
+                self._evict(pos)
+
+    def add(self, timestamp, counts, n, now):
+        """
+        Add bucket counts observed at timestamp; records already outside the window are dropped.
+        """
+        slot_id = self.slot_id(timestamp)
+        if not self._is_live(slot_id, self.slot_id(now)):
+            return
+        pos = slot_id % self.slots
+        if self.slot_ids[pos] != slot_id:
+            if self.slot_ids[pos] >= 0:
+                self._evict(pos)
+            self.slot_ids[pos] = slot_id
+        self.counts[pos] += counts
+        self.n[pos] += n
+        self.totals += counts
+        self.total_n += n
+
+
+class DriftMonitor:
+    """
+    Online drift monitor over time windows of incoming prediction records.
+
+    Records are binned once on the baseline profile's edges as they arrive
+    and added to every window's ring buffer; PSI/KL/JS/Wasserstein for a
+    window are derived from its running totals in O(buckets) per feature.
+    KS needs the full sample and is not tracked online, so statuses are
+    based on PSI and KL.
+    """
+
+    def __init__(self, baseline_profile, windows=None, slots=60, modes=None,
+                 columns=None, clock=time.time):
+        if windows is None:
+            windows = DEFAULT_WINDOWS
+        if columns is None:
+            columns = list(baseline_profile.features.keys())
+        modes = modes or {}
+        self.baseline_profile = baseline_profile
+        self.columns = [col for col in columns if col in baseline_profile.features]
+        self._index = {col: i for i, col in enumerate(self.columns)}
+        self.edges, self.n_edges, self.expected_counts, self.n_expected = \
+            baseline_profile.stacked(self.columns)
+        n_bins = self.expected_counts.shape[1]
+
+        self.windows = {
+            name: WindowState(name, seconds, len(self.columns), n_bins, slots,
+                              modes.get(name, 'sliding'))
+            for name, seconds in windows.items()
+        }
+        # Rows are grouped at the finest slot width before binning
+        self.resolution = min(w.slot_width for w in self.windows.values())
+        self.clock = clock
+        self.records_seen = 0
+        self._lock = threading.Lock()
+
+    def _block(self, records):
+        if not isinstance(records, pd.DataFrame):
+            records = pd.DataFrame.from_records(records)
+        block = np.full((len(self.columns), len(records)), np.nan)
+        for i, col in enumerate(self.columns):
+            if col in records.columns:
+                block[i] = pd.to_numeric(records[col], errors='coerce').to_numpy(dtype=float)
+        return records, block
+
+    def ingest(self, records, timestamps=None, timestamp_col='timestamp'):
+        """
+        Add a batch of prediction records to every window.
+
+        Args:
+            records: DataFrame or list of dicts with feature columns.
+            timestamps: Scalar or per-row epoch seconds. Defaults to the
+                timestamp_col column if present, else the current time.
+            timestamp_col: Column holding per-row epoch seconds.
+
+        Returns:
+            int: Number of records ingested.
+        """
+        records, block = self._block(records)
+        if len(records) == 0:
+            return 0
+        now = self.clock()
+        if timestamps is None and timestamp_col in records.columns:
+            timestamps = pd.to_numeric(records[timestamp_col], errors='coerce').to_numpy(dtype=float)
+        if timestamps is None:
+            timestamps = now
+
+        if np.ndim(timestamps) == 0:
+            groups = [(float(timestamps), block)]
+        else:
+            timestamps = np.where(np.isnan(timestamps), now, np.asarray(timestamps, dtype=float))
+            keys = np.floor(timestamps / self.resolution).astype(np.int64)
+            order = np.argsort(keys, kind='stable')
+            keys = keys[order]
+            starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+            bounds = np.r_[starts, len(keys)]
+            groups = [(keys[bounds[g]] * self.resolution, block[:, order[bounds[g]:bounds[g + 1]]])
+                      for g in range(len(starts))]
+
+        # Clamp clock-skewed future timestamps to now so reads never evict them early
+        binned = [(min(t, now), bin_counts_matrix(sub, self.edges, self.n_edges),
+                   np.sum(~np.isnan(sub), axis=1))
+                  for t, sub in groups]
+
+        with self._lock:
+            for window in self.windows.values():
+                window.advance(now)
+                for t, counts, n in binned:
+                    window.add(t, counts, n, now)
+            self.records_seen += len(records)
+        return len(records)
+
+    def _metrics(self, totals, total_n):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            metrics = binned_metric_arrays(self.expected_counts, self.n_expected, totals, total_n,
+                                           self.edges)
+        for name in metrics:
+            metrics[name][(self.n_edges < 2) | (total_n == 0)] = 0.0
+        return metrics
+
+    def window_report(self, window_name, now=None):
+        """
+        Drift metrics for every feature over one window.
+
+        Returns:
+            dict: feature_name -> {'psi', 'kl', 'js', 'wasserstein', 'n', 'status'}
+                (features with no records in the window are omitted).
+        """
+        window = self.windows[window_name]
+        with self._lock:
+            window.advance(self.clock() if now is None else now)
+            totals = window.totals.copy()
+            total_n = window.total_n.copy()
+
+        metrics = self._metrics(totals, total_n)
+        report = {}
+        for i, col in enumerate(self.columns):
+            if total_n[i] == 0:
+                continue
+            psi = float(metrics['psi'][i])
+            kl = float(metrics['kl'][i])
+            report[col] = {
+                'psi': round(psi, 4),
+                'kl': round(kl, 4),
+                'js': round(float(metrics['js'][i]), 4),
+                'wasserstein': round(float(metrics['wasserstein'][i]), 4),
+                'n': int(total_n[i]),
+                'status': drift_status(psi, 0.0, kl)
+            }
+        return report
+
+    def feature_metrics(self, window_name, feature_name, now=None):
+        """
+        Drift metrics for a single feature over one window, in O(buckets).
+        """
+        i = self._index[feature_name]
+        window = self.windows[window_name]
+        with self._lock:
+            window.advance(self.clock() if now is None else now)
+            totals = window.totals[i:i + 1].copy()
+            total_n = window.total_n[i:i + 1].copy()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            metrics = binned_metric_arrays(self.expected_counts[i:i + 1], self.n_expected[i:i + 1],
+                                           totals, total_n, self.edges[i:i + 1])
+        if total_n[0] == 0 or self.n_edges[i] < 2:
+            return {name: 0.0 for name in metrics}
+        return {name: float(values[0]) for name, values in metrics.items()}
+
+    def snapshot(self, now=None):
+        """
+        Reports for every window, plus record counts.
+        """
+        now = self.clock() if now is None else now
+        return {
+            'records_seen': self.records_seen,
+            'windows': {
+                name: {
+                    'seconds': window.seconds,
+                    'mode': window.mode,
+                    'features': self.window_report(name, now)
+                }
+                for name, window in self.windows.items()
+            }
+        }
+
+    def save(self, path, now=None):
+        """
+        Write the monitor's window state to a memory-mappable snapshot file.
+
+        Only the ring buffers and running totals are stored; the baseline
+        side is identified by its version and rebuilt from the profile.
+        """
+        now = self.clock() if now is None else now
+        arrays = {}
+        with self._lock:
+            for i, window in enumerate(self.windows.values()):
+                window.advance(now)
+                arrays[f"w{i}_counts"] = window.counts
+                arrays[f"w{i}_n"] = window.n
+                arrays[f"w{i}_slot_ids"] = window.slot_ids
+                arrays[f"w{i}_totals"] = window.totals
+                arrays[f"w{i}_total_n"] = window.total_n
+            meta = {
+                "format": MONITOR_SNAPSHOT_FORMAT,
+                "baseline_version": self.baseline_profile.version,
+                "columns": self.columns,
+                "n_bins": int(self.expected_counts.shape[1]),
+                "records_seen": self.records_seen,
+                "windows": [{"name": w.name, "seconds": w.seconds, "slots": w.slots, "mode": w.mode}
+                            for w in self.windows.values()]
+            }
+            write_snapshot(path, meta, arrays)
+
+    @classmethod
+    def load(cls, baseline_profile, path, clock=time.time):
+        """
+        Restore a monitor saved with save().
+
+        Window arrays are copy-on-write views onto the mapped snapshot, so a
+        restore costs the same however many features and slots there are,
+        and only pages that receive new records are ever copied.
+
+        Returns:
+            DriftMonitor, or None if the file is missing, unreadable, or was
+            written for another baseline version, column set or bucket count.
+        """
+        if not os.path.exists(path):
+            return None
+        try:
+            meta, arrays = read_snapshot(path, mode='c')
+        except Exception as e:
+            print(f"Error loading monitor snapshot from {path}: {e}")
+            return None
+        if meta.get("format") != MONITOR_SNAPSHOT_FORMAT or meta["baseline_version"] != baseline_profile.version:
+            return None
+        windows = {w["name"]: w["seconds"] for w in meta["windows"]}
+        modes = {w["name"]: w["mode"] for w in meta["windows"]}
+        slots = meta["windows"][0]["slots"] if meta["windows"] else 60
+        monitor = cls(baseline_profile, windows, slots, modes, meta["columns"], clock)
+        if monitor.columns != meta["columns"] or monitor.expected_counts.shape[1] != meta["n_bins"]:
+            return None
+        for i, window in enumerate(monitor.windows.values()):
+            window.counts = arrays[f"w{i}_counts"]
+            window.n = arrays[f"w{i}_n"]
+            window.slot_ids = arrays[f"w{i}_slot_ids"]
+            window.totals = arrays[f"w{i}_totals"]
+            window.total_n = arrays[f"w{i}_total_n"]
+        monitor.records_seen = meta["records_seen"]
+        return monitor
@@ -0,0 +1,232 @@
+import time
+import numpy as np
+
+METHODS = ('pca', 'classifier', 'mmd')
+
+# Status thresholds per method
+AUC_THRESHOLDS = (0.6, 0.7)  # warning, critical
+PCA_RATIO_THRESHOLDS = (1.2, 1.5)
+MMD_P_VALUE = 0.001
+
+
+def sample_index(n_rows, max_rows, rng):
+    """
+    Sorted uniform sample of row positions without replacement, or None
+    for all rows (max_rows is None or not smaller than n_rows).
+    """
+    if max_rows is None or n_rows <= max_rows:
+        return None
+    return np.sort(rng.choice(n_rows, max_rows, replace=False))
+
+
+def sample_rows(matrix, max_rows, rng):
+    """
+    Uniform row sample without replacement (all rows if max_rows is None or larger).
+    """
+    index = sample_index(len(matrix), max_rows, rng)
+    return matrix if index is None else matrix[index]
+
+
+class MultivariateBaseline:
+    """
+    Baseline model for joint (multivariate) drift, fitted once per training data version.
+
+    Holds a row sample of the numeric training matrix standardized with the
+    baseline mean/std (missing values imputed to the mean), a PCA basis
+    covering `variance` of the variance (always dropping at least one
+    direction), the reconstruction errors of a held-out baseline half, and
+    the random Fourier feature map used for MMD.
+    """
+
+    def __init__(self, training_df, columns=None, max_rows=20000, variance=0.9,
+                 n_features=256, seed=0):
+        rng = np.random.default_rng(seed)
+        if columns is None:
+            columns = training_df.select_dtypes(include=[np.number]).columns.tolist()
+        self.columns = columns
+        matrix = sample_rows(training_df[columns].to_numpy(dtype=float), max_rows, rng)
+        self.mean = np.nanmean(matrix, axis=0)
+        std = np.nanstd(matrix, axis=0)
+        self.std = np.where(std > 0, std, 1.0)
+        self.sample = self.standardize(matrix)
+
+        # PCA on one half, reconstruction error reference on the other
+        order = rng.permutation(len(self.sample))
+        fit_rows = self.sample[order[:max(len(order) // 2, 1)]]
+        held_out = self.sample[order[len(order) // 2:]]
+        _, singular, vt = np.linalg.svd(fit_rows - fit_rows.mean(axis=0), full_matrices=False)
+        explained = np.cumsum(singular ** 2) / max(np.sum(singular ** 2), 1e-12)
+        k = int(np.searchsorted(explained, variance) + 1)
+        self.center = fit_rows.mean(axis=0)
+        self.components = vt[:max(1, min(k, len(vt) - 1))]
+        self.baseline_errors = self.reconstruction_errors(held_out)
+
+        # Random Fourier features for an RBF kernel, bandwidth by the median heuristic
+        pairs = self.sample[rng.choice(len(self.sample), (min(len(self.sample), 1000), 2))]
+        distances = np.linalg.norm(pairs[:, 0] - pairs[:, 1], axis=1)
+        bandwidth = float(np.median(distances[distances > 0])) if np.any(distances > 0) else 1.0
+        self.rff_weights = rng.normal(0.0, 1.0 / bandwidth, (len(columns), n_features))
+        self.rff_offsets = rng.uniform(0, 2 * np.pi, n_features)
+        self.seed = seed
+
+    def standardize(self, matrix):
+        scaled = (matrix - self.mean) / self.std
+        return np.where(np.isnan(scaled), 0.0, scaled)
+
+    def reconstruction_errors(self, scaled):
+        centered = scaled - self.center
+        projected = centered @ self.components.T @ self.components
+        return np.mean((centered - projected) ** 2, axis=1)
+
+    def embed(self, scaled):
+        """
+        Random Fourier feature map; the RBF-kernel MMD is approximated by
+        the distance between mean embeddings, linear in rows.
+        """
+        return np.sqrt(2.0 / self.rff_weights.shape[1]) * np.cos(scaled @ self.rff_weights + self.rff_offsets)
+
+
+def pca_drift(baseline, scaled):
+    """
+    Reconstruction error of production rows on the baseline PCA basis.
+
+    Correlation changes move data off the baseline's principal subspace, so
+    the mean error rises even when every marginal is unchanged.
+    """
+    errors = baseline.reconstruction_errors(scaled)
+    baseline_error = float(np.mean(baseline.baseline_errors))
+    production_error = float(np.mean(errors))
+    ratio = production_error / baseline_error if baseline_error > 0 else (0.0 if production_error == 0 else np.inf)
+    return {
+        'components': int(len(baseline.components)),
+        'baseline_error': round(baseline_error, 6),
+        'production_error': round(production_error, 6),
+        'error_ratio': round(float(ratio), 4),
+        'status': _status(ratio, PCA_RATIO_THRESHOLDS)
+    }
+
+
+def classifier_drift(baseline, scaled, seed=0):
+    """
+    Domain classifier: AUC of a model separating baseline from production rows
+    on a held-out split (0.5 means indistinguishable).
+    """
+    try:
+        from sklearn.ensemble import HistGradientBoostingClassifier
+        from sklearn.metrics import roc_auc_score
+    except ImportError:
+        return {'error': 'scikit-learn is not installed', 'status': 'good'}
+
+    rng = np.random.default_rng(seed)
+    n = min(len(baseline.sample), len(scaled))
+    X = np.vstack([sample_rows(baseline.sample, n, rng), sample_rows(scaled, n, rng)])
+    y = np.r_[np.zeros(n), np.ones(n)]
+    order = rng.permutation(len(y))
+    split = len(order) // 2
+    train, test = order[:split], order[split:]
+    if len(np.unique(y[test])) < 2 or len(np.unique(y[train])) < 2:
+        return {'auc': 0.5, 'status': 'good'}
+
+    model = HistGradientBoostingClassifier(max_iter=100, max_depth=4, random_state=seed)
+    model.fit(X[train], y[train])
+    auc = float(roc_auc_score(y[test], model.predict_proba(X[test])[:, 1]))
+    return {'auc': round(auc, 4), 'status': _status(auc, AUC_THRESHOLDS)}
+
+
+def mmd_drift(baseline, scaled, seed=0):
+    """
+    RBF-kernel MMD via random Fourier features.
+
+    The statistic is the squared distance between mean embeddings. Under no
+    drift the mean difference is approximately Gaussian with covariance S
+    (pooled embedding covariance x (1/n_b + 1/n_p)), so the statistic is
+    matched to a scaled chi-square (Welch-Satterthwaite) for the p-value,
+    with no permutation loop.
+    """
+    rng = np.random.default_rng(seed)
+    base = baseline.embed(baseline.sample)
+    prod = baseline.embed(sample_rows(scaled, len(baseline.sample), rng))
+    mmd = float(np.sum((base.mean(axis=0) - prod.mean(axis=0)) ** 2))
+
+    covariance = np.cov(np.vstack([base - base.mean(axis=0), prod - prod.mean(axis=0)]), rowvar=False)
+    S = covariance * (1.0 / len(base) + 1.0 / len(prod))
+    trace = float(np.trace(S))
+    trace_sq = float(np.sum(S * S))
+    if trace <= 0 or trace_sq <= 0:
+        p_value = 1.0
+    else:
+        from scipy.special import chdtrc
+        scale = trace_sq / trace
+        dof = trace ** 2 / trace_sq
+        p_value = float(chdtrc(dof, mmd / scale))
+    return {
+        'mmd': round(mmd, 6),
+        'p_value': round(p_value, 6),
+        'status': 'warning' if p_value <= MMD_P_VALUE else 'good'
+    }
+
+
+def _status(value, thresholds):
+    if value >= thresholds[1]:
+        return 'critical'
+    if value >= thresholds[0]:
+        return 'warning'
+    return 'good'
+
+
+def detect_multivariate_drift(baseline, production_df, methods=METHODS, max_rows=20000,
+                              budget_seconds=None, seed=0):
+    """
+    Joint drift over the full numeric matrix.
+
+    Args:
+        baseline: MultivariateBaseline fitted on the training data.
+        production_df: DataFrame of production data.
+        methods: Any of 'pca', 'classifier', 'mmd', run in the given order.
+        max_rows: Production rows sampled (uniformly) before scoring.
+        budget_seconds: Optional latency budget; methods not started before it
+            runs out are reported with status 'skipped'.
+
+    Returns:
+        dict: {'rows_sampled', 'columns', 'methods': {method: result}, 'status'}
+    """
+    start = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    columns = [col for col in baseline.columns if col in production_df.columns]
+    # Sample row positions first so only the sampled rows are ever materialized
+    index = sample_index(len(production_df), max_rows, rng)
+    n_rows = len(production_df) if index is None else len(index)
+    matrix = np.full((n_rows, len(baseline.columns)), np.nan)
+    for i, col in enumerate(baseline.columns):
+        if col in production_df.columns:
+            values = production_df[col].to_numpy()
+            matrix[:, i] = values if index is None else values[index]
+    scaled = baseline.standardize(matrix)
+
+    runners = {
+        'pca': lambda: pca_drift(baseline, scaled),
+        'classifier': lambda: classifier_drift(baseline, scaled, seed),
+        'mmd': lambda: mmd_drift(baseline, scaled, seed=seed)
+    }
+    results = {}
+    for method in methods:
+        if method not in runners:
+            raise ValueError(f"Unknown multivariate method '{method}'")
+        if budget_seconds is not None and time.perf_counter() - start >= budget_seconds:
+            results[method] = {'skipped': 'latency budget exhausted', 'status': 'skipped'}
+            continue
+        method_start = time.perf_counter()
+        results[method] = runners[method]()
+        results[method]['seconds'] = round(time.perf_counter() - method_start, 4)
+
+    # Skipped methods say nothing about drift
+    severity = {'good': 0, 'warning': 1, 'critical': 2}
+    statuses = [result['status'] for result in results.values() if result['status'] in severity]
+    status = max(statuses, key=severity.get, default='good')
+    return {
+        'rows_sampled': int(len(scaled)),
+        'columns': columns,
+        'methods': results,
+        'status': status,
+        'seconds': round(time.perf_counter() - start, 4)
+    }
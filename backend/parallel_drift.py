@@ -0,0 +1,212 @@
+import os
+import atexit
+import shutil
+import tempfile
+import threading
+import weakref
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import numpy as np
+
+from drift_detection import score_stacked
+
+# Worker pools are expensive to start, so they are kept for the life of the process
+_pools = {}
+_pools_lock = threading.Lock()
+
+# Baseline arrays written to memory-mapped files: profile -> {columns: (path, offsets)}
+_baseline_files = weakref.WeakKeyDictionary()
+_baseline_lock = threading.Lock()
+_tmp_root = None
+_file_counter = 0
+
+# Per-worker cache of opened baseline memory maps (path -> array)
+_worker_maps = {}
+
+
+def resolve_workers(n_jobs):
+    """
+    Turn an n_jobs setting into a worker count (None or -1 means every core).
+    """
+    if n_jobs is None or n_jobs < 0:
+        return os.cpu_count() or 1
+    return max(1, n_jobs)
+
+
+def get_pool(executor, n_workers):
+    """
+    Return a shared process or thread pool of the requested size.
+    """
+    key = (executor, n_workers)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            if executor == 'process':
+                pool = ProcessPoolExecutor(max_workers=n_workers)
+            elif executor == 'thread':
+                pool = ThreadPoolExecutor(max_workers=n_workers)
+            else:
+                raise ValueError(f"Unknown executor '{executor}'")
+            _pools[key] = pool
+        return pool
+
+
+def _shared_dir():
+    """
+    Scratch directory for memory-mapped arrays, on /dev/shm when available.
+    """
+    global _tmp_root
+    if _tmp_root is None:
+        base = '/dev/shm' if os.path.isdir('/dev/shm') and os.access('/dev/shm', os.W_OK) else None
+        _tmp_root = tempfile.mkdtemp(prefix='driftguard-', dir=base)
+    return _tmp_root
+
+
+def _write_memmap(name, array):
+    """
+    Copy an array into a .npy file that workers can open with mmap_mode='r'.
+    """
+    path = os.path.join(_shared_dir(), name)
+    out = np.lib.format.open_memmap(path, mode='w+', dtype=array.dtype, shape=array.shape)
+    out[...] = array
+    out.flush()
+    del out
+    return path
+
+
+def _next_name(prefix):
+    global _file_counter
+    with _baseline_lock:
+        _file_counter += 1
+        return f"{prefix}-{os.getpid()}-{_file_counter}.npy"
+
+
+def _remove_files(entries):
+    for path, _ in entries.values():
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _open_memmap(path):
+    array = _worker_maps.get(path)
+    if array is None:
+        array = np.load(path, mmap_mode='r')
+        _worker_maps[path] = array
+        # Bounded so maps of dropped baselines do not accumulate in long-lived workers
+        while len(_worker_maps) > 16:
+            _worker_maps.pop(next(iter(_worker_maps)))
+    return array
+
+
+def baseline_memmap(baseline_profile, columns):
+    """
+    Sorted baseline samples of the given columns as one memory-mapped flat array.
+
+    Written once per (profile, columns) and reused by later scans.
+
+    Returns:
+        tuple: (path, offsets) where feature i occupies flat[offsets[i]:offsets[i + 1]].
+    """
+    key = tuple(columns)
+    with _baseline_lock:
+        entries = _baseline_files.get(baseline_profile)
+        if entries is None:
+            entries = {}
+            _baseline_files[baseline_profile] = entries
+            # Drop the files once the profile itself is garbage collected
+            weakref.finalize(baseline_profile, _remove_files, entries)
+        entry = entries.get(key)
+    if entry is None:
+        sorted_values = [baseline_profile.features[col].sorted_values for col in columns]
+        offsets = np.zeros(len(columns) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(v) for v in sorted_values])
+        flat = np.concatenate(sorted_values) if sorted_values else np.zeros(0)
+        entry = (_write_memmap(_next_name('baseline'), flat), offsets)
+        with _baseline_lock:
+            entries[key] = entry
+    return entry
+
+
+def _score_shard(block_path, baseline_path, offsets, stacked, start, stop):
+    """
+    Process-pool task: score features start..stop from memory-mapped inputs.
+    """
+    block = np.load(block_path, mmap_mode='r')[start:stop]
+    flat = _open_memmap(baseline_path)
+    sorted_baselines = [flat[offsets[i]:offsets[i + 1]] for i in range(start, stop)]
+    edges, n_edges, expected_counts, n_expected = stacked
+    return score_stacked(np.asarray(block), edges, n_edges, expected_counts, n_expected,
+                         sorted_baselines)
+
+
+def score_parallel(baseline_profile, columns, block, n_jobs=None, executor='process',
+                   shard_size=None):
+    """
+    Score a numeric production block with features sharded across a worker pool.
+
+    Process workers receive the production block and the baseline samples as
+    memory-mapped .npy files (on /dev/shm where available) rather than pickled
+    DataFrames; only the small per-shard edge and count arrays are pickled.
+    Results are reassembled in column order, so output does not depend on
+    worker scheduling.
+
+    Args:
+        baseline_profile: BaselineProfile holding every column in columns.
+        columns: Feature names, one per row of block.
+        block: 2-D float array (features x rows), NaN marks missing values.
+        n_jobs: Number of workers (None or -1 uses every core).
+        executor: 'process' or 'thread'.
+        shard_size: Features per task (defaults to ~4 tasks per worker).
+
+    Returns:
+        dict: feature_name -> metrics dict. Features with no production values are omitted.
+    """
+    n_workers = resolve_workers(n_jobs)
+    n_features = len(columns)
+    if n_features == 0:
+        return {}
+    if shard_size is None:
+        shard_size = max(1, -(-n_features // (n_workers * 4)))
+
+    edges, n_edges, expected_counts, n_expected = baseline_profile.stacked(columns)
+    shards = [(start, min(start + shard_size, n_features))
+              for start in range(0, n_features, shard_size)]
+    pool = get_pool(executor, n_workers)
+
+    if executor == 'thread':
+        # NumPy releases the GIL in sort/searchsorted/comparisons, so threads share the arrays directly
+        sorted_baselines = [baseline_profile.features[col].sorted_values for col in columns]
+        futures = [
+            pool.submit(score_stacked, block[start:stop], edges[start:stop], n_edges[start:stop],
+                        expected_counts[start:stop], n_expected[start:stop],
+                        sorted_baselines[start:stop])
+            for start, stop in shards
+        ]
+        rows = [row for future in futures for row in future.result()]
+    else:
+        baseline_path, offsets = baseline_memmap(baseline_profile, columns)
+        block_path = _write_memmap(_next_name('block'), np.ascontiguousarray(block, dtype=float))
+        try:
+            futures = [
+                pool.submit(_score_shard, block_path, baseline_path, offsets,
+                            (edges[start:stop], n_edges[start:stop],
+                             expected_counts[start:stop], n_expected[start:stop]),
+                            start, stop)
+                for start, stop in shards
+            ]
+            rows = [row for future in futures for row in future.result()]
+        finally:
+            os.remove(block_path)
+
+    return {col: metrics for col, metrics in zip(columns, rows) if metrics is not None}
+
+
+def _shutdown():
+    for pool in _pools.values():
+        pool.shutdown(wait=False, cancel_futures=True)
+    if _tmp_root is not None:
+        shutil.rmtree(_tmp_root, ignore_errors=True)
+
+
+atexit.register(_shutdown)
@@ -0,0 +1,216 @@
+import json
+import time
+import uuid
+import queue
+import threading
+
+# Marker placed on a subscriber queue when it fell behind and needs a full snapshot
+RESYNC = object()
+
+
+def merge_patch_diff(old, new):
+    """
+    JSON Merge Patch (RFC 7386) turning old into new.
+
+    Objects are diffed key by key (removed keys map to None); any other
+    changed value, including lists, is replaced whole.
+
+    Returns:
+        The patch, or None if old and new are equal.
+    """
+    if isinstance(old, dict) and isinstance(new, dict):
+        patch = {}
+        for key, value in new.items():
+            if key not in old:
+                patch[key] = value
+            else:
+                sub = merge_patch_diff(old[key], value)
+                if sub is not None:
+                    patch[key] = sub
+        for key in old:
+            if key not in new:
+                patch[key] = None
+        return patch or None
+    if old == new:
+        return None
+    # A dict replacing a non-dict would be merged into {}, so it is sent in full either way
+    return new
+
+
+def apply_merge_patch(target, patch):
+    """
+    Apply a JSON Merge Patch (the client-side counterpart of merge_patch_diff).
+    """
+    if not isinstance(patch, dict):
+        return patch
+    result = dict(target) if isinstance(target, dict) else {}
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        else:
+            result[key] = apply_merge_patch(result.get(key), value)
+    return result
+
+
+def format_event(event, data, event_id=None):
+    """
+    Encode one Server-Sent Events message.
+    """
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    for line in json.dumps(data, separators=(',', ':')).splitlines():
+        lines.append(f"data: {line}")
+    return "\n".join(lines) + "\n\n"
+
+
+class Subscription:
+    def __init__(self, topic, queue_size):
+        self.topic = topic
+        self.queue = queue.Queue(maxsize=queue_size)
+
+
+class Topic:
+    """
+    One shared payload stream (e.g. a model's dashboard) and its subscribers.
+
+    Versions restart at 1 whenever a topic is recreated, so event ids carry
+    a random per-topic epoch too: an id from an earlier incarnation of the
+    topic never matches, and that client gets a full snapshot.
+    """
+
+    def __init__(self, key, produce):
+        self.key = key
+        self.produce = produce
+        self.payload = None
+        self.version = 0
+        self.epoch = uuid.uuid4().hex[:12]
+        self.subscribers = set()
+        self.ready = threading.Event()
+        self.stop = threading.Event()
+        self.thread = None
+
+
+class Broadcaster:
+    """
+    Fans one producer per topic out to any number of SSE subscribers.
+
+    While a topic has subscribers, a single background thread calls its
+    producer every `interval` seconds and publishes a merge-patch delta
+    only when the payload changed, so server work per tick is independent
+    of the number of open dashboards and idle ticks send nothing.
+    """
+
+    def __init__(self, interval=2.0, heartbeat=15.0, queue_size=64):
+        self.interval = interval
+        self.heartbeat = heartbeat
+        self.queue_size = queue_size
+        self._topics = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, key, produce):
+        """
+        Subscribe to topic key, starting its producer thread if needed.
+
+        Args:
+            key: Topic key (hashable).
+            produce: Zero-argument callable returning the topic's current payload.
+        """
+        with self._lock:
+            topic = self._topics.get(key)
+            if topic is None:
+                topic = Topic(key, produce)
+                self._topics[key] = topic
+                topic.thread = threading.Thread(target=self._run, args=(topic,),
+                                                name=f"push-{key}", daemon=True)
+                topic.thread.start()
+            subscription = Subscription(topic, self.queue_size)
+            topic.subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        topic = subscription.topic
+        with self._lock:
+            topic.subscribers.discard(subscription)
+            if not topic.subscribers and self._topics.get(topic.key) is topic:
+                del self._topics[topic.key]
+                topic.stop.set()
+
+    def subscriber_count(self, key=None):
+        with self._lock:
+            if key is not None:
+                topic = self._topics.get(key)
+                return len(topic.subscribers) if topic else 0
+            return sum(len(topic.subscribers) for topic in self._topics.values())
+
+    def _run(self, topic):
+        while not topic.stop.is_set():
+            try:
+                payload = topic.produce()
+            except Exception as e:
+                print(f"Error producing push payload for {topic.key}: {e}")
+                payload = None
+
+            if payload is not None:
+                with self._lock:
+                    patch = merge_patch_diff(topic.payload, payload) if topic.payload is not None else None
+                    if topic.payload is None or patch is not None:
+                        topic.payload = payload
+                        topic.version += 1
+                        message = ('delta', topic.version, patch)
+                        for subscription in topic.subscribers:
+                            self._offer(subscription, message)
+                topic.ready.set()
+            topic.stop.wait(self.interval)
+
+    def _offer(self, subscription, message):
+        # Caller holds the lock; a full queue means a slow client: replace its backlog with a resync
+        if message[2] is None:
+            return
+        try:
+            subscription.queue.put_nowait(message)
+        except queue.Full:
+            with subscription.queue.mutex:
+                subscription.queue.queue.clear()
+            subscription.queue.put_nowait(RESYNC)
+
+    def _snapshot(self, topic):
+        with self._lock:
+            return topic.payload, topic.version
+
+    @staticmethod
+    def event_id(topic, version):
+        return f"{topic.epoch}-{version}"
+
+    def stream(self, subscription, last_event_id=None):
+        """
+        Generator of SSE messages for one subscriber: a snapshot (skipped if the
+        client's Last-Event-ID names this topic's current epoch and version),
+        then deltas and heartbeats.
+        """
+        topic = subscription.topic
+        try:
+            yield f"retry: {int(self.heartbeat * 1000)}\n\n"
+            while not topic.ready.wait(self.heartbeat):
+                yield ": keep-alive\n\n"
+
+            payload, version = self._snapshot(topic)
+            if last_event_id != self.event_id(topic, version):
+                yield format_event('snapshot', payload, self.event_id(topic, version))
+            while True:
+                try:
+                    message = subscription.queue.get(timeout=self.heartbeat)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+                    continue
+                if message is RESYNC:
+                    payload, version = self._snapshot(topic)
+                    yield format_event('snapshot', payload, self.event_id(topic, version))
+                    continue
+                event, message_version, patch = message
+                if message_version > version:
+                    version = message_version
+                    yield format_event(event, patch, self.event_id(topic, message_version))
+        finally:
+            self.unsubscribe(subscription)
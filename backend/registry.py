@@ -0,0 +1,121 @@
+import os
+import re
+import json
+
+from database import Database
+
+# Ids name directories under the profile root, so they must start alphanumeric (no '.' or '..')
+MODEL_ID_PATTERN = re.compile(r'^[A-Za-z0-9][A-Za-z0-9_.-]{0,127}$')
+
+
+class ModelSpec:
+    """
+    A registered model: its baseline (training) source, production source
+    and scoring parameters.
+    """
+
+    def __init__(self, model_id, training_path, production_path, buckets=10,
+                 group='default', name=None, profile_dir=None):
+        self.id = model_id
+        self.training_path = training_path
+        self.production_path = production_path
+        self.buckets = buckets
+        self.group = group
+        self.name = name or model_id
+        self.profile_dir = profile_dir
+
+    @classmethod
+    def from_row(cls, row, data_dir=None, profile_root=None):
+        def resolve(path):
+            if data_dir is not None and not os.path.isabs(path):
+                return os.path.join(data_dir, path)
+            return path
+        profile_dir = os.path.join(profile_root, row['id']) if profile_root else None
+        return cls(row['id'], resolve(row['training_path']), resolve(row['production_path']),
+                   row['buckets'], row['model_group'], row['name'], profile_dir)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "name": self.name,
+            "group": self.group,
+            "training_path": self.training_path,
+            "production_path": self.production_path,
+            "buckets": self.buckets
+        }
+
+
+class ModelRegistry:
+    """
+    Maps model ids to baseline and production sources, persisted in SQLite.
+
+    Relative data paths are resolved against data_dir; each model's baseline
+    profile is persisted under profile_root/<model id>/ so models whose
+    training files share a name never overwrite each other's profiles.
+    """
+
+    def __init__(self, database, data_dir=None, profile_root=None):
+        if isinstance(database, str):
+            database = Database(database)
+        self.database = database
+        self.data_dir = data_dir
+        self.profile_root = profile_root
+
+    def register(self, model_id, training_path, production_path, buckets=10,
+                 group='default', name=None):
+        """
+        Register or update a model.
+
+        Returns:
+            ModelSpec
+        """
+        if not MODEL_ID_PATTERN.match(str(model_id)):
+            raise ValueError(f"Invalid model id '{model_id}'")
+        if int(buckets) < 2:
+            raise ValueError("buckets must be at least 2")
+        self.database.upsert_model(model_id, training_path, production_path, int(buckets),
+                                   group or 'default', name)
+        return self.get(model_id)
+
+    def get(self, model_id):
+        """
+        Return the ModelSpec for model_id, or None if it is not registered.
+        """
+        row = self.database.get_model(model_id)
+        if row is None:
+            return None
+        return ModelSpec.from_row(row, self.data_dir, self.profile_root)
+
+    def list(self):
+        return [ModelSpec.from_row(row, self.data_dir, self.profile_root)
+                for row in self.database.list_models()]
+
+    def remove(self, model_id):
+        return self.database.delete_model(model_id)
+
+    def load_config(self, filepath):
+        """
+        Register every model listed in a JSON config file.
+
+        Returns:
+            int: Number of models registered.
+        """
+        try:
+            with open(filepath) as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error loading model config from {filepath}: {e}")
+            return 0
+        if isinstance(entries, dict):
+            entries = entries.get('models', [])
+
+        registered = 0
+        for entry in entries:
+            try:
+                self.register(entry['id'], entry['training_path'], entry['production_path'],
+                              entry.get('buckets', 10), entry.get('group', 'default'),
+                              entry.get('name'))
+                registered += 1
+            except (KeyError, ValueError, TypeError) as e:
+                print(f"Skipping invalid model config entry {entry}: {e}")
+        return registered
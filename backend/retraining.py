@@ -0,0 +1,308 @@
+import numpy as np
+
+# Candidate retraining intervals (days) evaluated by the what-if planner
+SCHEDULES = (1, 3, 7, 14, 30, 60, 90, 180)
+# Importance weights are clipped to [1 / MAX_WEIGHT, MAX_WEIGHT] so a few
+# baseline rows in sparse bins cannot dominate the estimate
+MAX_WEIGHT = 20.0
+# Cross-fitting folds for the reference model's baseline correctness
+FOLDS = 5
+
+
+def bin_matrix(df, features, profile, clip=False):
+    """
+    Baseline-profile bin index of every value, as a (features x rows) array.
+
+    Missing values get -1. Values outside the baseline edges are -1 too,
+    unless clip is set, in which case they fall into the first or last bin.
+    """
+    bins = np.full((len(features), len(df)), -1, dtype=np.int32)
+    for i, name in enumerate(features):
+        edges = profile.features[name].edges
+        if len(edges) < 2:
+            continue
+        values = df[name].to_numpy(dtype=float)
+        n_bins = len(edges) - 1
+        idx = np.searchsorted(edges, values, side='right') - 1
+        idx[values == edges[-1]] = n_bins - 1
+        if clip:
+            idx = np.clip(idx, 0, n_bins - 1)
+        else:
+            idx[(idx < 0) | (idx >= n_bins)] = -1
+        idx[np.isnan(values)] = -1
+        bins[i] = idx
+    return bins
+
+
+def gather_sum(tables, bins):
+    """
+    Sum over features of tables[feature, bin] for every row.
+
+    tables is (features x (max_bins + 1)[, ...]) with a zero last column,
+    so bin -1 (missing) picks that column and contributes nothing.
+    """
+    return tables[np.arange(len(bins))[:, None], bins].sum(axis=0)
+
+
+class RetrainingEstimator:
+    """
+    Accuracy estimate of a model under production drift, fitted once per
+    labeled baseline (training) window.
+
+    The model's correctness on each labeled baseline row comes from its
+    logged predictions (prediction_column) when the training data holds
+    them; otherwise a binned naive Bayes classifier on the baseline
+    profile's bins stands in for the model, cross-fitted so every row is
+    scored by a fit that did not see it. Production accuracy is then the
+    importance-weighted mean of that correctness, each row weighted by the
+    production / baseline density ratio of its bins (a product over
+    features, from one bincount per feature on the production side), so
+    estimating it for a new production window is a gather and a sum over
+    arrays, with no model refit.
+    """
+
+    def __init__(self, training_df, baseline_profile, label_column, prediction_column=None,
+                 smoothing=1.0, seed=0):
+        self.label_column = label_column
+        self.smoothing = smoothing
+        self.features = [name for name in baseline_profile.features
+                         if name not in (label_column, prediction_column) and name in training_df.columns]
+        self.profile = baseline_profile
+        self.n_bins = np.array([max(len(baseline_profile.features[name].edges) - 1, 0)
+                                for name in self.features])
+        self.width = int(self.n_bins.max()) + 1 if len(self.features) else 1
+
+        labeled = training_df[training_df[label_column].notna()]
+        self.classes, y = np.unique(labeled[label_column].to_numpy(), return_inverse=True)
+        self.rows = len(labeled)
+        self.bins = bin_matrix(labeled, self.features, baseline_profile)
+
+        if prediction_column is not None and prediction_column in labeled.columns:
+            self.source = 'predictions'
+            self.correct = (labeled[prediction_column].to_numpy() == labeled[label_column].to_numpy()).astype(float)
+        else:
+            self.source = 'naive_bayes'
+            self.correct = self._fit_naive_bayes(y, seed)
+        self.baseline_accuracy = float(np.mean(self.correct)) if self.rows else 0.0
+
+    def _fit_naive_bayes(self, y, seed):
+        """
+        Fit the binned naive Bayes reference model on every labeled row, and
+        score each row with the fit of the other folds (cross-fitting).
+
+        Returns:
+            array: 1.0 where the out-of-fold prediction is correct, else 0.0.
+        """
+        n_features, n_classes = len(self.features), len(self.classes)
+        folds = np.random.default_rng(seed).integers(0, FOLDS, self.rows)
+        counts = np.zeros((FOLDS, n_features, self.width, n_classes))
+        for i in range(n_features):
+            valid = self.bins[i] >= 0
+            flat = (folds[valid] * self.width + self.bins[i][valid]) * n_classes + y[valid]
+            counts[:, i] = np.bincount(flat, minlength=FOLDS * self.width * n_classes).reshape(
+                FOLDS, self.width, n_classes)
+        totals = np.bincount(folds * n_classes + y, minlength=FOLDS * n_classes).reshape(FOLDS, n_classes)
+
+        self.tables, self.prior = self._log_tables(counts.sum(axis=0), totals.sum(axis=0))
+        # Out-of-fold fit for each fold: everything except the fold's own rows
+        held_tables, held_prior = self._log_tables(counts.sum(axis=0) - counts, totals.sum(axis=0) - totals)
+        features = np.arange(n_features)[:, None]
+        scores = held_prior[folds] + held_tables[folds[None, :], features, self.bins].sum(axis=0)
+        return (np.argmax(scores, axis=-1) == y).astype(float)
+
+    def _log_tables(self, counts, totals):
+        """
+        Laplace-smoothed log likelihood per (feature, bin, class) and log prior
+        per class, for counts (..., features, width, classes) and totals (..., classes).
+        The last bin column is zeroed so missing values (bin -1) carry no evidence.
+        """
+        alpha = self.smoothing
+        tables = np.log((counts + alpha) / (totals[..., None, None, :] + alpha * self.n_bins[:, None, None]))
+        tables[..., -1, :] = 0.0
+        prior = np.log((totals + alpha) / (totals.sum(axis=-1, keepdims=True) + alpha * len(self.classes)))
+        return tables, prior
+
+    def log_weights(self, production_df):
+        """
+        Clipped log density ratio (production / baseline) of every baseline row.
+        """
+        alpha = self.smoothing
+        ratios = np.zeros((len(self.features), self.width))
+        production_bins = bin_matrix(production_df, self.features, self.profile, clip=True)
+        for i, name in enumerate(self.features):
+            n_bins = self.n_bins[i]
+            if n_bins == 0:
+                continue
+            feature = self.profile.features[name]
+            valid = production_bins[i][production_bins[i] >= 0]
+            if len(valid) == 0:
+                continue
+            production = (np.bincount(valid, minlength=n_bins) + alpha) / (len(valid) + alpha * n_bins)
+            baseline = (feature.counts + alpha) / (feature.n + alpha * n_bins)
+            ratios[i, :n_bins] = np.log(production / baseline)
+        log_weights = gather_sum(ratios, self.bins)
+        return np.clip(log_weights, -np.log(MAX_WEIGHT), np.log(MAX_WEIGHT))
+
+    def predict(self, df):
+        """
+        Reference-model predictions (naive Bayes source only).
+        """
+        bins = bin_matrix(df, self.features, self.profile)
+        scores = self.prior + gather_sum(self.tables, bins)
+        return self.classes[np.argmax(scores, axis=-1)]
+
+    def estimate(self, production_df, confidence=0.95, prediction_column=None):
+        """
+        Estimated accuracy on a production window.
+
+        Returns:
+            dict: {'baseline_accuracy', 'estimated_accuracy', 'ci',
+            'effective_sample_size', 'accuracy_drop', 'source'}, plus
+            'observed_accuracy' and 'labeled_rows' when production rows
+            carry labels the model's predictions can be checked against.
+        """
+        from scipy.special import ndtri
+
+        weights = np.exp(self.log_weights(production_df))
+        total = np.sum(weights)
+        accuracy = float(np.sum(weights * self.correct) / total)
+        # Delta-method standard error of the self-normalized weighted mean
+        se = float(np.sqrt(np.sum((weights * (self.correct - accuracy)) ** 2)) / total)
+        z = float(ndtri(0.5 + confidence / 2))
+        result = {
+            'baseline_accuracy': round(self.baseline_accuracy, 4),
+            'estimated_accuracy': round(accuracy, 4),
+            'ci': [round(max(accuracy - z * se, 0.0), 4), round(min(accuracy + z * se, 1.0), 4)],
+            'effective_sample_size': round(float(total ** 2 / np.sum(weights ** 2)), 1),
+            'accuracy_drop': round(max(self.baseline_accuracy - accuracy, 0.0), 4),
+            'source': self.source
+        }
+
+        if self.label_column in production_df.columns:
+            labeled = production_df[production_df[self.label_column].notna()]
+            if prediction_column is not None and prediction_column in labeled.columns:
+                predictions = labeled[prediction_column].to_numpy()
+            elif self.source == 'naive_bayes':
+                predictions = self.predict(labeled)
+            else:
+                predictions = None
+            if predictions is not None and len(labeled):
+                result['observed_accuracy'] = round(float(np.mean(predictions == labeled[self.label_column].to_numpy())), 4)
+                result['labeled_rows'] = len(labeled)
+        return result
+
+
+def decay(estimate):
+    """
+    Accuracy lost since the baseline: measured on labeled production rows
+    when there are any, otherwise only the part of the estimated drop that
+    its confidence interval supports.
+    """
+    if 'observed_accuracy' in estimate:
+        return max(estimate['baseline_accuracy'] - estimate['observed_accuracy'], 0.0)
+    return max(estimate['baseline_accuracy'] - estimate['ci'][1], 0.0)
+
+
+def evaluate_schedules(estimates, volume, age_days, retrain_cost, error_cost, schedules=SCHEDULES):
+    """
+    What-if cost of every retraining schedule for a batch of models at once.
+
+    Accuracy is taken to decay linearly from the baseline at the rate
+    observed so far (drop / age_days), so retraining every T days loses
+    rate * T / 2 accuracy on average and costs, per day,
+
+        retrain_cost / T + volume * error_cost * rate * T / 2
+
+    which is minimised at T* = sqrt(2 * retrain_cost / (volume * error_cost * rate)).
+    All arguments may be scalars or arrays over models.
+
+    Args:
+        estimates: RetrainingEstimator.estimate results, one per model.
+        volume: Predictions per day.
+        age_days: Days since the baseline (training) window.
+        retrain_cost: Cost of one retraining run.
+        error_cost: Cost of one wrong prediction.
+        schedules: Candidate retraining intervals in days.
+
+    Returns:
+        dict: {'schedules', 'daily_cost' (models x schedules), 'best' (index
+        per model), 'optimal_interval' (days, inf without decay), 'decay_per_day'}
+    """
+    drop = np.array([decay(e) for e in estimates])
+    volume, age_days = np.broadcast_to(volume, drop.shape), np.broadcast_to(age_days, drop.shape)
+    retrain_cost, error_cost = np.broadcast_to(retrain_cost, drop.shape), np.broadcast_to(error_cost, drop.shape)
+    rate = drop / age_days
+    intervals = np.asarray(schedules, dtype=float)
+
+    loss = (volume * error_cost * rate)[:, None]
+    daily_cost = retrain_cost[:, None] / intervals + loss * intervals / 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        optimal = np.sqrt(2 * retrain_cost / (volume * error_cost * rate))
+    # Without decay no schedule beats never retraining (also covers 0/0 for free retraining)
+    optimal = np.where(rate > 0, optimal, np.inf)
+    return {
+        'schedules': list(schedules),
+        'daily_cost': daily_cost,
+        'best': np.argmin(daily_cost, axis=1),
+        'optimal_interval': optimal,
+        'decay_per_day': rate
+    }
+
+
+def format_days(days):
+    """
+    Human readable duration ('6 hours', '3 days').
+    """
+    if days < 1:
+        hours = max(int(round(days * 24)), 1)
+        return f"{hours} hour" + ("s" if hours != 1 else "")
+    days = int(round(days))
+    return f"{days} day" + ("s" if days != 1 else "")
+
+
+def recommend(estimates, volume, age_days, retrain_cost, error_cost, schedules=SCHEDULES):
+    """
+    Retraining recommendation per model from a batch schedule evaluation.
+
+    A model is due (RETRAIN_URGENT) once it is older than its optimal
+    retraining interval T*, i.e. the accuracy lost since the baseline already
+    costs more than a retraining run amortized over that interval, and
+    estimated_time is how long its current extra error cost takes to add
+    up to one retraining run (T*^2 / (2 * age), T* / 2 right at the
+    optimum). Otherwise it is monitored and estimated_time is the time
+    left until T*, or the longest candidate schedule when no decay has been
+    observed (T* infinite), so it is never empty.
+
+    Returns:
+        list: One dict per model with 'action', 'estimated_time',
+        'optimal_interval_days', 'daily_cost_now' and 'schedules'
+        ([{'interval_days', 'daily_cost'}], cheapest first marked 'best').
+    """
+    plan = evaluate_schedules(estimates, volume, age_days, retrain_cost, error_cost, schedules)
+    age_days = np.broadcast_to(age_days, plan['optimal_interval'].shape)
+    volume = np.broadcast_to(volume, age_days.shape)
+    error_cost = np.broadcast_to(error_cost, age_days.shape)
+
+    recommendations = []
+    for i, estimate in enumerate(estimates):
+        optimal = float(plan['optimal_interval'][i])
+        due = np.isfinite(optimal) and age_days[i] >= optimal
+        if due:
+            estimated_time = format_days(optimal ** 2 / (2 * age_days[i]))
+        else:
+            # Without decay there is no optimum: re-evaluate after the longest schedule
+            estimated_time = format_days(optimal - age_days[i] if np.isfinite(optimal) else max(schedules))
+        recommendations.append({
+            'action': 'RETRAIN_URGENT' if due else 'MONITOR',
+            'estimated_time': estimated_time,
+            'optimal_interval_days': round(optimal, 1) if np.isfinite(optimal) else None,
+            'decay_per_day': round(float(plan['decay_per_day'][i]), 6),
+            # Extra error cost per day of the current model against a fresh one
+            'daily_cost_now': round(float(volume[i] * error_cost[i] * decay(estimate)), 2),
+            'schedules': [{
+                'interval_days': interval,
+                'daily_cost': round(float(plan['daily_cost'][i, j]), 2),
+                'best': bool(j == plan['best'][i])
+            } for j, interval in enumerate(plan['schedules'])]
+        })
+    return recommendations
@@ -0,0 +1,274 @@
+import numpy as np
+import pandas as pd
+
+from drift_detection import bin_counts, binned_metric_arrays, drift_status
+
+SAMPLING_STRATEGIES = ('uniform', 'stratified', 'reservoir', 'adaptive')
+
+
+def sample_indices(n_rows, size, rng):
+    """
+    Sorted row positions of a uniform sample without replacement.
+
+    Drawn without materialising a permutation of all n_rows, so the cost
+    follows the sample size rather than the table size.
+    """
+    if size is None or size >= n_rows:
+        return np.arange(n_rows)
+    return np.sort(rng.choice(n_rows, size, replace=False))
+
+
+def stratum_codes(df, by, freq=None):
+    """
+    Integer stratum code per row for one or more columns.
+
+    Datetime columns are floored to freq (e.g. 'h', 'D') when given, so rows
+    can be stratified by time bucket.
+    """
+    columns = [by] if isinstance(by, str) else list(by)
+    keys = []
+    for col in columns:
+        values = df[col]
+        if freq is not None and pd.api.types.is_datetime64_any_dtype(values.dtype):
+            values = values.dt.floor(freq)
+        keys.append(values)
+    if len(keys) == 1:
+        codes, _ = pd.factorize(keys[0], use_na_sentinel=False)
+        return codes
+    return pd.MultiIndex.from_arrays(keys).factorize()[0]
+
+
+def stratified_indices(codes, size, rng):
+    """
+    Proportionally allocated stratified sample (largest-remainder rounding).
+
+    Every stratum keeps at least one row while size allows, so rare slices
+    are never dropped; within a stratum rows are drawn uniformly. With
+    proportional allocation the sample is self-weighting, so unweighted
+    metrics on it estimate the full-table metrics.
+
+    Returns:
+        Sorted row positions.
+    """
+    n_rows = len(codes)
+    if size is None or size >= n_rows:
+        return np.arange(n_rows)
+    sizes = np.bincount(codes)
+    quota = sizes * size / n_rows
+    alloc = np.floor(quota).astype(np.int64)
+    if size >= len(sizes):
+        alloc = np.maximum(alloc, 1)
+    remaining = size - int(np.sum(alloc))
+    if remaining > 0:
+        alloc[np.argsort(-(quota - np.floor(quota)), kind='stable')[:remaining]] += 1
+    alloc = np.minimum(alloc, sizes)
+
+    # Random order within each stratum; keep the first alloc[stratum] rows
+    order = np.argsort(codes + rng.random(n_rows))
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    rank = np.arange(n_rows) - starts[codes[order]]
+    return np.sort(order[rank < alloc[codes[order]]])
+
+
+class ReservoirSampler:
+    """
+    Uniform fixed-size sample of a stream of DataFrame batches.
+
+    Each row gets a random priority and the `size` lowest priorities are
+    kept, so a batch is filtered against the current threshold in one
+    vectorized pass and two reservoirs over disjoint streams merge into a
+    uniform sample of the combined stream.
+    """
+
+    def __init__(self, size, seed=None):
+        self.size = size
+        self.rng = np.random.default_rng(seed)
+        self.rows_seen = 0
+        self._frame = None
+        self._keys = np.empty(0)
+
+    def add(self, df):
+        """
+        Offer a batch of rows to the reservoir.
+        """
+        self.rows_seen += len(df)
+        keys = self.rng.random(len(df))
+        if self._frame is not None and len(self._keys) >= self.size:
+            keep = keys < self._keys.max()
+            df, keys = df[keep], keys[keep]
+        self._combine(df, keys)
+
+    def merge(self, other):
+        """
+        Fold another reservoir (over a disjoint stream) into this one.
+        """
+        self.rows_seen += other.rows_seen
+        if other._frame is not None:
+            self._combine(other._frame, other._keys)
+
+    def _combine(self, df, keys):
+        if len(df) == 0:
+            return
+        frame = df.reset_index(drop=True)
+        if self._frame is not None:
+            frame = pd.concat([self._frame, frame], ignore_index=True)
+            keys = np.concatenate([self._keys, keys])
+        if len(keys) > self.size:
+            keep = np.sort(np.argpartition(keys, self.size - 1)[:self.size])
+            frame, keys = frame.iloc[keep].reset_index(drop=True), keys[keep]
+        self._frame, self._keys = frame, keys
+
+    def sample(self):
+        """
+        The current sample as a DataFrame (empty before any rows arrive).
+        """
+        return self._frame if self._frame is not None else pd.DataFrame()
+
+
+def metric_intervals(feature, values, population=None, confidence=0.95, n_boot=200, rng=None):
+    """
+    Confidence intervals for one sampled numerical feature.
+
+    PSI and KL intervals come from a multinomial bootstrap of the production
+    bucket counts (the baseline profile is fixed). The KS interval is the
+    DKW bound on how far the sample CDF can sit from the full production
+    CDF; it is zero when the whole population was scored.
+
+    Args:
+        feature: Baseline FeatureProfile.
+        values: Sampled, non-null production values.
+        population: Non-null rows the sample was drawn from (None if unknown).
+
+    Returns:
+        dict: {'psi': (lo, hi), 'kl': (lo, hi), 'ks_margin': float}
+    """
+    rng = rng if rng is not None else np.random.default_rng(0)
+    n = len(values)
+    alpha = 1.0 - confidence
+    ks_margin = 0.0 if population is not None and n >= population else float(np.sqrt(np.log(2.0 / alpha) / (2 * n)))
+
+    if len(feature.edges) < 2:
+        return {'psi': (0.0, 0.0), 'kl': (0.0, 0.0), 'ks_margin': ks_margin}
+    counts = bin_counts(values, feature.edges)
+    # Values outside the baseline edges are not counted by bin_counts but still weigh on n
+    shares = np.append(counts, n - np.sum(counts)) / n
+    replicates = rng.multinomial(n, shares, size=n_boot)[:, :-1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        metrics = binned_metric_arrays(feature.counts, feature.n, replicates, np.full(n_boot, n))
+    bounds = [100 * alpha / 2, 100 * (1 - alpha / 2)]
+    return {
+        'psi': tuple(float(v) for v in np.percentile(metrics['psi'], bounds)),
+        'kl': tuple(float(v) for v in np.percentile(metrics['kl'], bounds)),
+        'ks_margin': ks_margin
+    }
+
+
+def annotate_intervals(drift_report, baseline_profile, sample_df, population, confidence, rng):
+    """
+    Add sample_size and psi_ci/kl_ci/ks_ci to each numerical entry of a report.
+
+    Returns:
+        dict: feature_name -> metric_intervals result, for the features annotated.
+    """
+    intervals = {}
+    for col, metrics in drift_report.items():
+        feature = baseline_profile.features.get(col)
+        if feature is None:
+            metrics['sample_size'] = int(sample_df[col].notna().sum())
+            continue
+        values = sample_df[col].dropna().to_numpy(dtype=float)
+        total = population.get(col) if population is not None else None
+        ci = metric_intervals(feature, values, total, confidence, rng=rng)
+        intervals[col] = ci
+        metrics['sample_size'] = len(values)
+        metrics['psi_ci'] = [round(ci['psi'][0], 4), round(ci['psi'][1], 4)]
+        metrics['kl_ci'] = [round(ci['kl'][0], 4), round(ci['kl'][1], 4)]
+        metrics['ks_ci'] = [round(max(metrics['ks'] - ci['ks_margin'], 0.0), 4),
+                            round(min(metrics['ks'] + ci['ks_margin'], 1.0), 4)]
+    return intervals
+
+
+def intervals_settled(drift_report, intervals, psi_tolerance, ks_tolerance):
+    """
+    True when every feature is either precise enough or cannot change status.
+
+    A feature is settled when its PSI CI half-width and KS margin are within
+    tolerance, or when the status at both ends of the intervals agrees (the
+    decision no longer depends on the remaining sampling error).
+    """
+    for col, ci in intervals.items():
+        metrics = drift_report[col]
+        precise = (ci['psi'][1] - ci['psi'][0]) / 2 <= psi_tolerance and ci['ks_margin'] <= ks_tolerance
+        low = drift_status(ci['psi'][0], max(metrics['ks'] - ci['ks_margin'], 0.0), ci['kl'][0])
+        high = drift_status(ci['psi'][1], metrics['ks'] + ci['ks_margin'], ci['kl'][1])
+        if not precise and low != high:
+            return False
+    return True
+
+
+def detect_drift_sampled(baseline_profile, production, sample_size=100000, strategy='uniform',
+                         stratify_by=None, freq=None, confidence=0.95, initial_size=10000,
+                         psi_tolerance=0.01, ks_tolerance=0.01, seed=0, **score_kwargs):
+    """
+    Score a bounded-size sample of production data against a baseline profile.
+
+    Args:
+        baseline_profile: BaselineProfile to score against.
+        production: DataFrame, or for 'reservoir' any iterable of DataFrame
+            batches (e.g. load_data_chunks) that is consumed once.
+        sample_size: Rows scored at most ('adaptive': the upper limit; None = all).
+        strategy: 'uniform', 'stratified' (needs stratify_by), 'reservoir', or
+            'adaptive' (uniform, doubling from initial_size until every feature
+            is settled, see intervals_settled).
+        stratify_by: Column name(s) defining strata, e.g. segment or timestamp.
+        freq: Time bucket for datetime strata (pandas offset alias).
+        confidence: Confidence level of the reported intervals.
+        score_kwargs: Passed through to detect_drift (mode, n_jobs, ...).
+
+    Returns:
+        dict: detect_drift report; numerical features gain 'sample_size',
+        'psi_ci', 'kl_ci' and 'ks_ci', categorical features 'sample_size'.
+    """
+    from drift_detection import detect_drift
+
+    if strategy not in SAMPLING_STRATEGIES:
+        raise ValueError(f"Unknown sampling strategy '{strategy}'")
+    rng = np.random.default_rng(seed)
+
+    if strategy == 'reservoir':
+        if isinstance(production, pd.DataFrame):
+            production = [production]
+        sampler = ReservoirSampler(sample_size, seed)
+        for batch in production:
+            sampler.add(batch)
+        sample = sampler.sample()
+        report = detect_drift(None, sample, baseline_profile=baseline_profile, **score_kwargs)
+        annotate_intervals(report, baseline_profile, sample, None, confidence, rng)
+        return report
+
+    population = {col: int(production[col].notna().sum())
+                  for col in baseline_profile.features if col in production.columns}
+
+    if strategy == 'stratified':
+        if stratify_by is None:
+            raise ValueError("Stratified sampling requires stratify_by")
+        positions = stratified_indices(stratum_codes(production, stratify_by, freq), sample_size, rng)
+    elif strategy == 'uniform':
+        positions = sample_indices(len(production), sample_size, rng)
+    else:
+        # Nested prefixes of one random draw, so each round extends the last
+        limit = len(production) if sample_size is None else min(sample_size, len(production))
+        draw = rng.choice(len(production), limit, replace=False) if limit < len(production) else rng.permutation(limit)
+        size = min(initial_size, limit)
+        while True:
+            sample = production.iloc[np.sort(draw[:size])]
+            report = detect_drift(None, sample, baseline_profile=baseline_profile, **score_kwargs)
+            intervals = annotate_intervals(report, baseline_profile, sample, population, confidence, rng)
+            if size >= limit or intervals_settled(report, intervals, psi_tolerance, ks_tolerance):
+                return report
+            size = min(size * 2, limit)
+
+    sample = production.iloc[positions] if len(positions) < len(production) else production
+    report = detect_drift(None, sample, baseline_profile=baseline_profile, **score_kwargs)
+    annotate_intervals(report, baseline_profile, sample, population, confidence, rng)
+    return report
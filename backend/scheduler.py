@@ -0,0 +1,150 @@
+import time
+import threading
+from collections import OrderedDict, deque
+
+
+class ScanScheduler:
+    """
+    Runs drift scans for many models with bounded parallelism and fair queuing.
+
+    Pending scans are queued per model group and workers take them round-robin
+    across groups, so one group with hundreds of models cannot starve the
+    others. A model is queued at most once, and never scanned by two workers
+    at the same time.
+    """
+
+    def __init__(self, scan, max_workers=4, clock=time.time):
+        """
+        Args:
+            scan: Callable taking a ModelSpec; its return value is kept as the
+                model's last result.
+            max_workers: Maximum number of scans running at once.
+        """
+        self.scan = scan
+        self.max_workers = max(1, int(max_workers))
+        self.clock = clock
+        self.status = {}
+        self._queues = OrderedDict()
+        self._queued = set()
+        self._running = set()
+        self._workers = []
+        self._stopped = False
+        self._cond = threading.Condition()
+
+    def submit(self, model):
+        """
+        Queue a scan of model unless one is already pending.
+
+        Returns:
+            bool: True if the scan was queued.
+        """
+        with self._cond:
+            if model.id in self._queued:
+                return False
+            self._queues.setdefault(model.group, deque()).append(model)
+            self._queued.add(model.id)
+            self._cond.notify()
+        self._ensure_workers()
+        return True
+
+    def submit_all(self, models):
+        return sum(1 for model in models if self.submit(model))
+
+    def pending(self):
+        with self._cond:
+            return len(self._queued)
+
+    def running(self):
+        with self._cond:
+            return sorted(self._running)
+
+    def _take(self):
+        """
+        Pop the next runnable model, rotating across groups (caller holds the lock).
+        """
+        for _ in range(len(self._queues)):
+            group, queue = next(iter(self._queues.items()))
+            self._queues.move_to_end(group)
+            for i, model in enumerate(queue):
+                if model.id not in self._running:
+                    del queue[i]
+                    if not queue:
+                        del self._queues[group]
+                    self._queued.discard(model.id)
+                    return model
+        return None
+
+    def _ensure_workers(self):
+        with self._cond:
+            self._workers = [worker for worker in self._workers if worker.is_alive()]
+            while len(self._workers) < self.max_workers and not self._stopped:
+                worker = threading.Thread(target=self._work, name=f"drift-scan-{len(self._workers)}",
+                                          daemon=True)
+                self._workers.append(worker)
+                worker.start()
+
+    def _work(self):
+        while True:
+            with self._cond:
+                model = self._take()
+                while model is None and not self._stopped:
+                    self._cond.wait()
+                    model = self._take()
+                if self._stopped:
+                    return
+                self._running.add(model.id)
+
+            started = self.clock()
+            entry = {"started_at": started}
+            try:
+                entry["result"] = self.scan(model)
+                entry["error"] = None
+            except Exception as e:
+                print(f"Error scanning model {model.id}: {e}")
+                entry["result"] = None
+                entry["error"] = str(e)
+            entry["finished_at"] = self.clock()
+            entry["duration"] = entry["finished_at"] - started
+
+            with self._cond:
+                previous = self.status.get(model.id, {})
+                entry["scans"] = previous.get("scans", 0) + 1
+                self.status[model.id] = entry
+                self._running.discard(model.id)
+                self._cond.notify_all()
+
+    def wait(self, timeout=None):
+        """
+        Block until no scans are queued or running.
+
+        Returns:
+            bool: False if the timeout expired first.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._queued or self._running:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def run_periodic(self, list_models, interval):
+        """
+        Queue every model returned by list_models() every interval seconds (background thread).
+        """
+        def loop():
+            while not self._stopped:
+                try:
+                    self.submit_all(list_models())
+                except Exception as e:
+                    print(f"Error queuing periodic scans: {e}")
+                time.sleep(interval)
+        thread = threading.Thread(target=loop, name="drift-scan-timer", daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
@@ -0,0 +1,370 @@
+import copy
+import numpy as np
+import pandas as pd
+
+from drift_detection import bin_counts, binned_metric_arrays, drift_status
+
+# Two-sided z-score used for the reported sketch error bounds (99% confidence)
+ERROR_Z = 2.576
+
+
+class QuantileSketch:
+    """
+    Mergeable KLL-style quantile sketch.
+
+    Items live in a stack of compactors; level h items carry weight 2**h.
+    When a level overflows its capacity it is sorted and every other item
+    (random offset) is promoted to the next level. Memory is O(k log(n/k))
+    and sketches built on separate partitions can be merged.
+
+    Each compaction at level h moves any rank by at most 2**h with zero
+    mean, so the accumulated variance gives the reported rank error bound.
+    """
+
+    def __init__(self, k=200, c=2.0 / 3.0, seed=None):
+        self.k = k
+        self.c = c
+        self.levels = [np.zeros(0)]
+        self.n = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self.variance = 0.0
+        self._rng = np.random.default_rng(seed)
+
+    def capacity(self, h):
+        depth = len(self.levels) - h - 1
+        return max(2, int(np.ceil(self.k * self.c ** depth)))
+
+    def update(self, values):
+        """
+        Add a batch of values (NaNs are ignored).
+        """
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+        self.n += len(values)
+        self.min = min(self.min, float(np.min(values)))
+        self.max = max(self.max, float(np.max(values)))
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other):
+        """
+        Fold another sketch into this one (in place).
+        """
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.zeros(0))
+        for h, items in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], items])
+        self.n += other.n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.variance += other.variance
+        self._compress()
+        return self
+
+    def _compact(self, h):
+        if h + 1 == len(self.levels):
+            self.levels.append(np.zeros(0))
+        items = np.sort(self.levels[h])
+        keep = items[:0]
+        if len(items) % 2 == 1:
+            keep = items[-1:]
+            items = items[:-1]
+        offset = int(self._rng.integers(2))
+        self.levels[h + 1] = np.concatenate([self.levels[h + 1], items[offset::2]])
+        self.levels[h] = keep
+        self.variance += float(2 ** h) ** 2
+
+    def _compress(self):
+        while True:
+            over = [h for h in range(len(self.levels)) if len(self.levels[h]) > self.capacity(h)]
+            if not over:
+                return
+            self._compact(over[0])
+
+    def _weighted(self):
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items_h), 2 ** h, dtype=np.int64)
+                                  for h, items_h in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        return items[order], weights[order]
+
+    def cdf(self, points):
+        """
+        Estimated fraction of values <= each point.
+        """
+        points = np.asarray(points, dtype=float)
+        if self.n == 0:
+            return np.zeros(points.shape)
+        items, weights = self._weighted()
+        cumulative = np.concatenate([[0], np.cumsum(weights)])
+        ranks = cumulative[np.searchsorted(items, points, side='right')]
+        return ranks / cumulative[-1]
+
+    def quantile(self, q):
+        """
+        Estimated value at quantile(s) q in [0, 1]; exact at 0 and 1.
+        """
+        q = np.asarray(q, dtype=float)
+        items, weights = self._weighted()
+        cumulative = np.cumsum(weights) / np.sum(weights)
+        idx = np.minimum(np.searchsorted(cumulative, q, side='left'), len(items) - 1)
+        values = items[idx]
+        values = np.where(q <= 0, self.min, values)
+        values = np.where(q >= 1, self.max, values)
+        return values
+
+    def rank_error(self):
+        """
+        Normalized rank error bound (99% confidence) for cdf/quantile estimates.
+        """
+        if self.n == 0:
+            return 0.0
+        return float(ERROR_Z * np.sqrt(self.variance) / self.n)
+
+    def items(self):
+        return np.unique(np.concatenate(self.levels))
+
+    def size(self):
+        return int(sum(len(items) for items in self.levels))
+
+    def to_state(self):
+        """
+        Compact serializable state (a few kilobytes for k=200).
+        """
+        return {
+            'k': self.k,
+            'c': self.c,
+            'n': self.n,
+            'min': self.min,
+            'max': self.max,
+            'variance': self.variance,
+            'levels': [items.tolist() for items in self.levels]
+        }
+
+    @classmethod
+    def from_state(cls, state, seed=None):
+        sketch = cls(state['k'], state['c'], seed)
+        sketch.levels = [np.asarray(items, dtype=float) for items in state['levels']]
+        sketch.n = state['n']
+        sketch.min = state['min']
+        sketch.max = state['max']
+        sketch.variance = state['variance']
+        return sketch
+
+
+class HistogramSketch:
+    """
+    Exact bucket counts on fixed edges; mergeable when edges are identical.
+    """
+
+    def __init__(self, edges):
+        self.edges = np.asarray(edges, dtype=float)
+        self.counts = np.zeros(max(len(self.edges) - 1, 0), dtype=np.int64)
+        self.n = 0
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[~np.isnan(values)]
+        self.n += len(values)
+        if len(self.counts) > 0 and len(values) > 0:
+            self.counts += bin_counts(values, self.edges)
+        return self
+
+    def merge(self, other):
+        if not np.array_equal(self.edges, other.edges):
+            raise ValueError("Cannot merge histograms with different edges")
+        self.counts += other.counts
+        self.n += other.n
+        return self
+
+
+class FeatureSketch:
+    """
+    Sketch state for one feature: a quantile sketch and, once edges are
+    known (from the baseline), an exact fixed-edge histogram.
+    """
+
+    def __init__(self, k=200, edges=None, seed=None):
+        self.quantiles = QuantileSketch(k, seed=seed)
+        self.histogram = HistogramSketch(edges) if edges is not None else None
+
+    def update(self, values):
+        self.quantiles.update(values)
+        if self.histogram is not None:
+            self.histogram.update(values)
+        return self
+
+    def merge(self, other):
+        self.quantiles.merge(other.quantiles)
+        if self.histogram is not None and other.histogram is not None:
+            self.histogram.merge(other.histogram)
+        else:
+            # A partial histogram would undercount; fall back to quantile estimates
+            self.histogram = None
+        return self
+
+
+def sketch_edges(quantile_sketch, buckets=10):
+    """
+    Approximate equal-frequency bin edges from a baseline quantile sketch.
+    """
+    breakpoints = np.arange(0, buckets + 1) / (buckets)
+    return np.unique(quantile_sketch.quantile(breakpoints))
+
+
+def build_sketches(df, columns=None, edges=None, k=200, seed=None):
+    """
+    Sketch the numerical columns of a DataFrame (one partition).
+
+    Args:
+        df: DataFrame partition, or a dict column -> array.
+        columns: Columns to sketch (defaults to numerical columns).
+        edges: Optional dict column -> fixed histogram edges (e.g. from baseline sketches).
+        k: Quantile sketch accuracy parameter.
+
+    Returns:
+        dict: column -> FeatureSketch
+    """
+    if columns is None:
+        if isinstance(df, pd.DataFrame):
+            columns = df.select_dtypes(include=[np.number]).columns.tolist()
+        else:
+            columns = list(df)
+    edges = edges or {}
+    sketches = {}
+    for col in columns:
+        if col not in df:
+            continue
+        sketch = FeatureSketch(k, edges.get(col), seed)
+        sketch.update(np.asarray(df[col], dtype=float))
+        sketches[col] = sketch
+    return sketches
+
+
+def baseline_sketches(baseline_profile):
+    """
+    Baseline FeatureSketches from a BaselineProfile: its stored quantile
+    sketches plus exact histograms on the profile's bin edges. Nothing is
+    re-sketched and the training data is not read.
+
+    Returns:
+        dict: column -> FeatureSketch (numerical features with a stored sketch)
+    """
+    sketches = {}
+    for col, feature in baseline_profile.features.items():
+        quantiles = baseline_profile.sketches.get(col)
+        if quantiles is None:
+            continue
+        sketch = FeatureSketch(quantiles.k, feature.edges if len(feature.edges) >= 2 else None)
+        sketch.quantiles = quantiles
+        if sketch.histogram is not None:
+            sketch.histogram.counts = np.array(feature.counts, dtype=np.int64)
+            sketch.histogram.n = feature.n
+        sketches[col] = sketch
+    return sketches
+
+
+def merge_sketches(partitions):
+    """
+    Merge per-partition sketch dicts (e.g. hourly or per-host) into one.
+    """
+    merged = {}
+    for sketches in partitions:
+        for col, sketch in sketches.items():
+            if col in merged:
+                merged[col].merge(sketch)
+            else:
+                merged[col] = copy.deepcopy(sketch)
+    return merged
+
+
+def _bucket_counts(sketch, edges):
+    """
+    Bucket counts on edges: exact from a matching histogram, else estimated from the quantile sketch.
+    """
+    if sketch.histogram is not None and np.array_equal(sketch.histogram.edges, edges):
+        return sketch.histogram.counts.astype(float), sketch.histogram.n, True
+    quantiles = sketch.quantiles
+    # Same convention as bin_counts: bins are [e_i, e_i+1) except the closed last bin
+    below = quantiles.cdf(np.nextafter(edges, -np.inf))
+    cumulative = np.concatenate([below[:-1], quantiles.cdf(edges[-1:])])
+    return np.diff(cumulative) * quantiles.n, quantiles.n, False
+
+
+def compare_sketches(baseline, production, buckets=10):
+    """
+    Drift report computed from baseline and production sketches only.
+
+    Args:
+        baseline: dict column -> FeatureSketch for training/baseline.
+        production: dict column -> FeatureSketch for production/current.
+        buckets: Number of quantile buckets.
+
+    Returns:
+        dict: feature_name -> detect_drift-style metrics plus error bounds:
+            'ks_error' (KS bound, sum of both sketches' rank errors) and
+            'rank_error' (bucket-mass error from sketch-estimated counts;
+            0 when both sides use exact histograms on the same edges).
+    """
+    drift_report = {}
+    for col, base in baseline.items():
+        prod = production.get(col)
+        if prod is None or prod.quantiles.n == 0 or base.quantiles.n == 0:
+            continue
+
+        edges = base.histogram.edges if base.histogram is not None else sketch_edges(base.quantiles, buckets)
+        if len(edges) < 2:
+            metrics = {'psi': 0.0, 'kl': 0.0, 'js': 0.0, 'wasserstein': 0.0}
+            rank_error = 0.0
+        else:
+            expected_counts, n_expected, expected_exact = _bucket_counts(base, edges)
+            actual_counts, n_actual, actual_exact = _bucket_counts(prod, edges)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                arrays = binned_metric_arrays(expected_counts, n_expected, actual_counts, n_actual, edges)
+            metrics = {name: float(value) for name, value in arrays.items()}
+            rank_error = (0.0 if expected_exact else 2 * base.quantiles.rank_error()) + \
+                         (0.0 if actual_exact else 2 * prod.quantiles.rank_error())
+
+        points = np.union1d(base.quantiles.items(), prod.quantiles.items())
+        ks = float(np.max(np.abs(base.quantiles.cdf(points) - prod.quantiles.cdf(points))))
+        ks_error = base.quantiles.rank_error() + prod.quantiles.rank_error()
+
+        drift_report[col] = {
+            'psi': round(metrics['psi'], 4),
+            'ks': round(ks, 4),
+            'kl': round(metrics['kl'], 4),
+            'js': round(metrics['js'], 4),
+            'wasserstein': round(metrics['wasserstein'], 4),
+            'ks_error': round(ks_error, 4),
+            'rank_error': round(rank_error, 4),
+            'status': drift_status(metrics['psi'], ks, metrics['kl'])
+        }
+    return drift_report
+
+
+def detect_drift_approximate(training_df, production_df, buckets=10, k=200, seed=None):
+    """
+    Approximate drift detection: sketch both sides, fix histogram edges from
+    the baseline sketch, and score from sketches alone.
+
+    Args:
+        training_df: DataFrame (or dict column -> array) of baseline data.
+        production_df: DataFrame of production data.
+        buckets: Number of quantile buckets.
+        k: Quantile sketch accuracy parameter (rank error ~ 1/k).
+
+    Returns:
+        dict: Report in the compare_sketches format, with error bounds.
+    """
+    baseline = build_sketches(training_df, k=k, seed=seed)
+    for col, sketch in baseline.items():
+        edges = sketch_edges(sketch.quantiles, buckets) if sketch.quantiles.n > 0 else np.zeros(0)
+        if len(edges) >= 2:
+            sketch.histogram = HistogramSketch(edges).update(np.asarray(training_df[col], dtype=float))
+    edges = {col: sketch.histogram.edges for col, sketch in baseline.items() if sketch.histogram is not None}
+    production = build_sketches(production_df, columns=list(baseline.keys()), edges=edges, k=k, seed=seed)
+    return compare_sketches(baseline, production, buckets)
@@ -0,0 +1,99 @@
+import os
+import json
+import struct
+import tempfile
+import numpy as np
+
+MAGIC = b'DGSNAP01'
+# Array data is aligned so every view can be used directly (SIMD-friendly, page-friendly)
+ALIGNMENT = 64
+
+
+def write_snapshot(path, meta, arrays):
+    """
+    Write named arrays plus JSON metadata as one flat, memory-mappable file.
+
+    Layout: magic, header length (uint64), JSON header (meta and each
+    array's dtype, shape and offset), then the raw array bytes, each
+    aligned to ALIGNMENT. Written to a temp file and renamed, so readers
+    never see a partial snapshot.
+
+    Args:
+        path: Destination file.
+        meta: JSON-serializable dict.
+        arrays: dict name -> numpy array (fixed-size dtypes only, no objects).
+    """
+    layout = {}
+    offset = 0
+    contiguous = {}
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        if array.dtype.hasobject:
+            raise ValueError(f"Array '{name}' has object dtype and cannot be snapshotted")
+        offset = _align(offset)
+        layout[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        contiguous[name] = array
+        offset += array.nbytes
+
+    header = json.dumps({"meta": meta, "arrays": layout}).encode('utf-8')
+    data_start = _align(len(MAGIC) + 8 + len(header))
+
+    # A unique temp file per writer, so concurrent saves of the same path never interleave
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.',
+                                    prefix=os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(MAGIC)
+            f.write(struct.pack('<Q', len(header)))
+            f.write(header)
+            for name, array in contiguous.items():
+                f.seek(data_start + layout[name]["offset"])
+                f.write(array.reshape(-1).view(np.uint8))
+            f.truncate(data_start + offset)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def read_snapshot(path, mode='r'):
+    """
+    Map a snapshot written by write_snapshot.
+
+    Arrays are views straight onto the mapped file: nothing is copied or
+    parsed, so loading costs the same however large the arrays are, and
+    pages are read (and shared between processes) only as they are touched.
+
+    Args:
+        path: Snapshot file.
+        mode: 'r' for read-only views, 'c' for copy-on-write views that can
+            be modified in memory without touching the file.
+
+    Returns:
+        tuple: (meta, arrays) where arrays maps name -> numpy array.
+    """
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a snapshot file")
+        (header_length,) = struct.unpack('<Q', f.read(8))
+        header = json.loads(f.read(header_length).decode('utf-8'))
+    data_start = _align(len(MAGIC) + 8 + header_length)
+
+    mapped = np.memmap(path, dtype=np.uint8, mode=mode)
+    arrays = {}
+    for name, entry in header["arrays"].items():
+        dtype = np.dtype(entry["dtype"])
+        shape = tuple(entry["shape"])
+        if dtype.itemsize * int(np.prod(shape)) == 0:
+            arrays[name] = np.empty(shape, dtype=dtype)
+            continue
+        # Plain ndarray views (not np.memmap), so results of operations on them are ordinary arrays
+        arrays[name] = np.ndarray(shape, dtype=dtype, buffer=mapped, offset=data_start + entry["offset"])
+    return header["meta"], arrays
+
+
+def _align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
@@ -0,0 +1,247 @@
+import numpy as np
+
+from drift_detection import (bin_counts_matrix, binned_metric_arrays, drift_status,
+                             load_data_chunks)
+from categorical import categorical_counts, score_categorical_counts
+from sketches import FeatureSketch, QuantileSketch
+
+
+def ks_grid(sorted_values, grid_size=2048):
+    """
+    Evaluation grid for streaming KS: baseline quantiles (every value if few are distinct).
+
+    Returns:
+        tuple: (grid, cdf_le, cdf_lt, error) where cdf_le/cdf_lt are the baseline
+        CDF at and just below each grid point, and error is the largest baseline
+        mass strictly between two grid points (the KS error bound).
+    """
+    n = len(sorted_values)
+    grid = np.unique(sorted_values)
+    if len(grid) > grid_size:
+        grid = np.unique(sorted_values[np.linspace(0, n - 1, grid_size).astype(np.int64)])
+    cdf_le = np.searchsorted(sorted_values, grid, side='right') / n
+    cdf_lt = np.searchsorted(sorted_values, grid, side='left') / n
+    error = float(np.max(cdf_lt[1:] - cdf_le[:-1])) if len(grid) > 1 else 0.0
+    return grid, cdf_le, cdf_lt, error
+
+
+class StreamingDriftAccumulator:
+    """
+    Incremental drift state for production data arriving in batches.
+
+    Per feature it keeps bucket counts on the baseline edges, running
+    moments (Welford/Chan merge) with min/max, counts on a KS grid of
+    baseline quantiles, and a mergeable quantile sketch of the production
+    values (for the median and other production quantiles). Categorical
+    features keep counts on the profile's categories. Memory is
+    O(features x (buckets + grid + sketch_k)) no matter how many rows are fed in.
+    """
+
+    def __init__(self, baseline_profile, columns=None, grid_size=2048, sketch_k=200):
+        if columns is None:
+            columns = baseline_profile.columns
+        self.baseline_profile = baseline_profile
+        self.columns = [col for col in columns if col in baseline_profile.features]
+        n_features = len(self.columns)
+
+        self.edges, self.n_edges, self.expected_counts, self.n_expected = \
+            baseline_profile.stacked(self.columns)
+        self.counts = np.zeros(self.expected_counts.shape, dtype=np.int64)
+
+        self.n = np.zeros(n_features, dtype=np.int64)
+        self.mean = np.zeros(n_features)
+        self.m2 = np.zeros(n_features)
+        self.min = np.full(n_features, np.inf)
+        self.max = np.full(n_features, -np.inf)
+
+        self.grids = []
+        self.grid_positions = []
+        self.grid_ties = []
+        for col in self.columns:
+            grid = ks_grid(baseline_profile.features[col].sorted_values, grid_size)
+            self.grids.append(grid)
+            self.grid_positions.append(np.zeros(len(grid[0]) + 1, dtype=np.int64))
+            self.grid_ties.append(np.zeros(len(grid[0]), dtype=np.int64))
+        self.sketches = [QuantileSketch(sketch_k, seed=i) for i in range(n_features)]
+        self.categorical_counts = {
+            col: np.zeros(len(baseline_profile.categorical[col].counts), dtype=np.int64)
+            for col in columns if col in baseline_profile.categorical
+        }
+
+        self.rows_seen = 0
+
+    def update(self, chunk):
+        """
+        Fold one batch of production rows (a DataFrame) into the running state.
+        """
+        present = [col for col in self.columns if col in chunk.columns]
+        if len(present) != len(self.columns):
+            block = np.full((len(self.columns), len(chunk)), np.nan)
+            for i, col in enumerate(self.columns):
+                if col in chunk.columns:
+                    block[i] = chunk[col].to_numpy(dtype=float)
+        else:
+            block = chunk[self.columns].to_numpy(dtype=float).T
+        self.update_block(block)
+        for col, counts in self.categorical_counts.items():
+            if col in chunk.columns:
+                counts += categorical_counts(self.baseline_profile.categorical[col], chunk[col])
+        self.rows_seen += len(chunk)
+
+    def update_block(self, block):
+        """
+        Fold a numeric block (features x rows, NaN for missing) into the running state.
+        """
+        self.counts += bin_counts_matrix(block, self.edges, self.n_edges)
+
+        valid = ~np.isnan(block)
+        n_b = valid.sum(axis=1)
+        has = n_b > 0
+        if not np.any(has):
+            return
+        filled = np.where(valid, block, 0.0)
+        mean_b = np.zeros(len(n_b))
+        mean_b[has] = filled[has].sum(axis=1) / n_b[has]
+        m2_b = np.where(valid, (block - mean_b[:, None]) ** 2, 0.0).sum(axis=1)
+
+        # Chan et al. parallel merge of (n, mean, M2)
+        n_total = self.n + n_b
+        delta = mean_b - self.mean
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.mean = np.where(has, self.mean + delta * n_b / n_total, self.mean)
+            self.m2 = np.where(has, self.m2 + m2_b + delta ** 2 * self.n * n_b / n_total, self.m2)
+        self.n = n_total
+        self.min = np.where(has, np.fmin(self.min, np.nanmin(np.where(valid, block, np.inf), axis=1)), self.min)
+        self.max = np.where(has, np.fmax(self.max, np.nanmax(np.where(valid, block, -np.inf), axis=1)), self.max)
+
+        for i in np.flatnonzero(has):
+            values = block[i][valid[i]]
+            grid = self.grids[i][0]
+            # position = number of grid points strictly below the value
+            position = np.searchsorted(grid, values, side='left')
+            self.grid_positions[i] += np.bincount(position, minlength=len(grid) + 1)
+            on_grid = position < len(grid)
+            ties = on_grid.copy()
+            ties[on_grid] = grid[position[on_grid]] == values[on_grid]
+            self.grid_ties[i] += np.bincount(position[ties], minlength=len(grid))
+            self.sketches[i].update(values)
+
+    def ks(self, i):
+        """
+        Streaming KS statistic for feature i and its error bound.
+        """
+        grid, cdf_le, cdf_lt, error = self.grids[i]
+        n = self.n[i]
+        le = np.cumsum(self.grid_positions[i])[:-1]
+        actual_le = le / n
+        actual_lt = (le - self.grid_ties[i]) / n
+        ks = max(np.max(np.abs(cdf_le - actual_le)), np.max(np.abs(cdf_lt - actual_lt)))
+        return float(ks), error
+
+    def median(self, i):
+        """
+        Approximate production median for feature i, from its quantile sketch
+        (always one of the production values seen).
+        """
+        return float(self.sketches[i].quantile(0.5))
+
+    def feature_sketches(self):
+        """
+        The accumulated production state as mergeable FeatureSketches
+        (quantile sketch plus exact histogram on the baseline edges), for
+        sketches.compare_sketches or merging with other workers' sketches.
+
+        Returns:
+            dict: feature_name -> FeatureSketch (copies; the accumulator keeps updating)
+        """
+        sketches = {}
+        for i, col in enumerate(self.columns):
+            n_edges = self.n_edges[i]
+            sketch = FeatureSketch(self.sketches[i].k, self.edges[i, :n_edges] if n_edges >= 2 else None)
+            sketch.quantiles.merge(self.sketches[i])
+            if sketch.histogram is not None:
+                sketch.histogram.counts += self.counts[i, :n_edges - 1]
+                sketch.histogram.n = int(self.n[i])
+            sketches[col] = sketch
+        return sketches
+
+    def finalize(self):
+        """
+        Compute the drift report from the accumulated state.
+
+        Returns:
+            dict: feature_name -> metrics in the detect_drift format, plus
+            'ks_error' (KS error bound) and 'stats' for the production side
+            of numerical features.
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            metrics = binned_metric_arrays(self.expected_counts, self.n_expected,
+                                           self.counts, self.n, self.edges)
+        for name in metrics:
+            metrics[name][self.n_edges < 2] = 0.0
+
+        drift_report = {}
+        for i, col in enumerate(self.columns):
+            if self.n[i] == 0:
+                continue
+            psi = float(metrics['psi'][i])
+            kl = float(metrics['kl'][i])
+            ks, ks_error = self.ks(i)
+            drift_report[col] = {
+                'psi': round(psi, 4),
+                'ks': round(ks, 4),
+                'kl': round(kl, 4),
+                'js': round(float(metrics['js'][i]), 4),
+                'wasserstein': round(float(metrics['wasserstein'][i]), 4),
+                'ks_error': round(ks_error, 4),
+                'status': drift_status(psi, ks, kl),
+                'stats': {
+                    "mean": float(self.mean[i]),
+                    "median": self.median(i),
+                    "std": float(np.sqrt(self.m2[i] / self.n[i])),
+                    "min": float(self.min[i]),
+                    "max": float(self.max[i])
+                }
+            }
+        for col, counts in self.categorical_counts.items():
+            metrics = score_categorical_counts(self.baseline_profile.categorical[col], counts)
+            if metrics is not None:
+                drift_report[col] = metrics
+        return drift_report
+
+
+def detect_drift_streaming(baseline_profile, chunks, grid_size=2048):
+    """
+    Detect drift over production data supplied as an iterable of DataFrame batches.
+
+    Args:
+        baseline_profile: BaselineProfile to score against.
+        chunks: Iterable of DataFrames (e.g. load_data_chunks(...)).
+        grid_size: KS grid resolution; the KS error bound shrinks as ~1/grid_size.
+
+    Returns:
+        tuple: (drift_report, rows_seen)
+    """
+    accumulator = StreamingDriftAccumulator(baseline_profile, grid_size=grid_size)
+    for chunk in chunks:
+        accumulator.update(chunk)
+    return accumulator.finalize(), accumulator.rows_seen
+
+
+def detect_drift_from_file(baseline_profile, filepath, chunksize=100000, grid_size=2048):
+    """
+    Streaming drift detection over a production CSV, reading only profiled
+    columns, chunksize rows at a time.
+
+    Returns:
+        tuple: (drift_report, rows_seen)
+    """
+    header = next(load_data_chunks(filepath, chunksize=1), None)
+    if header is None:
+        return {}, 0
+    profiled = set(baseline_profile.columns)
+    columns = [col for col in header.columns if col in profiled]
+    accumulator = StreamingDriftAccumulator(baseline_profile, columns, grid_size)
+    for chunk in load_data_chunks(filepath, chunksize, columns):
+        accumulator.update(chunk)
+    return accumulator.finalize(), accumulator.rows_seen
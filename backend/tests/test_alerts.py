@@ -0,0 +1,82 @@
+import pytest
+
+import app
+import config
+from alerts import FIRING, RESOLVED, AlertEngine, AlertRule, AlertSink, LocalSink
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_engine(**rule_options):
+    clock = Clock()
+    engine = AlertEngine(LocalSink(), batch_interval=0, clock=clock)
+    engine.add_rule(AlertRule('r1', 'm', 'psi', '>', 0.2, feature='income', **rule_options))
+    return engine, clock
+
+
+def transitions(engine):
+    engine.flush()
+    return [n['state'] for n in reversed(engine.sink.recent())]
+
+
+def test_alert_sink_send_is_abstract():
+    with pytest.raises(TypeError):
+        AlertSink()
+
+
+def test_hysteresis_keeps_rule_firing_near_threshold():
+    engine, _ = make_engine(hysteresis=0.05)
+    engine.evaluate('m', {'income': {'psi': 0.3}})
+    assert transitions(engine) == [FIRING]
+
+    # Back below the threshold but within the hysteresis margin: still firing
+    engine.evaluate('m', {'income': {'psi': 0.18}})
+    assert len(engine.active('m')) == 1
+    engine.evaluate('m', {'income': {'psi': 0.1}})
+    assert engine.active('m') == []
+    assert transitions(engine) == [FIRING, RESOLVED]
+
+
+def test_duration_rule_fires_at_deadline_without_new_update():
+    engine, clock = make_engine(duration=60)
+    engine.evaluate('m', {'income': {'psi': 0.3}})
+    clock.now += 30
+    engine.tick()
+    assert engine.active('m') == []
+
+    clock.now += 31
+    engine.tick()
+    assert [a['feature'] for a in engine.active('m')] == ['income']
+
+
+def test_duration_rule_resets_when_condition_breaks():
+    engine, clock = make_engine(duration=60)
+    engine.evaluate('m', {'income': {'psi': 0.3}})
+    clock.now += 30
+    engine.evaluate('m', {'income': {'psi': 0.1}})
+    clock.now += 40
+    engine.tick()
+    assert engine.active('m') == []
+
+
+def test_ingested_records_evaluate_window_rules(tmp_path, monkeypatch):
+    monkeypatch.setattr(app, 'DATABASE_PATH', str(tmp_path / 'driftguard.db'))
+    monkeypatch.setattr(app, 'PROFILE_DIR', str(tmp_path))
+    monkeypatch.setattr(app, '_registry', None)
+    monkeypatch.setattr(app, '_monitors', {})
+    monkeypatch.setattr(config, 'MONITOR_SNAPSHOT_INTERVAL', 0)
+    engine = AlertEngine(LocalSink())
+    engine.add_rule(AlertRule('r1', config.DEFAULT_MODEL_ID, 'psi', '>', 0.2,
+                              feature='income', window_name='5m'))
+    monkeypatch.setattr(app, '_alerts', engine)
+
+    records = [{'income': 500000.0 + i, 'age': 30} for i in range(200)]
+    response = app.app.test_client().post('/api/records', json=records)
+    assert response.status_code == 200
+    assert [a['feature'] for a in engine.active(config.DEFAULT_MODEL_ID)] == ['income']
@@ -0,0 +1,81 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+import baseline_profile
+from baseline_profile import build_baseline_profile, get_baseline_profile, profile_path_for
+from drift_detection import detect_drift
+
+
+def test_same_basename_in_different_directories_gets_separate_profiles(tmp_path, monkeypatch):
+    profile_dir = str(tmp_path / 'profiles')
+    paths = []
+    for name, mean in (('a', 0.0), ('b', 100.0)):
+        directory = tmp_path / name
+        directory.mkdir()
+        path = str(directory / 'training.csv')
+        pd.DataFrame({'x': np.random.default_rng(0).normal(mean, 1, 500)}).to_csv(path, index=False)
+        paths.append(path)
+    assert profile_path_for(paths[0], profile_dir) != profile_path_for(paths[1], profile_dir)
+
+    for path in paths:
+        get_baseline_profile(path, profile_dir)
+    # A fresh process reads the persisted profiles back, each for its own file
+    monkeypatch.setattr(baseline_profile, '_profile_cache', {})
+    means = [get_baseline_profile(path, profile_dir).features['x'].stats['mean'] for path in paths]
+    assert means[0] < 1 < 99 < means[1]
+
+
+def write_training(path, values):
+    pd.DataFrame({'x': values}).to_csv(path, index=False, float_format='%.6f')
+
+
+def test_profiles_with_different_buckets_do_not_share_a_file(tmp_path):
+    path = str(tmp_path / 'training.csv')
+    write_training(path, np.random.default_rng(0).normal(0, 1, 1000))
+    profile_dir = str(tmp_path / 'profiles')
+    assert profile_path_for(path, profile_dir, 10) != profile_path_for(path, profile_dir, 20)
+
+    get_baseline_profile(path, profile_dir, buckets=10)
+    get_baseline_profile(path, profile_dir, buckets=20)
+    for buckets in (10, 20):
+        persisted = baseline_profile.read_baseline_profile(profile_path_for(path, profile_dir, buckets))
+        assert persisted.buckets == buckets
+
+
+def test_file_rewritten_with_same_size_and_mtime_is_reprofiled(tmp_path, monkeypatch):
+    path = str(tmp_path / 'training.csv')
+    profile_dir = str(tmp_path / 'profiles')
+    write_training(path, np.full(100, 1.5))
+    stat = os.stat(path)
+    assert get_baseline_profile(path, profile_dir).features['x'].stats['mean'] == 1.5
+
+    write_training(path, np.full(100, 2.5))
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert os.stat(path).st_size == stat.st_size
+    # A new process: only the persisted profile is left to go stale
+    monkeypatch.setattr(baseline_profile, '_profile_cache', {})
+    assert get_baseline_profile(path, profile_dir).features['x'].stats['mean'] == 2.5
+
+
+def test_sorted_sample_is_capped(tmp_path):
+    rng = np.random.default_rng(0)
+    training = pd.DataFrame({'x': rng.normal(0, 1, 50000)})
+    production = pd.DataFrame({'x': rng.normal(0.1, 1, 5000)})
+    full = build_baseline_profile(training, sorted_sample_size=None)
+    capped = build_baseline_profile(training, sorted_sample_size=1000)
+
+    feature = capped.features['x']
+    assert len(feature.sorted_values) == 1000
+    assert feature.n == 50000 == int(np.sum(feature.counts))
+    assert feature.stats == full.features['x'].stats
+
+    path = str(tmp_path / 'capped.profile.bin')
+    baseline_profile.save_baseline_profile(capped, path)
+    assert baseline_profile.read_baseline_profile(path).features['x'].n == 50000
+
+    exact = detect_drift(None, production, baseline_profile=full)['x']
+    approximate = detect_drift(None, production, baseline_profile=capped)['x']
+    assert approximate['psi'] == exact['psi']
+    assert abs(approximate['ks'] - exact['ks']) <= 1 / 1000 + 1e-4
@@ -0,0 +1,48 @@
+import threading
+
+from jobs import JOB_DONE, JOB_FAILED, JobManager
+
+
+def test_pruning_while_jobs_complete():
+    # ttl=0 prunes every finished job on each submit, racing with completions
+    manager = JobManager(max_workers=4, ttl=0)
+    errors = []
+
+    def submit(worker):
+        try:
+            for i in range(200):
+                manager.submit((worker, i), lambda: i)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=submit, args=(w,)) for w in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    manager.shutdown(wait=True)
+    assert errors == []
+
+
+def test_job_is_finished_only_once_finished_at_is_set():
+    manager = JobManager(max_workers=1, ttl=0)
+    release = threading.Event()
+    job, _ = manager.submit('slow', release.wait)
+    try:
+        # A status change alone must not make the job prunable
+        job.status = JOB_DONE
+        assert not job.finished
+        manager.submit('other', lambda: None)
+        assert manager.get(job.id) is job
+    finally:
+        release.set()
+    assert manager.wait(job.id, timeout=5).finished
+    assert job.finished_at is not None
+
+
+def test_failed_job_records_error():
+    manager = JobManager(max_workers=1)
+    job, _ = manager.submit('fail', lambda: 1 / 0)
+    manager.wait(job.id, timeout=5)
+    assert job.status == JOB_FAILED and job.finished
+    assert 'division' in job.error
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+
+from baseline_profile import build_baseline_profile
+from monitor import DriftMonitor
+
+
+class Clock:
+    def __init__(self, now=600.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def make_monitor(mode='sliding', clock=None):
+    rng = np.random.default_rng(0)
+    profile = build_baseline_profile(pd.DataFrame({'x': rng.normal(0, 1, 2000)}))
+    # 60 second window in 6 slots of 10 seconds
+    return DriftMonitor(profile, windows={'1m': 60}, slots=6, modes={'1m': mode}, clock=clock or Clock())
+
+
+def records(n, value=0.0):
+    return pd.DataFrame({'x': np.full(n, value)})
+
+
+def window_n(monitor, now):
+    return monitor.window_report('1m', now).get('x', {}).get('n', 0)
+
+
+def assert_totals_consistent(monitor):
+    window = monitor.windows['1m']
+    assert np.array_equal(window.totals, window.counts.sum(axis=0))
+    assert np.array_equal(window.total_n, window.n.sum(axis=0))
+
+
+def test_sliding_window_evicts_expired_slots():
+    clock = Clock()
+    monitor = make_monitor(clock=clock)
+    monitor.ingest(records(10), timestamps=600.0)
+    clock.now = 635.0
+    monitor.ingest(records(5), timestamps=630.0)
+    assert window_n(monitor, 635.0) == 15
+
+    # The slot of t=600 leaves the window once the current slot is 6 past it
+    assert window_n(monitor, 655.0) == 15
+    assert window_n(monitor, 660.0) == 5
+    assert window_n(monitor, 700.0) == 0
+    assert_totals_consistent(monitor)
+
+
+def test_ring_slot_reuse_evicts_the_previous_occupant():
+    clock = Clock()
+    monitor = make_monitor(clock=clock)
+    monitor.ingest(records(10), timestamps=600.0)
+    # Same ring position (6 slots later) without a read in between
+    clock.now = 660.0
+    monitor.ingest(records(3, 5.0), timestamps=660.0)
+    assert window_n(monitor, 660.0) == 3
+    assert_totals_consistent(monitor)
+
+
+def test_records_older_than_the_window_are_dropped():
+    clock = Clock(700.0)
+    monitor = make_monitor(clock=clock)
+    assert monitor.ingest(records(4), timestamps=600.0) == 4
+    assert window_n(monitor, 700.0) == 0
+
+
+def test_tumbling_window_resets_each_period():
+    clock = Clock(605.0)
+    monitor = make_monitor('tumbling', clock)
+    monitor.ingest(records(10), timestamps=605.0)
+    clock.now = 650.0
+    monitor.ingest(records(5), timestamps=650.0)
+    assert window_n(monitor, 655.0) == 15
+    # New aligned period [660, 720): everything from the previous one is gone
+    assert window_n(monitor, 661.0) == 0
+    assert_totals_consistent(monitor)
@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+
+from multivariate import MultivariateBaseline, detect_multivariate_drift, sample_rows
+
+
+def make_frames():
+    rng = np.random.default_rng(0)
+    training = pd.DataFrame(rng.normal(size=(3000, 3)), columns=['a', 'b', 'c'])
+    production = pd.DataFrame(rng.normal(0.5, 1, size=(5000, 3)), columns=['a', 'b', 'c'])
+    production['c'] = production['c'].astype(np.float32)
+    return training, production
+
+
+def test_sampled_rows_match_full_matrix_sample():
+    training, production = make_frames()
+    baseline = MultivariateBaseline(training, ['a', 'b', 'c'])
+    result = detect_multivariate_drift(baseline, production, methods=('pca',), max_rows=1000, seed=3)
+
+    expected_sample = sample_rows(production.to_numpy(dtype=float), 1000, np.random.default_rng(3))
+    expected = detect_multivariate_drift(baseline, pd.DataFrame(expected_sample, columns=['a', 'b', 'c']),
+                                         methods=('pca',), max_rows=None)
+    assert result['rows_sampled'] == 1000
+    assert result['methods']['pca']['status'] == expected['methods']['pca']['status']
+    for name, value in expected['methods']['pca'].items():
+        if name != 'seconds':
+            assert result['methods']['pca'][name] == value
+
+
+def test_methods_over_budget_are_skipped():
+    training, production = make_frames()
+    baseline = MultivariateBaseline(training, ['a', 'b', 'c'])
+    result = detect_multivariate_drift(baseline, production, methods=('pca', 'mmd'), budget_seconds=0)
+    assert all(method['status'] == 'skipped' for method in result['methods'].values())
+    assert result['status'] == 'good'
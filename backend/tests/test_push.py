@@ -0,0 +1,80 @@
+import json
+
+from push import Broadcaster, apply_merge_patch, merge_patch_diff
+
+
+def next_event(stream):
+    """
+    Next SSE event from a stream generator as (event, id, data), skipping comments.
+    """
+    idle = 0
+    for chunk in stream:
+        if chunk.startswith(':') or chunk.startswith('retry:'):
+            idle += 1
+            assert idle < 10, "no event within 10 heartbeats"
+            continue
+        fields = dict(line.split(': ', 1) for line in chunk.strip().splitlines())
+        return fields['event'], fields.get('id'), json.loads(fields['data'])
+    raise AssertionError("stream ended")
+
+
+def make_broadcaster():
+    return Broadcaster(interval=0.02, heartbeat=0.2)
+
+
+def test_merge_patch_round_trip():
+    old = {'a': 1, 'b': {'c': 2, 'd': 3}, 'e': [1, 2]}
+    new = {'a': 1, 'b': {'c': 5}, 'e': [1], 'f': 'x'}
+    assert apply_merge_patch(old, merge_patch_diff(old, new)) == new
+    assert merge_patch_diff(new, new) is None
+
+
+def test_snapshot_then_deltas():
+    state = {'value': 1}
+    broadcaster = make_broadcaster()
+    stream = broadcaster.stream(broadcaster.subscribe('t', lambda: dict(state)))
+    event, first_id, data = next_event(stream)
+    assert (event, data) == ('snapshot', {'value': 1})
+
+    state['value'] = 2
+    event, second_id, patch = next_event(stream)
+    assert (event, patch) == ('delta', {'value': 2})
+    assert second_id != first_id
+    stream.close()
+    assert broadcaster.subscriber_count('t') == 0
+
+
+def test_resume_with_current_id_skips_snapshot():
+    state = {'value': 1}
+    broadcaster = make_broadcaster()
+    first = broadcaster.stream(broadcaster.subscribe('t', lambda: dict(state)))
+    _, current_id, _ = next_event(first)
+
+    # Topic still alive (first subscriber connected): the client is current
+    second = broadcaster.stream(broadcaster.subscribe('t', lambda: dict(state)), current_id)
+    state['value'] = 3
+    event, _, patch = next_event(second)
+    assert (event, patch) == ('delta', {'value': 3})
+    first.close()
+    second.close()
+
+
+def test_reconnect_after_topic_restart_gets_snapshot():
+    state = {'value': 1}
+    broadcaster = make_broadcaster()
+    stream = broadcaster.stream(broadcaster.subscribe('t', lambda: dict(state)))
+    _, last_id, _ = next_event(stream)
+    stream.close()
+
+    # Last subscriber left, so the topic was deleted and its version restarts at 1;
+    # the old id must not be mistaken for the new topic's current version
+    state['value'] = 7
+    stream = broadcaster.stream(broadcaster.subscribe('t', lambda: dict(state)), last_id)
+    event, new_id, data = next_event(stream)
+    assert (event, data) == ('snapshot', {'value': 7})
+    assert new_id != last_id
+
+    state['value'] = 8
+    event, _, patch = next_event(stream)
+    assert apply_merge_patch(data, patch) == {'value': 8}
+    stream.close()
@@ -0,0 +1,24 @@
+import os
+
+import pytest
+
+from registry import ModelRegistry
+
+
+@pytest.fixture
+def registry(tmp_path):
+    return ModelRegistry(str(tmp_path / 'registry.db'), profile_root=str(tmp_path / 'profiles'))
+
+
+@pytest.mark.parametrize('model_id', ['.', '..', '.hidden', '-x', '', 'a/b', 'a' * 129])
+def test_invalid_model_ids_are_rejected(registry, model_id):
+    with pytest.raises(ValueError):
+        registry.register(model_id, 'training.csv', 'production.csv')
+    assert registry.list() == []
+
+
+def test_profile_dir_stays_under_profile_root(registry, tmp_path):
+    spec = registry.register('credit-v1.2', 'training.csv', 'production.csv')
+    root = str(tmp_path / 'profiles')
+    assert os.path.dirname(os.path.abspath(spec.profile_dir)) == root
+    assert registry.get('credit-v1.2').to_dict()['id'] == 'credit-v1.2'
@@ -0,0 +1,52 @@
+import warnings
+from types import SimpleNamespace
+
+import numpy as np
+
+import app
+from retraining import evaluate_schedules, recommend
+
+
+def make_estimate(baseline_accuracy, observed_accuracy):
+    return {'baseline_accuracy': baseline_accuracy, 'ci': [observed_accuracy, observed_accuracy],
+            'observed_accuracy': observed_accuracy}
+
+
+def test_free_retraining_without_decay_has_no_optimum():
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        plan = evaluate_schedules([make_estimate(0.9, 0.9)], 1000, 30, 0, 1)
+        [recommendation] = recommend([make_estimate(0.9, 0.9)], 1000, 30, 0, 1)
+    assert np.isinf(plan['optimal_interval'][0])
+    assert recommendation['action'] == 'MONITOR'
+    assert recommendation['estimated_time'] == '180 days'
+
+
+def test_urgent_estimated_time_follows_the_optimum():
+    # 10 points lost over 30 days at 1000 predictions/day: 100/day extra error cost
+    estimate = make_estimate(0.9, 0.8)
+    [cheap] = recommend([estimate], 1000, 30, 100, 1)
+    [costly] = recommend([estimate], 1000, 30, 1000, 1)
+    assert cheap['action'] == costly['action'] == 'RETRAIN_URGENT'
+    # Time for the extra error cost to add up to one retraining run
+    assert cheap['estimated_time'] == '1 day'
+    assert costly['estimated_time'] == '10 days'
+
+
+def test_fitted_store_refits_only_on_new_baseline_version():
+    fits = []
+
+    def fit(model, baseline):
+        fits.append(baseline.version)
+        return object()
+
+    model = SimpleNamespace(id='store-test')
+    first = app.get_fitted('test', model, SimpleNamespace(version=1), fit)
+    # Report cache expiry or eviction does not drop fitted models
+    app._report_cache.invalidate()
+    assert app.get_fitted('test', model, SimpleNamespace(version=1), fit) is first
+    assert fits == [1]
+
+    second = app.get_fitted('test', model, SimpleNamespace(version=2), fit)
+    assert second is not first
+    assert fits == [1, 2]
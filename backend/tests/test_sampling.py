@@ -0,0 +1,45 @@
+import importlib
+
+import numpy as np
+import pandas as pd
+
+import app
+import config
+from baseline_profile import get_baseline_profile
+from registry import ModelSpec
+
+
+def test_stratify_by_env_is_split_on_commas(monkeypatch):
+    monkeypatch.setenv('DRIFTGUARD_STRATIFY_BY', 'region, channel,')
+    try:
+        assert importlib.reload(config).DRIFT_STRATIFY_BY == ('region', 'channel')
+    finally:
+        monkeypatch.delenv('DRIFTGUARD_STRATIFY_BY')
+        importlib.reload(config)
+    assert config.DRIFT_STRATIFY_BY is None
+
+
+def test_drift_run_loads_unprofiled_strata_columns(tmp_path, monkeypatch):
+    rng = np.random.default_rng(0)
+    training_path = str(tmp_path / 'training.csv')
+    production_path = str(tmp_path / 'production.csv')
+    pd.DataFrame({'income': rng.normal(0, 1, 2000), 'age': rng.normal(40, 5, 2000)}).to_csv(training_path, index=False)
+    pd.DataFrame({
+        'income': rng.normal(0.5, 1, 3000),
+        'age': rng.normal(40, 5, 3000),
+        'region': rng.choice(['north', 'south'], 3000),
+        'channel': rng.choice(['web', 'app'], 3000),
+    }).to_csv(production_path, index=False)
+    monkeypatch.setattr(config, 'DRIFT_SAMPLING', 'stratified')
+    monkeypatch.setattr(config, 'DRIFT_SAMPLE_SIZE', 500)
+    monkeypatch.setattr(config, 'DRIFT_STRATIFY_BY', ('region', 'channel'))
+    monkeypatch.setattr(app, 'record_history', lambda *args, **kwargs: None)
+    monkeypatch.setattr(app, 'evaluate_alerts', lambda *args, **kwargs: None)
+
+    model = ModelSpec('strata-test', training_path, production_path, profile_dir=str(tmp_path))
+    baseline = get_baseline_profile(training_path, str(tmp_path))
+    assert 'region' not in baseline.columns
+    run = app.compute_drift_run(model, baseline, ('drift', model.id, 'test'))
+    assert run is not None
+    assert set(run.drift_report) == {'income', 'age'}
+    assert run.drift_report['income']['sample_size'] == 500
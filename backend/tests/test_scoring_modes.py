@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from baseline_profile import build_baseline_profile
+from drift_detection import detect_drift
+
+
+@pytest.fixture(scope='module')
+def data():
+    rng = np.random.default_rng(0)
+    n = 5000
+    training = pd.DataFrame({
+        'income': rng.normal(50000, 10000, n),
+        'age': rng.integers(18, 70, n).astype(float),
+        'score': rng.normal(650, 50, n),
+        'constant': np.ones(n),
+        'debt': rng.uniform(0, 1, n),
+        'region': rng.choice(['north', 'south', 'east'], n),
+    })
+    production = pd.DataFrame({
+        'income': rng.normal(55000, 12000, n),
+        'age': rng.integers(18, 80, n).astype(float),
+        'score': rng.normal(650, 50, n),
+        'constant': np.ones(n),
+        'debt': np.full(n, np.nan),
+        'region': rng.choice(['north', 'south', 'east'], n, p=[0.5, 0.3, 0.2]),
+    })
+    # Missing values and a fully missing production column
+    production.loc[::7, 'score'] = np.nan
+    training.loc[::11, 'income'] = np.nan
+    return build_baseline_profile(training), production
+
+
+@pytest.mark.parametrize('options', [
+    {'mode': 'matrix'},
+    {'n_jobs': 2, 'executor': 'thread'},
+    {'n_jobs': 2, 'executor': 'process'},
+])
+def test_scoring_modes_match_column_mode(data, options):
+    profile, production = data
+    expected = detect_drift(None, production, baseline_profile=profile, mode='columns')
+    actual = detect_drift(None, production, baseline_profile=profile, **options)
+    assert list(actual) == list(expected)
+    for feature, metrics in expected.items():
+        assert actual[feature] == pytest.approx(metrics, abs=1e-4)
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+
+from baseline_profile import build_baseline_profile, read_baseline_profile, save_baseline_profile
+from drift_detection import detect_drift
+from sketches import baseline_sketches, compare_sketches, merge_sketches
+from streaming import StreamingDriftAccumulator
+
+
+def make_frames(seed=0):
+    rng = np.random.default_rng(seed)
+    training = pd.DataFrame({
+        'age': rng.integers(18, 70, 20000).astype(float),
+        'income': rng.normal(50000, 10000, 20000),
+        'region': rng.choice(['north', 'south', 'east'], 20000),
+    })
+    production = pd.DataFrame({
+        'age': rng.integers(25, 80, 10000).astype(float),
+        'income': rng.normal(50000, 10000, 10000),
+        'region': rng.choice(['north', 'south', 'east'], 10000, p=[0.6, 0.2, 0.2]),
+    })
+    return training, production
+
+
+def test_baseline_sketches_round_trip_through_profile_snapshot(tmp_path):
+    training, _ = make_frames()
+    profile = build_baseline_profile(training, buckets=12)
+    path = str(tmp_path / 'training.profile.bin')
+    save_baseline_profile(profile, path)
+    loaded = read_baseline_profile(path)
+
+    assert set(loaded.sketches) == set(profile.sketches) == {'age', 'income'}
+    for col, sketch in profile.sketches.items():
+        restored = loaded.sketches[col]
+        assert (restored.n, restored.min, restored.max) == (sketch.n, sketch.min, sketch.max)
+        assert restored.rank_error() == sketch.rank_error()
+        assert np.array_equal(restored.quantile([0.1, 0.5, 0.9]), sketch.quantile([0.1, 0.5, 0.9]))
+
+
+def test_approximate_mode_uses_profile_buckets_and_keeps_categoricals():
+    training, production = make_frames()
+    profile = build_baseline_profile(training, buckets=12)
+    exact = detect_drift(None, production, baseline_profile=profile)
+    approximate = detect_drift(None, production, baseline_profile=profile, approximate=True)
+
+    assert set(approximate) == set(exact) == {'age', 'income', 'region'}
+    assert approximate['region'] == exact['region']
+    for col in ('age', 'income'):
+        # Exact histograms on the profile's edges on both sides: binned metrics match exactly
+        assert approximate[col]['rank_error'] == 0.0
+        assert approximate[col]['psi'] == exact[col]['psi']
+        assert abs(approximate[col]['ks'] - exact[col]['ks']) <= approximate[col]['ks_error']
+
+
+def test_ingest_batches_fold_into_mergeable_production_sketches():
+    training, production = make_frames()
+    profile = build_baseline_profile(training)
+    baseline = baseline_sketches(profile)
+
+    whole = StreamingDriftAccumulator(profile)
+    whole.update(production)
+    parts = []
+    for start in range(0, len(production), 2500):
+        chunk = production.iloc[start:start + 2500]
+        accumulator = StreamingDriftAccumulator(profile)
+        accumulator.update(chunk)
+        parts.append(accumulator.feature_sketches())
+
+    single = compare_sketches(baseline, whole.feature_sketches(), profile.buckets)
+    merged = compare_sketches(baseline, merge_sketches(parts), profile.buckets)
+    for col in ('age', 'income'):
+        assert merged[col]['psi'] == single[col]['psi']
+        assert abs(merged[col]['ks'] - single[col]['ks']) <= merged[col]['ks_error']
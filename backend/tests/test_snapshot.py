@@ -0,0 +1,136 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from baseline_profile import build_baseline_profile, read_baseline_profile, save_baseline_profile
+from monitor import DriftMonitor
+from snapshot import ALIGNMENT, read_snapshot, write_snapshot
+
+
+def make_profile():
+    rng = np.random.default_rng(0)
+    return build_baseline_profile(pd.DataFrame({
+        'x': rng.normal(0, 1, 3000),
+        'y': rng.integers(0, 5, 3000).astype(float),
+        'region': rng.choice(['north', 'south'], 3000),
+    }))
+
+
+def test_snapshot_round_trip(tmp_path):
+    path = str(tmp_path / 'arrays.bin')
+    arrays = {
+        'floats': np.arange(12, dtype=float).reshape(3, 4),
+        'ints': np.array([1, -2, 3], dtype=np.int32),
+        'strings': np.array(['a', 'bc']),
+        'empty': np.zeros((0, 3)),
+    }
+    write_snapshot(path, {'name': 'test', 'n': 3}, arrays)
+    meta, loaded = read_snapshot(path)
+
+    assert meta == {'name': 'test', 'n': 3}
+    for name, array in arrays.items():
+        assert loaded[name].dtype == array.dtype
+        assert np.array_equal(loaded[name], array)
+    assert loaded['floats'].ctypes.data % ALIGNMENT == 0
+    with pytest.raises(ValueError):
+        loaded['ints'][0] = 5
+
+
+def test_copy_on_write_views_leave_the_file_unchanged(tmp_path):
+    path = str(tmp_path / 'arrays.bin')
+    write_snapshot(path, {}, {'values': np.zeros(4)})
+    _, loaded = read_snapshot(path, mode='c')
+    loaded['values'][:] = 1
+    _, reread = read_snapshot(path)
+    assert np.array_equal(reread['values'], np.zeros(4))
+
+
+def test_concurrent_writers_never_leave_a_torn_snapshot(tmp_path):
+    path = str(tmp_path / 'arrays.bin')
+    errors = []
+
+    def write(worker):
+        try:
+            for _ in range(50):
+                write_snapshot(path, {'worker': worker}, {'values': np.full(10000, worker, dtype=float)})
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=write, args=(w,)) for w in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    meta, arrays = read_snapshot(path)
+    assert np.all(arrays['values'] == meta['worker'])
+    assert os.listdir(tmp_path) == ['arrays.bin']
+
+
+def test_failed_write_removes_its_temp_file(tmp_path, monkeypatch):
+    path = str(tmp_path / 'arrays.bin')
+
+    def fail(src, dst):
+        raise OSError('disk full')
+
+    monkeypatch.setattr(os, 'replace', fail)
+    with pytest.raises(OSError):
+        write_snapshot(path, {}, {'values': np.zeros(4)})
+    assert os.listdir(tmp_path) == []
+
+
+def test_object_arrays_are_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        write_snapshot(str(tmp_path / 'arrays.bin'), {}, {'objects': np.array([{}, None])})
+
+
+def test_profile_round_trip(tmp_path):
+    profile = make_profile()
+    path = str(tmp_path / 'training.profile.bin')
+    save_baseline_profile(profile, path)
+    loaded = read_baseline_profile(path)
+
+    assert (loaded.n_rows, loaded.buckets) == (profile.n_rows, profile.buckets)
+    assert list(loaded.features) == list(profile.features)
+    for name, feature in profile.features.items():
+        restored = loaded.features[name]
+        assert np.array_equal(restored.edges, feature.edges)
+        assert np.array_equal(restored.counts, feature.counts)
+        assert np.array_equal(restored.sorted_values, feature.sorted_values)
+        assert restored.stats == feature.stats
+    region = loaded.categorical['region']
+    assert list(region.categories) == list(profile.categorical['region'].categories)
+    assert np.array_equal(region.counts, profile.categorical['region'].counts)
+
+
+def test_monitor_round_trip(tmp_path):
+    profile = make_profile()
+    now = 1000.0
+    monitor = DriftMonitor(profile, windows={'1m': 60, '1h': 3600}, clock=lambda: now)
+    rng = np.random.default_rng(1)
+    monitor.ingest(pd.DataFrame({'x': rng.normal(0.5, 1, 500), 'y': rng.integers(0, 5, 500)}),
+                   timestamps=now - rng.uniform(0, 120, 500))
+    path = str(tmp_path / 'default.monitor.bin')
+    monitor.save(path)
+
+    restored = DriftMonitor.load(profile, path, clock=lambda: now)
+    assert restored.records_seen == monitor.records_seen
+    for window in ('1m', '1h'):
+        assert restored.window_report(window) == monitor.window_report(window)
+
+    # New records land in private copies; the snapshot on disk is unchanged
+    restored.ingest(pd.DataFrame({'x': [0.0] * 10}), timestamps=now)
+    assert DriftMonitor.load(profile, path, clock=lambda: now).window_report('1m') == monitor.window_report('1m')
+
+
+def test_monitor_snapshot_for_another_baseline_is_ignored(tmp_path):
+    profile = make_profile()
+    monitor = DriftMonitor(profile, windows={'1m': 60})
+    path = str(tmp_path / 'default.monitor.bin')
+    monitor.save(path)
+    profile.version = 'changed'
+    assert DriftMonitor.load(profile, path) is None
@@ -0,0 +1,233 @@
+import sys
+import os
+import json
+import time
+import shutil
+import subprocess
+import argparse
+import platform
+import tempfile
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Add backend to path
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend')
+sys.path.append(BACKEND_DIR)
+
+# Cold import budget (seconds) for a new worker: `import app` in a fresh interpreter
+STARTUP_TARGET = 1.0
+
+from reset_data import generate_dataset, DRIFT_PATTERNS
+from drift_detection import calculate_psi, calculate_ks, calculate_kl, detect_drift
+
+def peak_rss_mb():
+    """
+    Peak resident set size of this process so far, in MB (None if unavailable).
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def time_call(fn, repeat, warmup=1, setup=None):
+    """
+    Time repeated calls of fn.
+
+    Args:
+        fn: Zero-argument callable to time.
+        repeat: Number of timed calls.
+        warmup: Untimed calls made first.
+        setup: Optional callable run (untimed) before every call.
+
+    Returns:
+        list: Per-call durations in seconds.
+    """
+    for _ in range(warmup):
+        if setup:
+            setup()
+        fn()
+    durations = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+def summarize(durations, items=None):
+    """
+    Latency percentiles (ms) and, if items is given, throughput in items per second.
+    """
+    durations = np.asarray(durations)
+    summary = {
+        "calls": len(durations),
+        "mean_ms": round(float(np.mean(durations)) * 1000, 4),
+        "p50_ms": round(float(np.percentile(durations, 50)) * 1000, 4),
+        "p99_ms": round(float(np.percentile(durations, 99)) * 1000, 4),
+        "max_ms": round(float(np.max(durations)) * 1000, 4),
+        "peak_rss_mb": peak_rss_mb()
+    }
+    if items is not None:
+        summary["throughput_per_s"] = round(items / float(np.median(durations)), 2)
+    return summary
+
+def bench_metrics(training_df, production_df, repeat):
+    """
+    Time the single-feature metric functions on the first numeric column.
+    """
+    column = training_df.columns[0]
+    expected = training_df[column].values
+    actual = production_df[column].values
+    items = len(expected) + len(actual)
+    return {
+        name: summarize(time_call(lambda fn=fn: fn(expected, actual), repeat), items)
+        for name, fn in (("calculate_psi", calculate_psi),
+                         ("calculate_ks", calculate_ks),
+                         ("calculate_kl", calculate_kl))
+    }
+
+def bench_detect_drift(training_df, production_df, repeat, modes):
+    """
+    Time detect_drift end to end (profile build included) for each mode.
+    """
+    items = (len(training_df) + len(production_df)) * len(training_df.columns)
+    results = {}
+    for mode in modes:
+        results[f"detect_drift[{mode}]"] = summarize(
+            time_call(lambda: detect_drift(training_df, production_df, mode=mode), repeat), items)
+    return results
+
+def bench_endpoints(training_df, production_df, repeat, workdir):
+    """
+    Time the Flask endpoints through the test client, cold (report cache
+    cleared before each request) and warm (cached report, full response).
+    """
+    import app as app_module
+
+    data_dir = os.path.join(workdir, 'data')
+    os.makedirs(data_dir, exist_ok=True)
+    app_module.TRAINING_DATA_PATH = os.path.join(data_dir, 'training_data.csv')
+    app_module.PRODUCTION_DATA_PATH = os.path.join(data_dir, 'production_data.csv')
+    app_module.PROFILE_DIR = os.path.join(workdir, 'models')
+    app_module.DATABASE_PATH = os.path.join(workdir, 'models', 'driftguard.db')
+    training_df.to_csv(app_module.TRAINING_DATA_PATH, index=False)
+    production_df.to_csv(app_module.PRODUCTION_DATA_PATH, index=False)
+    app_module._report_cache.invalidate()
+
+    client = app_module.app.test_client()
+    feature = training_df.columns[0]
+    endpoints = ['/api/drift', '/api/dashboard-data', f'/api/feature-details/{feature}']
+    clear = lambda: app_module._report_cache.invalidate()
+
+    results = {}
+    for url in endpoints:
+        def get(url=url):
+            response = client.get(url)
+            if response.status_code != 200:
+                raise RuntimeError(f"GET {url} returned {response.status_code}")
+        results[f"GET {url} (cold)"] = summarize(time_call(get, repeat, setup=clear), 1)
+        results[f"GET {url} (warm)"] = summarize(time_call(get, repeat), 1)
+    return results
+
+def bench_startup(repeat, modules=('app', 'drift_detection')):
+    """
+    Time cold imports in fresh interpreters (what a new worker or CLI script pays).
+
+    Each run also reports whether SciPy was imported, which it should only
+    be on first use of the code that needs it.
+    """
+    results = {}
+    for module in modules:
+        code = ("import sys, time; start = time.perf_counter(); import " + module +
+                "; print(time.perf_counter() - start, 'scipy' in sys.modules)")
+        durations = []
+        scipy_loaded = False
+        for _ in range(repeat):
+            output = subprocess.run([sys.executable, '-c', code], cwd=BACKEND_DIR, check=True,
+                                    capture_output=True, text=True).stdout.split()
+            durations.append(float(output[-2]))
+            scipy_loaded = scipy_loaded or output[-1] == 'True'
+        summary = summarize(durations)
+        summary["scipy_loaded"] = scipy_loaded
+        results[f"import {module} (cold)"] = summary
+    return results
+
+def run_benchmarks(rows=100000, production_rows=None, cols=6, drift='default', magnitude=1.0,
+                   repeat=5, modes=('columns', 'matrix'), endpoints=True, seed=42):
+    """
+    Run the benchmark suite on one generated dataset.
+
+    Returns:
+        dict: Parameters, environment and per-benchmark results.
+    """
+    production_rows = production_rows or max(1, rows // 5)
+    training_df, production_df = generate_dataset(rows, production_rows, cols, drift, magnitude, seed)
+
+    results = {}
+    results.update(bench_startup(repeat))
+    results.update(bench_metrics(training_df, production_df, repeat))
+    results.update(bench_detect_drift(training_df, production_df, repeat, modes))
+    if endpoints:
+        workdir = tempfile.mkdtemp(prefix='driftguard-bench-')
+        try:
+            results.update(bench_endpoints(training_df, production_df, repeat, workdir))
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        "params": {
+            "training_rows": rows,
+            "production_rows": production_rows,
+            "cols": cols,
+            "drift": drift,
+            "magnitude": magnitude,
+            "repeat": repeat,
+            "seed": seed
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count()
+        },
+        "timestamp": time.strftime('%Y-%m-%dT%H:%M:%S'),
+        "results": results,
+        "peak_rss_mb": peak_rss_mb()
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark DriftGuard drift metrics and API endpoints.")
+    parser.add_argument('--rows', type=int, default=100000, help="Training rows")
+    parser.add_argument('--production-rows', type=int, default=None, help="Production rows (default rows/5)")
+    parser.add_argument('--cols', type=int, default=6, help="Number of columns")
+    parser.add_argument('--drift', choices=DRIFT_PATTERNS, default='default', help="Drift pattern")
+    parser.add_argument('--magnitude', type=float, default=1.0, help="Drift magnitude")
+    parser.add_argument('--repeat', type=int, default=5, help="Timed calls per benchmark")
+    parser.add_argument('--modes', default='columns,matrix', help="detect_drift modes to time")
+    parser.add_argument('--no-endpoints', action='store_true', help="Skip the Flask endpoints")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default='benchmark_results.json', help="JSON output file")
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.rows, args.production_rows, args.cols, args.drift, args.magnitude,
+                            args.repeat, tuple(args.modes.split(',')), not args.no_endpoints, args.seed)
+
+    for name, summary in report["results"].items():
+        print(f"{name:50s} p50 {summary['p50_ms']:10.3f} ms  p99 {summary['p99_ms']:10.3f} ms")
+    print(f"Peak RSS: {report['peak_rss_mb']} MB")
+    startup = report["results"]["import app (cold)"]["p50_ms"] / 1000
+    print(f"Startup: {startup:.2f}s (target {STARTUP_TARGET:.2f}s) "
+          + ("OK" if startup <= STARTUP_TARGET else "OVER TARGET"))
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+if __name__ == '__main__':
+    main()
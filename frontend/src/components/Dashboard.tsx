@@ -34,6 +34,25 @@ interface DashboardData {
   top_features: DriftFeature[];
 }
 
+// Apply a JSON Merge Patch (RFC 7386): objects merge, null deletes, anything else replaces
+const applyMergePatch = (target: any, patch: any): any => {
+  if (patch === null || typeof patch !== "object" || Array.isArray(patch)) {
+    return patch;
+  }
+  const result =
+    target && typeof target === "object" && !Array.isArray(target)
+      ? { ...target }
+      : {};
+  for (const [key, value] of Object.entries(patch)) {
+    if (value === null) {
+      delete result[key];
+    } else {
+      result[key] = applyMergePatch(result[key], value);
+    }
+  }
+  return result;
+};
+
 const Dashboard: React.FC<DashboardProps> = ({ onNavigate }) => {
   const [data, setData] = useState<DashboardData | null>(null);
   const [loading, setLoading] = useState(true);
@@ -58,10 +77,35 @@ const Dashboard: React.FC<DashboardProps> = ({ onNavigate }) => {
         });
     };
 
-    fetchData(); // Initial fetch
-    const interval = setInterval(fetchData, 10000); // Poll every 10 seconds
+    // Fall back to polling where Server-Sent Events are unavailable
+    if (typeof EventSource === "undefined") {
+      fetchData(); // Initial fetch
+      const interval = setInterval(fetchData, 10000); // Poll every 10 seconds
+      return () => clearInterval(interval); // Cleanup on unmount
+    }
+
+    // The server pushes a full snapshot, then merge-patch deltas only when drift changes
+    const source = new EventSource("/api/stream?channel=dashboard");
+    let received = false;
+    source.addEventListener("snapshot", (event) => {
+      received = true;
+      setData(JSON.parse((event as MessageEvent).data));
+      setLoading(false);
+      setError(null);
+    });
+    source.addEventListener("delta", (event) => {
+      const patch = JSON.parse((event as MessageEvent).data);
+      setData((prev) => (prev ? applyMergePatch(prev, patch) : prev));
+    });
+    source.onerror = () => {
+      // EventSource reconnects on its own; only surface an error if nothing was loaded yet
+      if (!received) {
+        setError("Could not load dashboard data. Ensure backend is running.");
+        setLoading(false);
+      }
+    };
 
-    return () => clearInterval(interval); // Cleanup on unmount
+    return () => source.close(); // Cleanup on unmount
   }, []);
 
   if (loading) {
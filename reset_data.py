@@ -2,32 +2,97 @@ import pandas as pd
 import numpy as np
 import os
 
-# Ensure data directory exists
-os.makedirs('data', exist_ok=True)
+# Drift patterns understood by apply_drift
+DRIFT_PATTERNS = ('none', 'default', 'shift', 'scale', 'partial')
 
-# Generate synthetic data
-np.random.seed(42)
+def generate_data(n=1000, n_cols=6, rng=None):
+    """
+    Generate synthetic credit data.
 
-def generate_data(n=1000):
+    Args:
+        n: Number of rows.
+        n_cols: Number of columns; the six base columns come first and any
+            extra columns are 'feature_<i>' normal noise.
+        rng: Optional np.random.Generator. Defaults to the global np.random
+            state (as used for the reference data below).
+
+    Returns:
+        DataFrame
+    """
+    rng = rng if rng is not None else np.random
     data = {
-        'income': np.random.normal(50000, 15000, n),
-        'debt_ratio': np.random.uniform(0.1, 0.6, n),
-        'loan_amount': np.random.normal(15000, 5000, n),
-        'credit_score': np.random.normal(700, 50, n),
-        'defaults': np.random.choice([0, 1], n, p=[0.9, 0.1]),
-        'age': np.random.randint(20, 70, n)
+        'income': rng.normal(50000, 15000, n),
+        'debt_ratio': rng.uniform(0.1, 0.6, n),
+        'loan_amount': rng.normal(15000, 5000, n),
+        'credit_score': rng.normal(700, 50, n),
+        'defaults': rng.choice([0, 1], n, p=[0.9, 0.1]),
+        'age': rng.randint(20, 70, n) if rng is np.random else rng.integers(20, 70, n)
     }
-    return pd.DataFrame(data)
+    for i in range(len(data), n_cols):
+        data[f'feature_{i}'] = rng.normal(0, 1, n)
+    return pd.DataFrame(data).iloc[:, :n_cols]
+
+def apply_drift(df, pattern='default', magnitude=1.0):
+    """
+    Apply a drift pattern to a production DataFrame (in place).
+
+    Patterns:
+        'none': leave the data unchanged.
+        'default': income x1.2 and debt_ratio x1.1 (the reference scenario).
+        'shift': shift every numeric column by magnitude x 0.5 std.
+        'scale': widen every numeric column by a factor of 1 + magnitude x 0.5.
+        'partial': shift only the first half of the numeric columns.
+
+    Returns:
+        DataFrame
+    """
+    if pattern not in DRIFT_PATTERNS:
+        raise ValueError(f"Unknown drift pattern '{pattern}'")
+    columns = [col for col in df.select_dtypes(include=[np.number]).columns if col != 'defaults']
+    if pattern == 'default':
+        if 'income' in df.columns:
+            df['income'] = df['income'] * 1.2
+        if 'debt_ratio' in df.columns:
+            df['debt_ratio'] = df['debt_ratio'] * 1.1
+    elif pattern in ('shift', 'partial'):
+        if pattern == 'partial':
+            columns = columns[:max(1, len(columns) // 2)]
+        for col in columns:
+            df[col] = df[col] + magnitude * 0.5 * df[col].std()
+    elif pattern == 'scale':
+        for col in columns:
+            mean = df[col].mean()
+            df[col] = mean + (df[col] - mean) * (1 + magnitude * 0.5)
+    return df
+
+def generate_dataset(training_rows=1000, production_rows=200, n_cols=6, drift='default',
+                     magnitude=1.0, seed=42):
+    """
+    Generate a reproducible (training, production) pair.
+
+    Returns:
+        tuple: (training_df, production_df)
+    """
+    rng = np.random.default_rng(seed)
+    training_df = generate_data(training_rows, n_cols, rng)
+    production_df = apply_drift(generate_data(production_rows, n_cols, rng), drift, magnitude)
+    return training_df, production_df
+
+if __name__ == '__main__':
+    # Ensure data directory exists
+    os.makedirs('data', exist_ok=True)
+
+    # Generate synthetic data
+    np.random.seed(42)
 
-print("Generating training data...")
-training_df = generate_data(1000)
-training_df.to_csv('data/training_data.csv', index=False)
+    print("Generating training data...")
+    training_df = generate_data(1000)
+    training_df.to_csv('data/training_data.csv', index=False)
 
-print("Generating production data...")
-production_df = generate_data(200)
-# Add some drift
-production_df['income'] = production_df['income'] * 1.2
-production_df['debt_ratio'] = production_df['debt_ratio'] * 1.1
+    print("Generating production data...")
+    production_df = generate_data(200)
+    # Add some drift
+    production_df = apply_drift(production_df, 'default')
 
-production_df.to_csv('data/production_data.csv', index=False)
-print("Data generation complete.")
+    production_df.to_csv('data/production_data.csv', index=False)
+    print("Data generation complete.")